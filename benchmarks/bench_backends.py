@@ -0,0 +1,62 @@
+# benchmarks/bench_backends.py
+#
+# Сравнение бэкендов solvers/backends.py на одних и тех же данных:
+# построение + решение, цель, граница, разрыв и время до целевого разрыва
+# (решатель останавливается по gap_rel, «—» — не дошёл за time_limit).
+# Запуск: python -m benchmarks.bench_backends [экземпляры.json|yaml ...]
+# без аргументов — данные config/settings.py.
+
+import os
+import sys
+import tempfile
+import time
+
+from data.instance import ProblemInstance
+from solvers.backends import BACKENDS, available_backends, solve_backend
+
+
+def bench_backend(backend: str, inst: ProblemInstance,
+                  time_limit: float, gap_rel: float, threads: int | None) -> dict:
+    days = list(inst.days)
+    fd, log_path = tempfile.mkstemp(suffix=".log")
+    os.close(fd)
+    try:
+        t0 = time.perf_counter()
+        out = solve_backend(backend, days, inst, time_limit, gap_rel, threads, log_path=log_path)
+        total = time.perf_counter() - t0
+    finally:
+        os.remove(log_path)
+    stats = out["solver_stats"]
+    gap = stats["gap"]
+    return {"backend": backend, "status": out["status_str"], "total_s": total,
+            "solve_s": stats["wallclock"], "objective": stats["objective"],
+            "bound": stats["bound"], "gap": gap,
+            "time_to_gap": stats["wallclock"] if gap is not None and gap <= gap_rel else None}
+
+
+def _fmt(v, spec: str) -> str:
+    return format(v, spec) if v is not None else "—"
+
+
+def main(paths: list[str], time_limit: float = 60, gap_rel: float = 0.05,
+         threads: int | None = None):
+    instances = [(p, ProblemInstance.load(p)) for p in paths] or \
+                [("settings", ProblemInstance.from_settings())]
+    ready = available_backends()
+    print(f"{'instance':>12} {'backend':>7} {'status':>10} {'total, s':>9} {'solve, s':>9}"
+          f" {'objective':>10} {'bound':>10} {'gap':>7} {f'to {gap_rel:g}, s':>10}")
+    for name, inst in instances:
+        label = os.path.splitext(os.path.basename(name))[0][:12]
+        for backend in BACKENDS:
+            if backend not in ready:
+                print(f"{label:>12} {backend:>7} {'n/a':>10}")
+                continue
+            r = bench_backend(backend, inst, time_limit, gap_rel, threads)
+            print(f"{label:>12} {backend:>7} {r['status']:>10} {r['total_s']:>9.2f}"
+                  f" {_fmt(r['solve_s'], '.2f'):>9} {_fmt(r['objective'], '.1f'):>10}"
+                  f" {_fmt(r['bound'], '.1f'):>10} {_fmt(r['gap'], '.3f'):>7}"
+                  f" {_fmt(r['time_to_gap'], '.2f'):>10}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,73 @@
+# benchmarks/bench_changeover.py
+#
+# Парная и компактная формулировки переналадок при росте числа кампаний K:
+# размер модели, время построения и значение цели MIP на коротком горизонте.
+# Кампании размножаются из кампаний config.settings, перевалки чередуются
+# «от суток» и «короче суток», чтобы работали обе ветви compact.
+# Запуск: python -m benchmarks.bench_changeover [K...]
+
+import sys
+import time
+
+from pulp import LpStatus, PULP_CBC_CMD
+
+from benchmarks.bench_matbal import model_size
+from data.instance import ProblemInstance
+from models.rolling_model import build_model
+
+FORMS = ("pairwise", "compact")
+
+
+def scaled_campaigns(inst: ProblemInstance, n: int) -> ProblemInstance:
+    """Копия inst с n синтетическими кампаниями (K1…Kn) вместо исходных."""
+    base = inst.campaigns
+    campaigns = [f"K{i}" for i in range(1, n + 1)]
+    return inst.replace(
+        campaigns=campaigns,
+        prod_rate={(r, k): inst.prod_rate[(r, base[i % len(base)])]
+                   for r in inst.aggs for i, k in enumerate(campaigns)},
+        cooling_time={k: 1 for k in campaigns},
+        reconf_matrix={
+            r: {(k1, k2): 24 if (i + j) % 3 == 0 else 4 + (i*j + a) % 12
+                for i, k1 in enumerate(campaigns) for j, k2 in enumerate(campaigns) if k1 != k2}
+            for a, r in enumerate(inst.aggs)
+        },
+        total_nsi={k: 300 for k in campaigns},
+    )
+
+
+def bench_k(n: int, horizon: int, time_limit: float) -> list[dict]:
+    inst = scaled_campaigns(ProblemInstance.from_settings(), n).replace(
+        days=range(1, horizon + 1))
+    days = list(inst.days)
+    rows = []
+    for form in FORMS:
+        t0 = time.perf_counter()
+        m, *_ = build_model(days, changeover=form, inst=inst)
+        t_build = time.perf_counter() - t0
+        n_vars, n_rows, n_nz = model_size(m)
+        n_bin = sum(1 for v in m.variables() if v.cat == "Integer")
+
+        t0 = time.perf_counter()
+        status = m.solve(PULP_CBC_CMD(msg=False, timeLimit=time_limit, gapRel=0))
+        rows.append({
+            "K": n, "form": form, "vars": n_vars, "binary": n_bin,
+            "rows": n_rows, "nonzeros": n_nz, "build_s": t_build,
+            "solve_s": time.perf_counter() - t0,
+            "status": LpStatus[status], "objective": m.objective.value(),
+        })
+    return rows
+
+
+def main(ks: list[int], horizon: int = 6, time_limit: float = 60):
+    print(f"{'K':>3} {'form':>9} {'vars':>7} {'binary':>7} {'rows':>7} {'nonzeros':>9}"
+          f" {'build, s':>9} {'solve, s':>9} {'objective':>10}  status")
+    for n in ks:
+        for r in bench_k(n, horizon, time_limit):
+            print(f"{r['K']:>3} {r['form']:>9} {r['vars']:>7} {r['binary']:>7} {r['rows']:>7}"
+                  f" {r['nonzeros']:>9} {r['build_s']:>9.2f} {r['solve_s']:>9.2f}"
+                  f" {r['objective']:>10.1f}  {r['status']}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [6, 12, 24])
@@ -0,0 +1,90 @@
+# benchmarks/bench_hourly.py
+#
+# Суточная модель против модели в N-часовых бакетах: время построения,
+# время решения, выпуск всех стадий и прокат последней стадии.
+# Второй сценарий — перевалки по 6 ч (в суточной модели 6 // 24 = 0 дней).
+# Запуск: python -m benchmarks.bench_hourly [размеры бакетов...]
+
+import sys
+import time
+
+from pulp import PULP_CBC_CMD, value
+
+import config.settings as cfg
+from data.instance import ProblemInstance
+from models.hourly_model import build_hourly_model, bucket_size
+from models.rolling_model import build_model
+from solvers.hourly import _coarse_start
+
+
+def reconf_hours(inst: ProblemInstance, hours: int | None) -> ProblemInstance:
+    """Копия inst с одинаковой длительностью всех перевалок (None — inst без изменений)."""
+    if hours is None:
+        return inst
+    return inst.replace(reconf_matrix={r: {pair: hours for pair in m}
+                                       for r, m in inst.reconf_matrix.items()})
+
+
+def _throughput(x_vars: dict, rate: float, periods: list[int],
+                inst: ProblemInstance) -> tuple[float, float]:
+    """Выпуск всех стадий и последней стадии, т."""
+    final_stage = max(inst.stage_aggs)
+    total = final = 0.0
+    for s, aggs in inst.stage_aggs.items():
+        for r in aggs:
+            for k in inst.campaigns:
+                tons = sum(value(x_vars[s][r][k][p]) or 0 for p in periods)*inst.prod_rate[(r, k)]*rate
+                total += tons
+                if s == final_stage:
+                    final += tons
+    return total, final
+
+
+def bench_daily(inst: ProblemInstance, time_limit: float, gap_rel: float) -> dict:
+    days = list(inst.days)
+    t0 = time.perf_counter()
+    m, x_vars, *_ = build_model(days, inst=inst)
+    t_build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    m.solve(PULP_CBC_CMD(msg=False, timeLimit=time_limit, gapRel=gap_rel))
+    t_solve = time.perf_counter() - t0
+    total, final = _throughput(x_vars, 1.0, days, inst)
+    return {"model": "daily", "vars": len(m.variables()), "build_s": t_build,
+            "solve_s": t_solve, "total_t": total, "final_t": final}
+
+
+def bench_buckets(inst: ProblemInstance, n_hours: int, time_limit: float, gap_rel: float) -> dict:
+    days = list(inst.days)
+    t0 = time.perf_counter()
+    m, n_hours, buckets, x_vars, u_vars = build_hourly_model(days, n_hours, inst)
+    t_build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    warm = False
+    if n_hours < inst.hours_per_day and cfg.hourly_coarse_share > 0:
+        # тот же общий лимит, что у solve_hourly
+        warm = _coarse_start(days, n_hours, x_vars, u_vars,
+                             time_limit*cfg.hourly_coarse_share, inst)
+        time_limit *= 1 - cfg.hourly_coarse_share
+    m.solve(PULP_CBC_CMD(msg=False, timeLimit=time_limit, gapRel=gap_rel, warmStart=warm))
+    t_solve = time.perf_counter() - t0
+    total, final = _throughput(x_vars, n_hours/inst.hours_per_day, buckets, inst)
+    return {"model": f"{n_hours} h", "vars": len(m.variables()), "build_s": t_build,
+            "solve_s": t_solve, "total_t": total, "final_t": final}
+
+
+def main(sizes: list[int], horizon: int = 15, time_limit: float = 60, gap_rel: float = 0.2):
+    base = ProblemInstance.from_settings().replace(days=range(1, horizon + 1))
+    print(f"{'reconf':>7} {'model':>6} {'vars':>7} {'build, s':>9} {'solve, s':>9}"
+          f" {'all stages, t':>14} {'final stage, t':>15}")
+    for hours in (None, 6):
+        inst = reconf_hours(base, hours)
+        rows = [bench_daily(inst, time_limit, gap_rel)]
+        for n in sizes or [bucket_size(inst=inst)]:
+            rows.append(bench_buckets(inst, n, time_limit, gap_rel))
+        for r in rows:
+            print(f"{hours or 'cfg':>7} {r['model']:>6} {r['vars']:>7} {r['build_s']:>9.2f}"
+                  f" {r['solve_s']:>9.2f} {r['total_t']:>14.1f} {r['final_t']:>15.1f}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [24, 6])
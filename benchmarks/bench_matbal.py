@@ -0,0 +1,58 @@
+﻿# benchmarks/bench_matbal.py
+#
+# Сравнение формулировок материального баланса: время построения модели,
+# размер (строки/ненулевые) и время корневой LP-релаксации.
+# Запуск: python -m benchmarks.bench_matbal [горизонты...]
+
+import sys
+import time
+
+from pulp import LpStatus, PULP_CBC_CMD
+
+from models.rolling_model import build_model
+
+FORMS = ("direct", "cumulative")
+
+
+def model_size(m) -> tuple[int, int, int]:
+    """Число переменных, строк и ненулевых коэффициентов модели PuLP."""
+    n_rows = len(m.constraints)
+    n_nz   = sum(len(c) for c in m.constraints.values())
+    return len(m.variables()), n_rows, n_nz
+
+
+def bench_horizon(horizon: int) -> list[dict]:
+    days = list(range(1, horizon + 1))
+    rows = []
+    for form in FORMS:
+        t0 = time.perf_counter()
+        m, *_ = build_model(days, matbal_form=form)
+        t_build = time.perf_counter() - t0
+
+        n_vars, n_rows, n_nz = model_size(m)
+
+        t0 = time.perf_counter()
+        status = m.solve(PULP_CBC_CMD(mip=False, msg=False))
+        t_lp = time.perf_counter() - t0
+
+        rows.append({
+            "horizon": horizon, "form": form,
+            "vars": n_vars, "rows": n_rows, "nonzeros": n_nz,
+            "build_s": t_build, "root_lp_s": t_lp,
+            "status": LpStatus[status], "lp_obj": m.objective.value(),
+        })
+    return rows
+
+
+def main(horizons: list[int]):
+    print(f"{'T':>4} {'form':>11} {'vars':>8} {'rows':>8} {'nonzeros':>10}"
+          f" {'build, s':>9} {'root LP, s':>11} {'LP obj':>11}")
+    for horizon in horizons:
+        for r in bench_horizon(horizon):
+            print(f"{r['horizon']:>4} {r['form']:>11} {r['vars']:>8} {r['rows']:>8}"
+                  f" {r['nonzeros']:>10} {r['build_s']:>9.2f} {r['root_lp_s']:>11.2f}"
+                  f" {r['lp_obj']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [15, 30, 60, 90])
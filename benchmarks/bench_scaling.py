@@ -0,0 +1,154 @@
+# benchmarks/bench_scaling.py
+#
+# Масштабирование на синтетических экземплярах (data/generator.py):
+# время построения build_model, число переменных/строк/ненулей, время и
+# разрыв CBC, время сбора результата и записи отчёта Excel. Результаты
+# пишутся в JSON (по файлу на версию кода), --baseline сравнивает с
+# прошлым прогоном.
+# Запуск: python -m benchmarks.bench_scaling [--cases small medium plant]
+#         [--time-limit 60] [--out путь.json] [--baseline прошлый.json]
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+
+import pulp
+from pulp import LpStatus, PULP_CBC_CMD
+
+from data.generator import generate_instance
+from models.rolling_model import build_model
+from reports.report_excel import write_excel_report
+from solvers.cbc_log import read_cbc_log
+from solvers.solve import _collect_result
+
+# Параметры generate_instance по размерам; "plant" — масштаб цеха
+# (20 кампаний, 15 агрегатов)
+CASES = {
+    "small":  dict(n_campaigns=6,  aggs_per_stage=2, n_stages=4, horizon_days=15),
+    "medium": dict(n_campaigns=12, aggs_per_stage=3, n_stages=4, horizon_days=20,
+                   repair_density=0.1, reconf="families"),
+    "plant":  dict(n_campaigns=20, aggs_per_stage=[4, 5, 4, 2], horizon_days=30,
+                   repair_density=0.1, reconf="families"),
+}
+
+
+def bench_case(name: str, params: dict, seed: int, time_limit: float, gap_rel: float) -> dict:
+    inst = generate_instance(**params, seed=seed)
+    days = list(inst.days)
+
+    t0 = time.perf_counter()
+    m, x_vars, y_vars, u_vars, z_vars = build_model(days, inst=inst)
+    build_s = time.perf_counter() - t0
+
+    fd, log_path = tempfile.mkstemp(suffix=".log")
+    os.close(fd)
+    try:
+        t0 = time.perf_counter()
+        status = m.solve(PULP_CBC_CMD(msg=False, timeLimit=time_limit, gapRel=gap_rel,
+                                      logPath=log_path))
+        solve_s = time.perf_counter() - t0
+        stats = read_cbc_log(log_path)
+    finally:
+        os.remove(log_path)
+
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        res = _collect_result(m, LpStatus[status], days, x_vars, y_vars, u_vars, z_vars, inst)
+    extract_s = time.perf_counter() - t0
+
+    fd, xlsx = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            write_excel_report(xlsx, inst, res["metrics"], days, res["schedules"],
+                               res["tonnages"], res["reconfs"], res["rolled_total_3"])
+        report_s = time.perf_counter() - t0
+    finally:
+        os.remove(xlsx)
+
+    return {
+        "case": name, "params": params, "seed": seed,
+        "aggregates": len(inst.aggs), "campaigns": len(inst.campaigns), "days": len(days),
+        "n_vars": m.numVariables(), "n_rows": m.numConstraints(),
+        "nnz": sum(len(c) for c in m.constraints.values()),
+        "build_s": build_s, "status": LpStatus[status], "solve_s": solve_s,
+        "objective": m.objective.value() if status == pulp.LpStatusOptimal else None,
+        "bound": stats["bound"], "gap": stats["gap"],
+        "first_incumbent_s": stats["first_incumbent_time"],
+        "extract_s": extract_s, "report_s": report_s,
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _fmt(v, spec: str) -> str:
+    return format(v, spec) if v is not None else "—"
+
+
+def compare(results: list[dict], baseline_path: str):
+    """Отношения времён текущего прогона к прошлому по совпадающим case/seed."""
+    with open(baseline_path, encoding="utf-8") as f:
+        base = {(r["case"], r["seed"]): r for r in json.load(f)["results"]}
+    print(f"\nОтносительно {baseline_path} (×, меньше — быстрее):")
+    print(f"{'case':>8} {'build':>7} {'solve':>7} {'extract':>8} {'report':>7} {'rows':>7}")
+    for r in results:
+        b = base.get((r["case"], r["seed"]))
+        if b is None:
+            continue
+        ratio = {key: r[key]/b[key] if b[key] else None
+                 for key in ("build_s", "solve_s", "extract_s", "report_s", "n_rows")}
+        print(f"{r['case']:>8} {_fmt(ratio['build_s'], '.2f'):>7} {_fmt(ratio['solve_s'], '.2f'):>7}"
+              f" {_fmt(ratio['extract_s'], '.2f'):>8} {_fmt(ratio['report_s'], '.2f'):>7}"
+              f" {_fmt(ratio['n_rows'], '.2f'):>7}")
+
+
+def main(cases: list[str], seed: int = 0, time_limit: float = 60, gap_rel: float = 0.2,
+         out: str | None = None, baseline: str | None = None):
+    rev = _git_revision()
+    print(f"{'case':>8} {'A':>3} {'K':>3} {'T':>3} {'vars':>7} {'rows':>7} {'nnz':>8}"
+          f" {'build, s':>9} {'solve, s':>9} {'gap':>7} {'extract, s':>11} {'report, s':>10}")
+    results = []
+    for name in cases:
+        r = bench_case(name, CASES[name], seed, time_limit, gap_rel)
+        results.append(r)
+        print(f"{name:>8} {r['aggregates']:>3} {r['campaigns']:>3} {r['days']:>3}"
+              f" {r['n_vars']:>7} {r['n_rows']:>7} {r['nnz']:>8} {r['build_s']:>9.2f}"
+              f" {r['solve_s']:>9.2f} {_fmt(r['gap'], '.3f'):>7} {r['extract_s']:>11.3f}"
+              f" {r['report_s']:>10.3f}")
+
+    if out is None:
+        out = os.path.join("output", "bench", f"scaling-{rev or 'local'}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"revision": rev, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                   "python": platform.python_version(), "pulp": pulp.__version__,
+                   "time_limit": time_limit, "gap_rel": gap_rel, "results": results},
+                  f, ensure_ascii=False, indent=2)
+    print(f"[INFO] Результаты: {out}")
+    if baseline:
+        compare(results, baseline)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Масштабирование на синтетических экземплярах")
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=["small", "medium"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-limit", type=float, default=60)
+    parser.add_argument("--gap", type=float, default=0.2)
+    parser.add_argument("--out", default=None, help="JSON результатов (по умолчанию output/bench/)")
+    parser.add_argument("--baseline", default=None, help="JSON прошлого прогона для сравнения")
+    args = parser.parse_args()
+    main(args.cases, args.seed, args.time_limit, args.gap, args.out, args.baseline)
@@ -0,0 +1,49 @@
+# benchmarks/bench_stagewise.py
+#
+# Декомпозиция по стадиям против монолитной модели: значение целевой
+# функции build_model на итоговом плане и полное время решения.
+# Запуск: python -m benchmarks.bench_stagewise [горизонты...]
+
+import contextlib
+import io
+import sys
+import time
+
+from pulp import PULP_CBC_CMD
+
+import config.settings as cfg
+from data.instance import ProblemInstance
+from models.rolling_model import build_model
+from solvers.stagewise import solve_stagewise
+
+
+def bench_monolithic(inst: ProblemInstance, time_limit: float, gap_rel: float) -> dict:
+    t0 = time.perf_counter()
+    m, *_ = build_model(list(inst.days), inst=inst)
+    m.solve(PULP_CBC_CMD(msg=False, timeLimit=time_limit, gapRel=gap_rel))
+    return {"mode": "monolithic", "objective": m.objective.value(),
+            "total_s": time.perf_counter() - t0}
+
+
+def bench_stagewise(inst: ProblemInstance, feedback_iters: int) -> dict:
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        res = solve_stagewise(feedback_iters=feedback_iters, inst=inst)
+    return {"mode": f"stagewise/{feedback_iters}", "objective": res["objective"],
+            "total_s": time.perf_counter() - t0}
+
+
+def main(horizons: list[int], time_limit: float = 60, gap_rel: float = 0.2):
+    print(f"{'T':>4} {'mode':>12} {'objective':>10} {'total, s':>9}")
+    base = ProblemInstance.from_settings()
+    for horizon in horizons:
+        inst = base.replace(days=range(1, horizon + 1))
+        rows = [bench_monolithic(inst, time_limit, gap_rel),
+                bench_stagewise(inst, 0),
+                bench_stagewise(inst, cfg.stagewise_feedback_iters)]
+        for r in rows:
+            print(f"{horizon:>4} {r['mode']:>12} {r['objective']:>10.1f} {r['total_s']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [15, 30])
@@ -0,0 +1,71 @@
+# benchmarks/bench_symmetry.py
+#
+# Отсечение симметрии одинаковых агрегатов: число узлов ветвления CBC,
+# время решения и цель без отсечения и с ним ("usage", "load").
+# Стадии 2 и 3 заменяются n копиями Resource21 / Resource31.
+# Запуск: python -m benchmarks.bench_symmetry [n...]
+
+import os
+import sys
+import tempfile
+import time
+
+from pulp import LpStatus, PULP_CBC_CMD
+
+from data.instance import ProblemInstance
+from models.rolling_model import build_model
+from solvers.cbc_log import read_cbc_log
+
+MODES = ("none", "usage", "load")
+CLONED = {2: "Resource21", 3: "Resource31"}
+
+
+def cloned_mills(inst: ProblemInstance, n: int) -> ProblemInstance:
+    """Копия inst, где агрегаты стадий CLONED заменены на n одинаковых копий."""
+    stage_aggs    = dict(inst.stage_aggs)
+    prod_rate     = dict(inst.prod_rate)
+    reconf_matrix = dict(inst.reconf_matrix)
+    can_parallel  = dict(inst.can_parallel)
+    repairs       = dict(inst.repairs)
+    for stage, src in CLONED.items():
+        clones = [f"{src}_{i}" for i in range(1, n + 1)]
+        stage_aggs[stage] = clones
+        for r in clones:
+            for k in inst.campaigns:
+                prod_rate[(r, k)] = inst.prod_rate[(src, k)]
+            reconf_matrix[r] = inst.reconf_matrix[src]
+            can_parallel[r]  = inst.can_parallel.get(src, False)
+            repairs[r]       = list(inst.repairs.get(src, []))
+    return inst.replace(stage_aggs=stage_aggs, prod_rate=prod_rate, reconf_matrix=reconf_matrix,
+                        can_parallel=can_parallel, repairs=repairs)
+
+
+def bench_mode(inst: ProblemInstance, mode: str, time_limit: float) -> dict:
+    m, *_ = build_model(list(inst.days), symmetry=mode, inst=inst)
+    fd, log_path = tempfile.mkstemp(suffix=".log")
+    os.close(fd)
+    try:
+        t0 = time.perf_counter()
+        status = m.solve(PULP_CBC_CMD(msg=False, timeLimit=time_limit, gapRel=0,
+                                      logPath=log_path))
+        wall = time.perf_counter() - t0
+        stats = read_cbc_log(log_path)
+    finally:
+        os.remove(log_path)
+    return {"mode": mode, "nodes": stats["nodes"], "solve_s": wall,
+            "objective": m.objective.value(), "result": stats["result"] or LpStatus[status]}
+
+
+def main(ns: list[int], horizon: int = 8, time_limit: float = 120):
+    base = ProblemInstance.from_settings().replace(days=range(1, horizon + 1))
+    print(f"{'n':>3} {'mode':>6} {'nodes':>8} {'solve, s':>9} {'objective':>10}  result")
+    for n in ns:
+        inst = cloned_mills(base, n)
+        for mode in MODES:
+            r = bench_mode(inst, mode, time_limit)
+            print(f"{n:>3} {r['mode']:>6} {r['nodes'] or 0:>8} {r['solve_s']:>9.2f}"
+                  f" {r['objective']:>10.1f}  {r['result']}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [2, 4, 6])
@@ -0,0 +1,57 @@
+﻿# benchmarks/bench_warm_start.py
+#
+# Холодный старт CBC против MIP-старта из конструктивной эвристики:
+# время до первого решения, итоговое значение цели и разрыв.
+# Запуск: python -m benchmarks.bench_warm_start [горизонты...]
+
+import os
+import sys
+import tempfile
+import time
+
+from pulp import PULP_CBC_CMD
+
+from models.rolling_model import build_model
+from solvers.cbc_log import read_cbc_log
+from solvers.heuristic import construct_schedule, apply_warm_start
+
+
+def bench_mode(days: list[int], warm: bool, time_limit: float, gap_rel: float) -> dict:
+    m, x_vars, y_vars, u_vars, z_vars = build_model(days)
+    t_heur = 0.0
+    if warm:
+        t0 = time.perf_counter()
+        values = construct_schedule(days)
+        t_heur = time.perf_counter() - t0
+        apply_warm_start(x_vars, y_vars, u_vars, z_vars, values)
+
+    fd, log_path = tempfile.mkstemp(suffix=".log")
+    os.close(fd)
+    try:
+        t0 = time.perf_counter()
+        m.solve(PULP_CBC_CMD(msg=False, timeLimit=time_limit, gapRel=gap_rel,
+                             warmStart=warm, logPath=log_path))
+        wall = time.perf_counter() - t0
+        stats = read_cbc_log(log_path)
+    finally:
+        os.remove(log_path)
+    return {"mode": "warm" if warm else "cold", "heuristic_s": t_heur,
+            "first_incumbent_s": stats["first_incumbent_time"],
+            "objective": m.objective.value(), "gap": stats["gap"], "solve_s": wall}
+
+
+def main(horizons: list[int], time_limit: float = 60, gap_rel: float = 0.2):
+    print(f"{'T':>4} {'mode':>5} {'heur, s':>8} {'1st inc, s':>11}"
+          f" {'objective':>10} {'gap':>7} {'solve, s':>9}")
+    for horizon in horizons:
+        days = list(range(1, horizon + 1))
+        for warm in (False, True):
+            r = bench_mode(days, warm, time_limit, gap_rel)
+            first = f"{r['first_incumbent_s']:.2f}" if r["first_incumbent_s"] is not None else "—"
+            gap = f"{r['gap']:.3f}" if r["gap"] is not None else "—"
+            print(f"{horizon:>4} {r['mode']:>5} {r['heuristic_s']:>8.3f} {first:>11}"
+                  f" {r['objective']:>10.1f} {gap:>7} {r['solve_s']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [15, 30])
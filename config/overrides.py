@@ -0,0 +1,58 @@
+# config/overrides.py
+#
+# Подмена параметров config.settings для сценария: значения задаются
+# по именам глобалов settings.py, производные величины пересчитываются.
+
+import copy
+
+import config.settings as cfg
+
+
+def apply_overrides(overrides: dict) -> dict:
+    """
+    Присваивает cfg.<имя> = значение для каждого ключа overrides и
+    пересчитывает производные параметры, если они не заданы явно:
+      horizon_days  → days, horizon_hours, hours;
+      nsi_schedule  → total_nsi.
+    Словари, заданные частично с ключом "+имя", дополняют текущее значение
+    (например {"+repairs": {"Resource1": [3, 4]}}).
+    Ключи JSON/YAML — строки: дни в nsi_schedule приводятся к int.
+    Возвращает прежние значения изменённых глобалов (для restore_overrides).
+    """
+    saved = {}
+
+    def _set(name, value):
+        if not hasattr(cfg, name):
+            raise KeyError(f"Неизвестный параметр settings: {name}")
+        saved.setdefault(name, getattr(cfg, name))
+        setattr(cfg, name, value)
+
+    for key, value in overrides.items():
+        if key.startswith("+"):
+            name = key[1:]
+            merged = copy.deepcopy(getattr(cfg, name))
+            merged.update(value)
+            _set(name, merged)
+        elif key == "nsi_schedule":
+            _set(key, {int(d): tuple(v) for d, v in value.items()})
+        else:
+            _set(key, value)
+
+    names = {k.lstrip("+") for k in overrides}
+    if "horizon_days" in names and "days" not in names:
+        _set("days", list(range(1, cfg.horizon_days + 1)))
+    if "horizon_days" in names or "hours_per_day" in names:
+        _set("horizon_hours", cfg.horizon_days * cfg.hours_per_day)
+        _set("hours", list(range(1, cfg.horizon_hours + 1)))
+    if "nsi_schedule" in names and "total_nsi" not in names:
+        total = {k: 0 for k in cfg.campaigns}
+        for d, (k, v) in cfg.nsi_schedule.items():
+            total[k] += v
+        _set("total_nsi", total)
+    return saved
+
+
+def restore_overrides(saved: dict):
+    """Возвращает значения, сохранённые apply_overrides."""
+    for name, value in saved.items():
+        setattr(cfg, name, value)
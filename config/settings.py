@@ -128,6 +128,169 @@ pen_reconf = 5.0
 # Штрафной множитель за использование агрегата
 pen_resource = 2.0
 
+# Формулировка материального баланса в build_model:
+#   "direct"     — пересуммирование всех x до дня t (O(T²) ненулей на строку)
+#   "cumulative" — накопительные переменные выпуска по стадии/кампании/дню
+matbal_form = "direct"
+
+# Предрешение в build_model (models/presolve.py): не создавать переменные,
+# равные нулю при любом решении (ремонты, нулевая производительность, смены
+# через ремонт и т.д.), и строки, ставшие тождественно выполненными
+presolve = True
+
+# Формулировка переналадок в build_model:
+#   "pairwise" — бинарные y на каждую пару кампаний и день (K²·T)
+#   "compact"  — запрет коротких смен и стоимость смены по дням (линейно по K)
+changeover = "pairwise"
+
+# Отсечение симметрии одинаковых агрегатов стадии (rolling_model.aggregate_classes):
+#   "none"  — без отсечения
+#   "load"  — суммарная загрузка агрегатов класса не возрастает
+#   "usage" — агрегаты класса задействуются по порядку (u)
+symmetry_breaking = "none"
+
+# Бэкенд решения в solve_main (solvers/backends.py):
+#   "pulp"   — выражения PuLP + PULP_CBC_CMD (через MPS-файл)
+#   "highs"  — выражения PuLP + HiGHS (highspy; без него — как "sparse")
+#   "sparse" — CSR-матрица SciPy + HiGHS в памяти
+#   "cpsat"  — OR-Tools CP-SAT, параллельный поиск (pip install ortools)
+#   "portfolio" — несколько конфигураций CBC параллельно (см. portfolio_configs)
+solver_backend = "pulp"
+
+# Лимит времени (с) и относительный разрыв остановки решателя в solve_main
+solver_time_limit = 60
+solver_gap_rel    = 0.2
+
+# Бэкенд "pulp" запускает CBC сам и читает лог построчно (solvers/streaming.py):
+# решения и границы доступны во время решения и в solver_stats["events"];
+# False — обычный PULP_CBC_CMD
+cbc_streaming = True
+
+# Адаптивная остановка решения (CBC при cbc_streaming, CP-SAT), None — правило
+# выключено: разрыв не уменьшался stop_stall_seconds секунд; улучшение цели за
+# последние stop_rate_window секунд меньше stop_min_rate в секунду; разрыв
+# не больше stop_target_gap (в отличие от solver_gap_rel проверяется по логу
+# сразу, а не в узлах дерева)
+stop_stall_seconds: float | None = None
+stop_min_rate:      float | None = None
+stop_rate_window   = 10.0
+stop_target_gap:    float | None = None
+
+# Портфель CBC (solver_backend = "portfolio", solvers/portfolio.py): модель
+# решается параллельно процессами CBC с разными настройками (опции CBC без
+# "-"; warm_start — MIP-старт из эвристики), процессы останавливаются, как
+# только лучшее решение доказано в пределах solver_gap_rel. portfolio_size —
+# сколько первых конфигураций запускать (None — по числу ядер);
+# portfolio_history — журнал победителей JSON Lines для настройки портфеля
+portfolio_configs = (
+    {"name": "default",    "options": []},
+    {"name": "warm",       "options": ["randomCbcSeed 1"], "warm_start": True},
+    {"name": "heuristics", "options": ["randomCbcSeed 2", "rins on", "dins on",
+                                       "proximity on"]},
+    {"name": "cuts_root",  "options": ["randomCbcSeed 3", "cutsOnOff root"]},
+    {"name": "no_preproc", "options": ["randomCbcSeed 4", "preprocess off"]},
+    {"name": "cuts_force", "options": ["randomCbcSeed 5", "cutsOnOff forceOn",
+                                       "strategy 2"]},
+)
+portfolio_size: int | None = None
+portfolio_history: str | None = "output/portfolio_history.jsonl"
+
+# MIP-старт CBC из конструктивной эвристики (solvers/heuristic.py)
+warm_start = False
+
+# Потоки решателя на одно решение (CBC/HiGHS — потоки, CP-SAT — воркеры;
+# None — по умолчанию решателя); пакетный запуск solvers/batch.py задаёт
+# его на каждый процесс
+solver_threads: int | None = None
+
+# Режим run.py: "milp" — solve_main, "greedy" — жадная диспетчеризация без MIP,
+# "rolling" — скользящее окно (solvers/rolling_horizon.py),
+# "stagewise" — декомпозиция по стадиям (solvers/stagewise.py),
+# "hourly" — модель в N-часовых бакетах (solvers/hourly.py),
+# "rounding" — LP-релаксация и округление с оценкой разрыва (solvers/rounding.py),
+# "colgen" — генерация столбцов по расписаниям агрегатов (solvers/colgen.py)
+run_mode = "milp"
+
+# Скользящее окно: дней фиксируется за шаг, дней упреждения,
+# лимит времени и относительный разрыв CBC на одно окно
+rolling_window     = 7
+rolling_lookahead  = 3
+rolling_time_limit = 20
+rolling_gap_rel    = 0.05
+
+# LP-релаксация + округление (solvers/rounding.py): число случайных
+# округлений по значениям LP, seed и лимит времени (с) на округления
+rounding_rounds     = 50
+rounding_seed       = 0
+rounding_time_limit = 10
+
+# Генерация столбцов по расписаниям агрегатов (solvers/colgen.py): итераций
+# и секунд на генерацию столбцов, округлений решения главной задачи в планы
+# (столбцы для целочисленной задачи) и их seed, лимит времени (с) и
+# относительный разрыв HiGHS на целочисленную главную задачу по найденным
+# столбцам. Планы эвристические, граница бывает слабой (разрыв 20–30 % на
+# 12-дневных сгенерированных задачах)
+colgen_max_iters      = 200
+colgen_time_limit     = 20
+colgen_rounds         = 20
+colgen_seed           = 0
+colgen_mip_time_limit = 20
+colgen_gap_rel        = 0.01
+
+# Перепланирование с текущего дня (solvers/replan.py): лимит времени
+# и относительный разрыв CBC на оставшийся горизонт
+replan_time_limit = 20
+replan_gap_rel    = 0.05
+
+# Декомпозиция по стадиям (solvers/stagewise.py): лимит времени и разрыв CBC
+# на одну стадию, итерации обратной связи и веса бонуса за ранний выпуск,
+# цепочки с разными весами решаются параллельно
+stagewise_time_limit     = 20
+stagewise_gap_rel        = 0.05
+stagewise_feedback_iters = 2
+stagewise_bonus_weights  = (0.05, 0.2)
+
+# Модель в N-часовых бакетах (models/hourly_model.py): размер бакета в часах
+# (None — наибольший, при котором перевалки и охлаждение не округляются),
+# лимит времени и относительный разрыв CBC, доля лимита на суточную модель,
+# решение которой — MIP-старт для бакетов мельче суток (0 — без неё)
+bucket_hours        = None
+hourly_time_limit   = 60
+hourly_gap_rel      = 0.2
+hourly_coarse_share = 0.3
+
+# Подробность вывода: 0 — только ошибки и предупреждения решателей,
+# 1 — ход решения и лог решателя, 2 — плюс расписания/тоннажи по стадиям
+verbosity = 1
+
+# Журнал прогона run.py (solvers/runlog.py): JSON с временем и пиковой
+# памятью по фазам, размером модели по семействам ограничений и статистикой
+# решателя (None — не писать); runlog_memory — пик памяти через tracemalloc
+# (замедляет построение модели PuLP в несколько раз)
+runlog_path   = "output/run_log.json"
+runlog_memory = False
+
+# Кэш решений run.py (solvers/cache.py): ключ — хэш данных задачи и настроек
+# режима, запись — модель в MPS и результат решения; при том же ключе модель
+# не строится и не решается. None — без кэша; cache_max_mb — предел размера,
+# сверх него удаляются давно не использованные записи
+cache_dir: str | None = "output/cache"
+cache_max_mb = 500
+
+# Сервис планирования (python -m solvers.service): строки JSON через
+# Unix-сокет service_socket (None — TCP service_host:service_port);
+# service_workers — заданий решается одновременно, остальные ждут в очереди;
+# service_memory — последних результатов (с моделями) держится в памяти
+service_socket: str | None = None
+service_host    = "127.0.0.1"
+service_port    = 8765
+service_workers = 2
+service_memory  = 16
+
+# Дополнительная выгрузка расписаний run.py рядом с отчётом Excel:
+# кортеж из "csv" и/или "parquet" (parquet — при установленном pyarrow)
+report_exports: tuple[str, ...] = ()
+
 # can_parallel = True  → можно параллелить одну и ту же кампанию
 can_parallel: dict[str, bool] = {
     'Resource2':  True,
@@ -0,0 +1,120 @@
+# data/generator.py
+#
+# Синтетические экземпляры задачи для масштабных прогонов: случайные, но
+# согласованные данные (производительности стадий соизмеримы, объём НСИ —
+# заданная доля мощности первой стадии за горизонт), поэтому план с
+# ненулевым выпуском существует при любом seed.
+
+import numpy as np
+
+from data.instance import ProblemInstance
+
+# Структуры матрицы перевалок (часы) для generate_instance(reconf=...)
+RECONF_STRUCTURES = ("uniform", "random", "families", "ordered")
+
+
+def _reconf_hours(structure: str, campaigns: list[str], rng: np.random.Generator,
+                  hours_per_day: int, n_families: int) -> dict[tuple[str, str], int]:
+    """
+    Матрица перевалок одного агрегата:
+      "uniform"  — все смены по hours_per_day часов (как в config.settings),
+      "random"   — независимо 4…2·hours_per_day часов,
+      "families" — кампании разбиты на n_families семейств: внутри семейства
+                   короткие перевалки (меньше суток), между семействами — 1…2 суток,
+      "ordered"  — кампании упорядочены (например, по ширине проката): смена
+                   «вверх» короткая, «вниз» — пропорционально расстоянию.
+    """
+    K = len(campaigns)
+    hpd = hours_per_day
+    if structure == "uniform":
+        h = np.full((K, K), hpd)
+    elif structure == "random":
+        h = rng.integers(4, 2*hpd + 1, size=(K, K))
+    elif structure == "families":
+        fam = rng.integers(0, n_families, size=K)
+        short = rng.integers(2, hpd // 2 + 1, size=(K, K))
+        long  = rng.integers(hpd, 2*hpd + 1, size=(K, K))
+        h = np.where(fam[:, None] == fam[None, :], short, long)
+    elif structure == "ordered":
+        i, j = np.indices((K, K))
+        h = np.where(j > i, hpd // 4, np.abs(i - j)*hpd // 2)
+    else:
+        raise ValueError(f"Неизвестная структура перевалок: {structure}")
+    return {(k1, k2): int(h[a, b]) for a, k1 in enumerate(campaigns)
+            for b, k2 in enumerate(campaigns) if a != b}
+
+
+def generate_instance(n_campaigns: int = 6,
+                      aggs_per_stage: int | list[int] = 2,
+                      n_stages: int = 4,
+                      horizon_days: int = 15,
+                      repair_density: float = 0.0,
+                      reconf: str = "uniform",
+                      load_factor: float = 0.6,
+                      n_families: int = 3,
+                      max_cooling: int = 1,
+                      hours_per_day: int = 24,
+                      seed: int | None = None) -> ProblemInstance:
+    """
+    Случайный экземпляр задачи.
+      aggs_per_stage  — агрегатов на стадии: число для всех стадий или список
+                        по стадиям (тогда n_stages = len(aggs_per_stage)),
+      repair_density  — доля дней ремонта на агрегате (ремонты блоками по 1–2 дня),
+      reconf          — структура перевалок, см. RECONF_STRUCTURES,
+      load_factor     — суммарный НСИ-объём как доля мощности стадии 1 за
+                        горизонт без ремонтов (при < 1 выполнимость не
+                        упирается в выплавку),
+      max_cooling     — охлаждение кампании 0…max_cooling суток,
+      seed            — для воспроизводимости.
+    Суммарная мощность каждой стадии по кампании близка к мощности стадии 1,
+    поэтому поток не обрывается на узком месте.
+    """
+    if reconf not in RECONF_STRUCTURES:
+        raise ValueError(f"Неизвестная структура перевалок: {reconf}")
+    if isinstance(aggs_per_stage, int):
+        aggs_per_stage = [aggs_per_stage]*n_stages
+    rng = np.random.default_rng(seed)
+
+    campaigns = [f"K{i}" for i in range(1, n_campaigns + 1)]
+    days = list(range(1, horizon_days + 1))
+    stage_aggs = {s: [f"S{s}R{i}" for i in range(1, n + 1)]
+                  for s, n in enumerate(aggs_per_stage, start=1)}
+
+    # Производительность: базовая по кампании × разброс агрегата, на стадии
+    # делится на число агрегатов, чтобы мощности стадий были соизмеримы
+    base = rng.uniform(200, 600, size=n_campaigns)
+    prod_rate = {}
+    for aggs in stage_aggs.values():
+        for r in aggs:
+            spread = rng.uniform(0.7, 1.3, size=n_campaigns)
+            for ki, k in enumerate(campaigns):
+                prod_rate[(r, k)] = int(round(base[ki]*spread[ki]*2 / len(aggs)))
+
+    reconf_matrix = {r: _reconf_hours(reconf, campaigns, rng, hours_per_day, n_families)
+                     for aggs in stage_aggs.values() for r in aggs}
+
+    n_rep = min(int(round(repair_density*horizon_days)), horizon_days)
+    repairs = {}
+    for aggs in stage_aggs.values():
+        for r in aggs:
+            rep = set()
+            while len(rep) < n_rep:
+                start = int(rng.choice(days))
+                rep.update(t for t in range(start, start + int(rng.integers(1, 3)))
+                           if t in days)
+            repairs[r] = sorted(rep)[:n_rep]
+
+    # НСИ: доля мощности стадии 1, поделённая между кампаниями случайно
+    cap1 = horizon_days*np.mean([prod_rate[(r, k)] for r in stage_aggs[1] for k in campaigns]) \
+        * len(stage_aggs[1])
+    shares = rng.dirichlet(np.ones(n_campaigns))
+    nsi_schedule = {d: (campaigns[i], int(round(load_factor*cap1*shares[i])))
+                    for d, i in enumerate(rng.permutation(n_campaigns), start=1)}
+
+    return ProblemInstance(
+        campaigns=campaigns, stage_aggs=stage_aggs, days=days,
+        hours_per_day=hours_per_day, prod_rate=prod_rate,
+        cooling_time={k: int(rng.integers(0, max_cooling + 1)) for k in campaigns},
+        reconf_matrix=reconf_matrix, repairs=repairs, nsi_schedule=nsi_schedule,
+        can_parallel={r: True for aggs in stage_aggs.values() for r in aggs},
+    )
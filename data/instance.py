@@ -0,0 +1,233 @@
+# data/instance.py
+#
+# Неизменяемые данные задачи: кампании, стадии и агрегаты, производительность,
+# перевалки, охлаждение, ремонты и НСИ. Источник — config.settings, JSON или YAML;
+# построители моделей и решатели получают экземпляр параметром вместо чтения
+# модуля настроек, поэтому в одном процессе могут жить разные задачи.
+
+import json
+from types import MappingProxyType
+
+import numpy as np
+
+
+def _frozen_array(a) -> np.ndarray:
+    a = np.asarray(a)
+    a.setflags(write=False)
+    return a
+
+
+class ProblemInstance:
+    """
+    Данные задачи в тех же именах, что и в config.settings:
+      campaigns, stage_aggs, days, hours_per_day, prod_rate, cooling_time,
+      reconf_matrix, repairs, nsi_schedule, total_nsi, can_parallel,
+      pen_reconf, pen_resource
+    (словари — только для чтения, списки — кортежи).
+    Плотные массивы по позициям aggs (все агрегаты в порядке стадий),
+    campaigns и days:
+      rate[a, k]             — т/сутки (0, если пары нет в prod_rate),
+      reconf_hours[a, k1, k2] — часы перевалки (0 на диагонали),
+      reconf_days[a, k1, k2]  — целых суток перевалки (часы // hours_per_day, как в build_model),
+      cooling[k]             — суток охлаждения,
+      repair_mask[a, t]      — ремонт агрегата в день,
+      nsi_total[k]           — суммарный НСИ-объём.
+    При сериализации (pickle) передаются только исходные данные,
+    массивы пересчитываются на приёмной стороне.
+    """
+
+    __slots__ = (
+        "campaigns", "stage_aggs", "days", "hours_per_day", "prod_rate",
+        "cooling_time", "reconf_matrix", "repairs", "nsi_schedule", "total_nsi",
+        "can_parallel", "pen_reconf", "pen_resource",
+        "aggs", "agg_index", "camp_index", "day_index",
+        "rate", "reconf_hours", "reconf_days", "cooling", "repair_mask", "nsi_total",
+    )
+
+    def __init__(self, campaigns, stage_aggs, days, hours_per_day, prod_rate,
+                 cooling_time, reconf_matrix, repairs, nsi_schedule,
+                 total_nsi=None, can_parallel=None,
+                 pen_reconf: float = 5.0, pen_resource: float = 2.0):
+        campaigns  = tuple(campaigns)
+        stage_aggs = {int(s): tuple(a) for s, a in stage_aggs.items()}
+        days       = tuple(int(t) for t in days)
+        nsi_schedule = {int(d): (k, v) for d, (k, v) in nsi_schedule.items()}
+        if total_nsi is None:
+            total_nsi = {k: 0 for k in campaigns}
+            for k, v in nsi_schedule.values():
+                total_nsi[k] += v
+        aggs = tuple(r for s in sorted(stage_aggs) for r in stage_aggs[s])
+
+        put = object.__setattr__
+        put(self, "campaigns",     campaigns)
+        put(self, "stage_aggs",    MappingProxyType(stage_aggs))
+        put(self, "days",          days)
+        put(self, "hours_per_day", int(hours_per_day))
+        put(self, "prod_rate",     MappingProxyType(dict(prod_rate)))
+        put(self, "cooling_time",  MappingProxyType(dict(cooling_time)))
+        put(self, "reconf_matrix", MappingProxyType(
+            {r: MappingProxyType(dict(m)) for r, m in reconf_matrix.items()}))
+        put(self, "repairs",       MappingProxyType(
+            {r: tuple(int(t) for t in ts) for r, ts in repairs.items()}))
+        put(self, "nsi_schedule",  MappingProxyType(nsi_schedule))
+        put(self, "total_nsi",     MappingProxyType(dict(total_nsi)))
+        put(self, "can_parallel",  MappingProxyType(dict(can_parallel or {})))
+        put(self, "pen_reconf",    float(pen_reconf))
+        put(self, "pen_resource",  float(pen_resource))
+
+        # Индексы и плотные массивы
+        put(self, "aggs",       aggs)
+        put(self, "agg_index",  MappingProxyType({r: i for i, r in enumerate(aggs)}))
+        put(self, "camp_index", MappingProxyType({k: i for i, k in enumerate(campaigns)}))
+        put(self, "day_index",  MappingProxyType({t: i for i, t in enumerate(days)}))
+
+        A, K, T = len(aggs), len(campaigns), len(days)
+        rate  = np.zeros((A, K))
+        hours = np.zeros((A, K, K))
+        mask  = np.zeros((A, T), dtype=bool)
+        for a, r in enumerate(aggs):
+            for ki, k in enumerate(campaigns):
+                rate[a, ki] = prod_rate.get((r, k), 0)
+                for k2i, k2 in enumerate(campaigns):
+                    if k != k2:
+                        hours[a, ki, k2i] = reconf_matrix[r][(k, k2)]
+            for t in repairs.get(r, ()):
+                if t in self.day_index:
+                    mask[a, self.day_index[t]] = True
+        put(self, "rate",         _frozen_array(rate))
+        put(self, "reconf_hours", _frozen_array(hours))
+        put(self, "reconf_days",  _frozen_array((hours // self.hours_per_day).astype(int)))
+        put(self, "cooling",      _frozen_array([cooling_time[k] for k in campaigns]))
+        put(self, "repair_mask",  _frozen_array(mask))
+        put(self, "nsi_total",    _frozen_array([float(total_nsi.get(k, 0)) for k in campaigns]))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ProblemInstance неизменяем, используйте replace()")
+
+    def __reduce__(self):
+        return (ProblemInstance.from_dict, (self.to_dict(),))
+
+    def __repr__(self) -> str:
+        return (f"ProblemInstance({len(self.stage_aggs)} стадий, {len(self.aggs)} агрегатов, "
+                f"{len(self.campaigns)} кампаний, {len(self.days)} дней)")
+
+    # --- Источники ---
+
+    @classmethod
+    def from_settings(cls, settings=None) -> "ProblemInstance":
+        """Снимок текущих значений модуля настроек (по умолчанию config.settings)."""
+        if settings is None:
+            import config.settings as settings
+        return cls(
+            campaigns=settings.campaigns, stage_aggs=settings.stage_aggs,
+            days=settings.days, hours_per_day=settings.hours_per_day,
+            prod_rate=settings.prod_rate, cooling_time=settings.cooling_time,
+            reconf_matrix=settings.reconf_matrix, repairs=settings.repairs,
+            nsi_schedule=settings.nsi_schedule, total_nsi=settings.total_nsi,
+            can_parallel=settings.can_parallel,
+            pen_reconf=settings.pen_reconf, pen_resource=settings.pen_resource,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ProblemInstance":
+        """
+        Из словаря формата to_dict (ключи — строки, как в JSON/YAML):
+          prod_rate     — {агрегат: {кампания: т/сутки}},
+          reconf_matrix — {агрегат: {k1: {k2: часы}}},
+          nsi_schedule  — {день: [кампания, тонны]}.
+        Вместо days можно задать horizon_days; total_nsi по умолчанию
+        считается по nsi_schedule.
+        """
+        days = data.get("days") or list(range(1, data["horizon_days"] + 1))
+        return cls(
+            campaigns=data["campaigns"],
+            stage_aggs=data["stage_aggs"],
+            days=days,
+            hours_per_day=data.get("hours_per_day", 24),
+            prod_rate={(r, k): v for r, row in data["prod_rate"].items()
+                       for k, v in row.items()},
+            cooling_time=data["cooling_time"],
+            reconf_matrix={r: {(k1, k2): h for k1, row in m.items() for k2, h in row.items()}
+                           for r, m in data["reconf_matrix"].items()},
+            repairs=data.get("repairs", {}),
+            nsi_schedule={d: tuple(v) for d, v in data["nsi_schedule"].items()},
+            total_nsi=data.get("total_nsi"),
+            can_parallel=data.get("can_parallel"),
+            pen_reconf=data.get("pen_reconf", 5.0),
+            pen_resource=data.get("pen_resource", 2.0),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "ProblemInstance":
+        """Из файла JSON или YAML (по расширению) в формате to_dict."""
+        with open(path, encoding="utf-8") as f:
+            if path.endswith((".yaml", ".yml")):
+                import yaml
+                return cls.from_dict(yaml.safe_load(f))
+            return cls.from_dict(json.load(f))
+
+    # --- Выгрузка и изменение ---
+
+    def to_dict(self) -> dict:
+        """Исходные данные в виде, пригодном для JSON/YAML (см. from_dict)."""
+        prod_rate: dict[str, dict[str, float]] = {}
+        for (r, k), v in self.prod_rate.items():
+            prod_rate.setdefault(r, {})[k] = v
+        reconf: dict[str, dict[str, dict[str, float]]] = {}
+        for r, m in self.reconf_matrix.items():
+            reconf[r] = {}
+            for (k1, k2), h in m.items():
+                reconf[r].setdefault(k1, {})[k2] = h
+        return {
+            "campaigns":     list(self.campaigns),
+            "stage_aggs":    {s: list(a) for s, a in self.stage_aggs.items()},
+            "days":          list(self.days),
+            "hours_per_day": self.hours_per_day,
+            "prod_rate":     prod_rate,
+            "cooling_time":  dict(self.cooling_time),
+            "reconf_matrix": reconf,
+            "repairs":       {r: list(ts) for r, ts in self.repairs.items()},
+            "nsi_schedule":  {d: list(v) for d, v in self.nsi_schedule.items()},
+            "total_nsi":     dict(self.total_nsi),
+            "can_parallel":  dict(self.can_parallel),
+            "pen_reconf":    self.pen_reconf,
+            "pen_resource":  self.pen_resource,
+        }
+
+    def save(self, path: str):
+        """В файл JSON или YAML (по расширению)."""
+        with open(path, "w", encoding="utf-8") as f:
+            if path.endswith((".yaml", ".yml")):
+                import yaml
+                yaml.safe_dump(self.to_dict(), f, allow_unicode=True, sort_keys=False)
+            else:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def replace(self, **changes) -> "ProblemInstance":
+        """
+        Копия с изменёнными полями (в тех же именах и форматах, что
+        у конструктора). Если меняется nsi_schedule, а total_nsi нет,
+        total_nsi пересчитывается.
+        """
+        fields = {
+            "campaigns": self.campaigns, "stage_aggs": self.stage_aggs, "days": self.days,
+            "hours_per_day": self.hours_per_day, "prod_rate": self.prod_rate,
+            "cooling_time": self.cooling_time, "reconf_matrix": self.reconf_matrix,
+            "repairs": self.repairs, "nsi_schedule": self.nsi_schedule,
+            "total_nsi": self.total_nsi, "can_parallel": self.can_parallel,
+            "pen_reconf": self.pen_reconf, "pen_resource": self.pen_resource,
+        }
+        if "nsi_schedule" in changes and "total_nsi" not in changes:
+            fields["total_nsi"] = None
+        fields.update(changes)
+        return ProblemInstance(**fields)
+
+    # --- Срезы массивов ---
+
+    def agg_positions(self, aggs) -> list[int]:
+        """Позиции агрегатов в aggs (строки rate, reconf_hours, repair_mask)."""
+        return [self.agg_index[r] for r in aggs]
+
+    def reconf_day_count(self, r: str, k1: str, k2: str) -> int:
+        """Целых суток перевалки k1→k2 на агрегате r (0 для k1 == k2)."""
+        return int(self.reconf_days[self.agg_index[r], self.camp_index[k1], self.camp_index[k2]])
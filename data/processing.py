@@ -1,17 +1,10 @@
-﻿# Здесь почти ничего не используется. Зачатки для перехода в часы
-import math
-
-from config.settings import (
-    nsi_schedule,
-    campaigns,
-    prod_rate,
-    cooling_time,
-    reconf_matrix,
-    hours_per_day,
-)
+﻿# Здесь почти ничего не используется. Зачатки для перехода в часы.
+# Функции получают данные параметрами (см. data/instance.py), а не из config.settings.
+from collections.abc import Mapping
 
 def build_schedule_h(
-    schedule_example: dict[int, tuple[str, float]]
+    schedule_example: dict[int, tuple[str, float]],
+    hours_per_day: int
 ) -> dict[int, tuple[str, float]]:
     """
     Переводит дневной план schedule_example в почасовой.
@@ -74,7 +67,7 @@ def build_reconf_pair(
 def group_events_by_days(
     schedule_by_hour: dict[tuple[str, int], str],
     prod_rate: dict[tuple[str, str], float],
-    reconf_h: dict[str, int],
+    reconf_h: dict[str, int | dict[tuple[str, str], int]],
     days: list[int],
     hours_per_day: int,
     resource: str
@@ -85,6 +78,8 @@ def group_events_by_days(
     Возвращает список дней, каждый день — список блоков вида
       {"type":"campaign","code":..., "hours":..., "tons":...}
     или {"type":"reconf","hours":...}.
+    reconf_h[resource] — длительность переналадки в часах: одна на агрегат
+    или по парам кампаний {(k1, k2): часы}.
     """
     events: list[list[dict]] = []
     total_hours = hours_per_day * len(days)
@@ -109,6 +104,8 @@ def group_events_by_days(
             # вставляем переналадку перед новой кампанией
             if current_campaign is not None:
                 left_reconf = reconf_h.get(resource, 0)
+                if isinstance(left_reconf, Mapping):
+                    left_reconf = left_reconf.get((current_campaign, campaign), 0)
                 while left_reconf > 0:
                     used = sum(e["hours"] for e in day) if day else 0
                     avail = hours_per_day - used
@@ -148,16 +145,10 @@ def group_events_by_days(
 
     return events
 
-# === Глобальные вычисления ===
-schedule_h     = build_schedule_h(nsi_schedule)
-total_stage1  = compute_total_stage1(schedule_h, campaigns)
-prod_rate_h    = compute_prod_rate_h(prod_rate, hours_per_day)
-cooling_time_h = compute_cooling_time_h(cooling_time, hours_per_day)
-#reconf_pairs   = build_reconf_pair(campaigns, min(reconf_matrix.values()))
-
 def count_reconfigurations(
     schedule: list[str],
-    reconf_matrix: dict[tuple[str, str], float]
+    reconf_matrix: dict[tuple[str, str], float],
+    campaigns: list[str]
 ) -> float:
     """
     Считает суммарное время переналадок по расписанию:
@@ -0,0 +1,132 @@
+# models/cpsat_model.py
+#
+# Та же суточная модель, что и build_model, для OR-Tools CP-SAT:
+# булевы x/y/u/z, переналадки — импликациями и дизъюнкциями вместо
+# линейных строк. CP-SAT работает с целыми коэффициентами, поэтому
+# тонны и цель масштабируются (см. TONS_SCALE, OBJ_SCALE).
+# OR-Tools — необязательная зависимость: модуль импортирует её лениво.
+
+from data.instance import ProblemInstance
+
+# Тонны умножаются на TONS_SCALE и округляются (точность 0.01 т),
+# коэффициенты цели — на OBJ_SCALE
+TONS_SCALE = 100
+OBJ_SCALE  = 100
+
+
+def cp_model_module():
+    """ortools.sat.python.cp_model или ImportError с подсказкой."""
+    try:
+        from ortools.sat.python import cp_model
+    except ImportError as e:
+        raise ImportError("Бэкенд cpsat требует OR-Tools: pip install ortools") from e
+    return cp_model
+
+
+def build_cpsat_model(days_horizon: list[int], inst: ProblemInstance | None = None):
+    """
+    Строит модель build_model(days_horizon) (pairwise-переналадки, баланс
+    в исходной форме, без init_state и отсечения симметрии) как CpModel.
+    Возвращает: m, x_vars, y_vars, u_vars, z_vars — словари BoolVar
+    тех же форм, что у build_model.
+    """
+    if inst is None:
+        inst = ProblemInstance.from_settings()
+    cp_model = cp_model_module()
+    days = list(days_horizon)
+    T = len(days)
+
+    def tons(v) -> int:
+        return int(round(v*TONS_SCALE))
+
+    m = cp_model.CpModel()
+    x_vars, y_vars, u_vars, z_vars = {}, {}, {}, {}
+    for stage, aggs in inst.stage_aggs.items():
+        x_vars[stage] = {r: {k: {t: m.NewBoolVar(f"x{stage}_{r}_{k}_{t}") for t in days}
+                             for k in inst.campaigns} for r in aggs}
+        y_vars[stage] = {r: {k1: {k2: {t: m.NewBoolVar(f"y{stage}_{r}_{k1}_{k2}_{t}")
+                                       for t in days[:-1]}
+                                  for k2 in inst.campaigns if k2 != k1}
+                             for k1 in inst.campaigns} for r in aggs}
+        u_vars[stage] = {r: m.NewBoolVar(f"u{stage}_{r}") for r in aggs}
+        z_vars[stage] = {r: {t: m.NewBoolVar(f"z{stage}_{r}_{t}") for t in days} for r in aggs}
+
+    for stage, aggs in inst.stage_aggs.items():
+        x, y, u, z = x_vars[stage], y_vars[stage], u_vars[stage], z_vars[stage]
+
+        # Последовательные агрегаты: кампания в день — на одном агрегате
+        seq_aggs = [r for r in aggs if not inst.can_parallel.get(r, False)]
+        if len(seq_aggs) > 1:
+            for k in inst.campaigns:
+                for t in days:
+                    m.AddAtMostOne(x[r][k][t] for r in seq_aggs)
+
+        for r in aggs:
+            rep = set(inst.repairs.get(r, ()))
+            for t in days:
+                # Одна кампания в день, не в день перевалки
+                m.AddAtMostOne([x[r][k][t] for k in inst.campaigns] + [z[r][t]])
+                if t in rep:
+                    m.Add(z[r][t] == 0)
+                    for k in inst.campaigns:
+                        m.Add(x[r][k][t] == 0)
+
+            # Смена k1→k2: y >= x[k1][t] + x[k2][t+1] - 1, перевалка z на days_req дней
+            for k1 in inst.campaigns:
+                for k2 in inst.campaigns:
+                    if k1 == k2:
+                        continue
+                    days_req = inst.reconf_day_count(r, k1, k2)
+                    for i, t in enumerate(days[:-1]):
+                        yv = y[r][k1][k2][t]
+                        m.AddBoolOr([x[r][k1][t].Not(), x[r][k2][days[i+1]].Not(), yv])
+                        for d in range(1, days_req + 1):
+                            if t + d in z[r]:
+                                m.AddImplication(yv, z[r][t + d])
+
+            # Запрет «нулевых» дней без перевалки
+            for i in range(1, T - 1):
+                tp, tc, tn = days[i-1], days[i], days[i+1]
+                if rep & {tp, tc, tn}:
+                    continue
+                m.Add(sum(x[r][k][tp] for k in inst.campaigns)
+                      + sum(x[r][k][tn] for k in inst.campaigns) <= z[r][tc] + 1)
+
+            # Использование агрегата
+            total_act = sum(x[r][k][t] for k in inst.campaigns for t in days)
+            m.Add(u[r] <= total_act)
+            m.Add(T*u[r] >= total_act)
+
+    # NSI и материальный баланс (охлаждение cooling_time)
+    for stage, aggs in inst.stage_aggs.items():
+        x = x_vars[stage]
+        for k in inst.campaigns:
+            if stage == 1:
+                m.Add(sum(tons(inst.prod_rate[(r, k)])*x[r][k][t] for r in aggs for t in days)
+                      <= tons(inst.total_nsi[k]))
+                continue
+            prev = inst.stage_aggs[stage - 1]
+            for t in days:
+                m.Add(
+                    sum(tons(inst.prod_rate[(r, k)])*x[r][k][tau]
+                        for r in aggs for tau in days if tau <= t)
+                    <= sum(tons(inst.prod_rate[(rp, k)])*x_vars[stage - 1][rp][k][tau]
+                           for rp in prev for tau in days if tau + inst.cooling_time[k] <= t)
+                )
+
+    # Цель: выпуск − штраф за перевалки − штраф за агрегаты (×OBJ_SCALE)
+    def coef(v) -> int:
+        return int(round(v*OBJ_SCALE))
+
+    m.Maximize(
+        sum(coef(inst.prod_rate[(r, k)])*x_vars[s][r][k][t]
+            for s, aggs in inst.stage_aggs.items() for r in aggs
+            for k in inst.campaigns for t in days)
+        - sum(coef(inst.pen_reconf*inst.reconf_matrix[r][(k1, k2)])*v
+              for s, aggs in inst.stage_aggs.items() for r in aggs
+              for k1, row in y_vars[s][r].items() for k2, by_t in row.items()
+              for v in by_t.values())
+        - sum(coef(inst.pen_resource)*u_vars[s][r]
+              for s, aggs in inst.stage_aggs.items() for r in aggs)
+    )
+    return m, x_vars, y_vars, u_vars, z_vars
@@ -0,0 +1,151 @@
+# models/hourly_model.py
+#
+# Модель в N-часовых интервалах (бакетах) вместо суток: перевалка
+# reconf_matrix занимает ceil(часы / N) бакетов простоя, а не
+# часы // hours_per_day дней, поэтому короткие перевалки не съедают сутки.
+
+import math
+from functools import reduce
+
+import pulp
+from pulp import LpProblem, LpMaximize
+
+import config.settings as cfg
+from data.instance import ProblemInstance
+from data.processing import compute_prod_rate_h, compute_cooling_time_h
+
+
+def bucket_size(hours_per_day: int | None = None,
+                inst: ProblemInstance | None = None) -> int:
+    """
+    Наибольший размер бакета в часах, при котором без округления
+    представимы сутки, все перевалки reconf_matrix и охлаждение
+    (сжатие шкалы: 24-часовые перевалки дают суточные бакеты,
+    6-часовые — 6-часовые, вместо почасовой сетки).
+    """
+    if inst is None:
+        inst = ProblemInstance.from_settings()
+    if hours_per_day is None:
+        hours_per_day = inst.hours_per_day
+    durations = [hours_per_day]
+    durations += [h for r in inst.reconf_matrix for h in inst.reconf_matrix[r].values() if h > 0]
+    durations += [h for h in compute_cooling_time_h(inst.cooling_time, hours_per_day).values()
+                  if h > 0]
+    return reduce(math.gcd, durations)
+
+
+def day_buckets(days: list[int], n_hours: int, hours_per_day: int) -> dict[int, list[int]]:
+    """Бакеты дня: {день: [номера бакетов]}, бакеты нумеруются с 1 от начала дня days[0]."""
+    per_day = hours_per_day // n_hours
+    return {t: [i*per_day + j + 1 for j in range(per_day)] for i, t in enumerate(days)}
+
+
+def build_hourly_model(days_horizon: list[int], n_hours: int | None = None,
+                       inst: ProblemInstance | None = None):
+    """
+    Модель на бакетах по n_hours часов (по умолчанию cfg.bucket_hours,
+    None — bucket_size()). x[stage][r][k][b] — агрегат r выпускает кампанию k
+    в бакете b. Смена k1→k2 требует ceil(reconf_matrix / n_hours) бакетов
+    простоя между ними: так как в бакете работает не больше одной кампании,
+    для каждых k2, b и d достаточно
+      x[k2][b] + Σ_{k1: перевалка k1→k2 ≥ d бакетов} x[k1][b-d] <= 1.
+    Перевалка стоит потерянной мощностью (бакетами простоя), отдельного
+    штрафа pen_reconf в цели нет. Материальный баланс — накопительный,
+    охлаждение в бакетах.
+    inst — данные задачи (по умолчанию ProblemInstance.from_settings()).
+    Возвращает: m, n_hours, buckets, x_vars, u_vars.
+    """
+    if inst is None:
+        inst = ProblemInstance.from_settings()
+    if n_hours is None:
+        n_hours = cfg.bucket_hours or bucket_size(inst=inst)
+    if inst.hours_per_day % n_hours:
+        raise ValueError(f"Размер бакета {n_hours} ч не делит сутки {inst.hours_per_day} ч")
+
+    by_day  = day_buckets(days_horizon, n_hours, inst.hours_per_day)
+    buckets = [b for t in days_horizon for b in by_day[t]]
+    rate_h  = compute_prod_rate_h(inst.prod_rate, inst.hours_per_day)
+    cool_b  = {k: math.ceil(h / n_hours)
+               for k, h in compute_cooling_time_h(inst.cooling_time, inst.hours_per_day).items()}
+
+    m = LpProblem("HourlyScheduling", LpMaximize)
+    stage_aggs = inst.stage_aggs
+    x_vars, u_vars = {}, {}
+    for stage, aggs in stage_aggs.items():
+        x_vars[stage] = pulp.LpVariable.dicts(
+            f"x{stage}", (aggs, inst.campaigns, buckets), cat="Binary"
+        )
+        u_vars[stage] = pulp.LpVariable.dicts(f"u{stage}", list(aggs), cat="Binary")
+
+    for stage, aggs in stage_aggs.items():
+        x, u = x_vars[stage], u_vars[stage]
+
+        # Последовательные агрегаты: одна кампания — один агрегат в бакете
+        seq_aggs = [r for r in aggs if not inst.can_parallel.get(r, False)]
+        if seq_aggs:
+            for k in inst.campaigns:
+                for b in buckets:
+                    m += (pulp.lpSum(x[r][k][b] for r in seq_aggs) <= 1,
+                          f"Stage{stage}_SequentialPerResource_{k}_{b}")
+
+        for r in aggs:
+            for b in buckets:
+                m += (pulp.lpSum(x[r][k][b] for k in inst.campaigns) <= 1,
+                      f"OneJob_stage{stage}_{r}_{b}")
+
+            # Ремонты блокируют все бакеты дня
+            for t in inst.repairs.get(r, []):
+                for b in by_day.get(t, []):
+                    for k in inst.campaigns:
+                        m += (x[r][k][b] == 0, f"Repair_stage{stage}_{r}_{k}_{b}")
+
+            # Простой на время перевалки
+            for k2 in inst.campaigns:
+                n_b = {k1: math.ceil(inst.reconf_matrix[r][(k1, k2)] / n_hours)
+                       for k1 in inst.campaigns if k1 != k2}
+                for i, b in enumerate(buckets):
+                    for d in range(1, min(max(n_b.values(), default=0), i) + 1):
+                        m += (
+                            x[r][k2][b] + pulp.lpSum(x[r][k1][buckets[i-d]]
+                                                     for k1 in n_b if n_b[k1] >= d) <= 1,
+                            f"Reconf_stage{stage}_{r}_to_{k2}_{b}_d{d}"
+                        )
+
+            total_act = pulp.lpSum(x[r][k][b] for k in inst.campaigns for b in buckets)
+            m += (u[r] <= total_act,                f"UseUpper_stage{stage}_{r}")
+            m += (u[r] >= total_act/len(buckets),   f"UseLower_stage{stage}_{r}")
+
+    # Накопительный материальный баланс в бакетах
+    cum = {
+        stage: pulp.LpVariable.dicts(f"cum{stage}", (inst.campaigns, buckets), lowBound=0)
+        for stage in stage_aggs
+    }
+    for stage, aggs in stage_aggs.items():
+        for k in inst.campaigns:
+            prev_b = None
+            for b in buckets:
+                produced = pulp.lpSum(x_vars[stage][r][k][b]*rate_h[(r, k)]*n_hours
+                                      for r in aggs)
+                m += (cum[stage][k][b] == (cum[stage][k][prev_b] if prev_b else 0) + produced,
+                      f"CumProd_stage{stage}_{k}_{b}")
+                prev_b = b
+            if stage == 1:
+                m += (cum[stage][k][buckets[-1]] <= inst.total_nsi[k], f"NSI_Limit_{k}")
+                continue
+            for i, b in enumerate(buckets):
+                j = i - cool_b[k]
+                if j < 0:
+                    m += (cum[stage][k][b] <= 0, f"MatBal_stage{stage}_{k}_{b}")
+                else:
+                    m += (cum[stage][k][b] <= cum[stage-1][k][buckets[j]],
+                          f"MatBal_stage{stage}_{k}_{b}")
+
+    obj_prod = pulp.lpSum(
+        x_vars[st][r][k][b]*rate_h[(r, k)]*n_hours
+        for st in stage_aggs for r in stage_aggs[st]
+        for k in inst.campaigns for b in buckets
+    )
+    obj_use = pulp.lpSum(u_vars[st][r] for st in stage_aggs for r in stage_aggs[st])
+    m += obj_prod - inst.pen_resource*obj_use
+
+    return m, n_hours, buckets, x_vars, u_vars
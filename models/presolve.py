@@ -0,0 +1,140 @@
+# models/presolve.py
+#
+# Предрешение build_model на стороне Python: переменные, равные нулю в
+# любом допустимом решении (или обнуляемые без потери цели), не создаются
+# вовсе — вместо них в словарях x/y/z стоит 0, а строки, ставшие
+# тождественно выполненными, в модель не попадают.
+
+import math
+
+import pulp
+from pulp import LpProblem, LpConstraint
+
+from data.instance import ProblemInstance
+
+
+class ZeroSets:
+    """
+    Индексы нулевых переменных build_model на горизонте days:
+      x[r][k][t] — ремонт агрегата в день t; prod_rate[r, k] == 0 (выпуск
+                   не даёт тонн, обнуление не ухудшает цель); кампании нет
+                   в НСИ; материал стадии s ещё не мог дойти до дня t
+                   (раньше первого дня предыдущей стадии + охлаждение) —
+                   последние два правила не действуют, если в init_state
+                   есть выпуск кампании;
+      z[r][t]    — ремонт;
+      y[r][k1][k2][t] — нулевой x[k1][t] или x[k2][t+1] (смена невозможна),
+                   либо день перевалки t+d приходится на ремонт (z = 0 там
+                   запрещает смену; строка Reconf становится
+                   x[k1][t] + x[k2][t+1] <= 1, TagReconf не строятся).
+    """
+
+    def __init__(self, days: list[int], inst: ProblemInstance,
+                 stage_aggs: dict[int, list[str]], init_state: dict | None = None):
+        self.days = list(days)
+        self.inst = inst
+        day_set = set(self.days)
+        produced = (init_state or {}).get("produced", {})
+        has_history = {k for per_k in produced.values() for k, hist in per_k.items() if hist}
+
+        # Первый день, с которого стадия может работать кампанию k
+        # (inf — не может вовсе, -inf — есть выпуск в init_state)
+        earliest: dict[int, dict[str, float]] = {}
+        for stage in sorted(inst.stage_aggs):
+            earliest[stage] = {}
+            for k in inst.campaigns:
+                if k in has_history:
+                    e = -math.inf
+                elif stage == 1:
+                    e = self.days[0] if inst.total_nsi.get(k, 0) > 0 and self.days else math.inf
+                elif all(inst.prod_rate.get((r, k), 0) <= 0 for r in inst.stage_aggs[stage - 1]):
+                    e = math.inf
+                else:
+                    e = earliest[stage - 1][k] + inst.cooling_time[k]
+                earliest[stage][k] = e
+
+        self.x_zero: set[tuple[str, str, int]] = set()
+        self.z_zero: set[tuple[str, int]] = set()
+        for stage, aggs in stage_aggs.items():
+            for r in aggs:
+                rep = set(inst.repairs.get(r, ())) & day_set
+                self.z_zero.update((r, t) for t in rep)
+                for k in inst.campaigns:
+                    dead_k = inst.prod_rate.get((r, k), 0) <= 0
+                    for t in self.days:
+                        if dead_k or t in rep or t < earliest[stage][k]:
+                            self.x_zero.add((r, k, t))
+
+    def x(self, r: str, k: str, t: int) -> bool:
+        return (r, k, t) in self.x_zero
+
+    def z(self, r: str, t: int) -> bool:
+        return (r, t) in self.z_zero
+
+    def y(self, r: str, k1: str, k2: str, t: int) -> bool:
+        if k1 == k2:
+            return False
+        if (r, k1, t) in self.x_zero or (r, k2, t + 1) in self.x_zero:
+            return True
+        days_req = self.inst.reconf_matrix[r][(k1, k2)] // self.inst.hours_per_day
+        return any((r, t + d) in self.z_zero for d in range(1, days_req + 1))
+
+
+def var_dicts(name: str, indices: tuple, is_zero=None, **kwargs) -> dict:
+    """
+    Как pulp.LpVariable.dicts(name, indices, ...), но для индексов, где
+    is_zero(*индекс) истинно, вместо переменной стоит 0.
+    """
+    if is_zero is None:
+        return pulp.LpVariable.dicts(name, indices, **kwargs)
+
+    def build(prefix: str, idx: tuple, rest: tuple):
+        if not rest:
+            return 0 if is_zero(*idx) else pulp.LpVariable(prefix, **kwargs)
+        return {i: build(f"{prefix}_{i}", idx + (i,), rest[1:]) for i in rest[0]}
+
+    return build(name, (), tuple(indices))
+
+
+def _redundant(c: LpConstraint) -> bool:
+    """Строка выполнена при любых значениях переменных в их границах."""
+    lo = hi = c.constant
+    for v, a in c.items():
+        lb = v.lowBound if v.lowBound is not None else -math.inf
+        ub = v.upBound if v.upBound is not None else math.inf
+        lo += a*lb if a > 0 else a*ub
+        hi += a*ub if a > 0 else a*lb
+    eps = 1e-9
+    if c.sense == pulp.LpConstraintLE:
+        return hi <= eps
+    if c.sense == pulp.LpConstraintGE:
+        return lo >= -eps
+    return -eps <= lo and hi <= eps
+
+
+class PresolvedProblem(LpProblem):
+    """
+    LpProblem, который не принимает строки, выполненные при любых значениях
+    переменных (все слагаемые обнулены предрешением или строка следует из
+    границ), и считает их в rows_removed. Строка без переменных, которая
+    не выполняется, остаётся: решатель сообщит о недопустимости.
+    """
+
+    def __init__(self, name: str = "NoName", sense=pulp.LpMinimize):
+        super().__init__(name, sense)
+        self.rows_removed = 0
+        self.presolve_stats: dict | None = None
+
+    def __iadd__(self, other):
+        c = other[0] if isinstance(other, tuple) else other
+        if c is True or (isinstance(c, LpConstraint) and _redundant(c)):
+            self.rows_removed += 1
+            return self
+        return super().__iadd__(other)
+
+
+def count_zeros(tree) -> int:
+    """Число нулей-заглушек в листьях вложенного словаря переменных."""
+    if isinstance(tree, dict):
+        return sum(count_zeros(v) for v in tree.values())
+    return int(isinstance(tree, int) and tree == 0)
@@ -1,37 +1,131 @@
 ﻿# models/rolling_model.py
 
+import bisect
+
 import pulp
 from pulp import LpProblem, LpMaximize
 import config.settings as cfg
+from data.instance import ProblemInstance
+from models.presolve import ZeroSets, PresolvedProblem, var_dicts, count_zeros
 
-def build_model(days_horizon: list[int]):
+def _shifted_day(days_horizon: list[int], t: int, shift: int) -> int | None:
+    """
+    Последний день горизонта tau, для которого tau + shift <= t
+    (None, если такого дня нет).
+    """
+    i = bisect.bisect_right(days_horizon, t - shift)
+    return days_horizon[i-1] if i > 0 else None
+
+
+def _history(init_state: dict | None, stage: int, k: str,
+             start: int | None) -> dict[int, float]:
+    """
+    Зафиксированный выпуск стадии по кампании k в дни до start: {tau: тонны}.
+    start=None — весь известный выпуск (стадия не входит в модель).
+    """
+    if not init_state:
+        return {}
+    produced = init_state.get("produced", {}).get(stage, {}).get(k, {})
+    return {tau: v for tau, v in produced.items() if start is None or tau < start}
+
+
+def build_model(days_horizon: list[int],
+                matbal_form: str | None = None,
+                init_state: dict | None = None,
+                stages: list[int] | None = None,
+                changeover: str | None = None,
+                symmetry: str | None = None,
+                inst: ProblemInstance | None = None,
+                presolve: bool | None = None):
     """
     Гибкая модель планирования для произвольного числа стадий и агрегатов.
     days_horizon: список дней.
-    Возвращает: m, x_vars, y_vars, u_vars, z_vars
+    matbal_form:  формулировка материального баланса
+                  "direct"     — каждая строка пересуммирует все x до дня t (O(T²) ненулей),
+                  "cumulative" — накопительные переменные выпуска cum[stage][k][t],
+                                 строка баланса содержит O(1) слагаемых по времени.
+                  По умолчанию берётся cfg.matbal_form.
+    init_state:   состояние на начало горизонта, если он продолжает уже
+                  зафиксированный план (см. initial_state_from_values):
+                  выпуск по стадиям до начала, работа агрегатов в последние
+                  дни и незавершённые перевалки.
+    stages:       подмножество стадий inst.stage_aggs (по умолчанию все).
+                  Если стадия s-1 не входит в модель, материал для стадии s
+                  берётся константами из init_state["produced"][s-1]
+                  (весь выпуск, включая дни горизонта).
+    changeover:   формулировка переналадок
+                  "pairwise" — y[r][k1][k2][t] на каждую пару кампаний (K²·T бинарных),
+                  "compact"  — запрет смены «день в день» при перевалке от суток
+                               и непрерывная стоимость смены c[r][t] (O(K·T) строк,
+                               O(T) переменных); y_vars тогда пусты, смены
+                               восстанавливаются по x (switch_values).
+                  По умолчанию берётся cfg.changeover.
+    symmetry:     отсечение симметрии взаимозаменяемых агрегатов стадии
+                  (см. aggregate_classes): "load" — загрузка по убыванию,
+                  "usage" — u по убыванию, "none" — без отсечения.
+                  По умолчанию берётся cfg.symmetry_breaking.
+    inst:         данные задачи (по умолчанию ProblemInstance.from_settings()).
+    presolve:     не создавать переменные, равные нулю в любом решении или
+                  обнуляемые без потери цели (models.presolve.ZeroSets: ремонты,
+                  нулевая производительность, материал ещё не дошёл, смены через
+                  ремонт) — в словарях x/y/z на их месте 0 — и не добавлять
+                  тождественно выполненные строки; m.presolve_stats — сколько
+                  столбцов и строк исключено. По умолчанию cfg.presolve.
+    Возвращает: m, x_vars, y_vars, u_vars, z_vars (только по стадиям stages)
     """
-    m = LpProblem("RollingScheduling", LpMaximize)
+    if matbal_form is None:
+        matbal_form = cfg.matbal_form
+    if matbal_form not in ("direct", "cumulative"):
+        raise ValueError(f"Неизвестная формулировка баланса: {matbal_form}")
+    if changeover is None:
+        changeover = cfg.changeover
+    if changeover not in ("pairwise", "compact"):
+        raise ValueError(f"Неизвестная формулировка переналадок: {changeover}")
+    if symmetry is None:
+        symmetry = cfg.symmetry_breaking
+    if symmetry not in ("none", "load", "usage"):
+        raise ValueError(f"Неизвестное отсечение симметрии: {symmetry}")
+    if inst is None:
+        inst = ProblemInstance.from_settings()
+    if presolve is None:
+        presolve = cfg.presolve
 
-    # 1) Создаём переменные для каждой стадии из cfg.stage_aggs
-    stage_aggs = cfg.stage_aggs  # e.g. {1:rolling1,2:rolling2,3:rolling3,4:rolling4}
+    # 1) Создаём переменные для каждой стадии из inst.stage_aggs
+    stage_aggs = inst.stage_aggs  # e.g. {1:rolling1,2:rolling2,3:rolling3,4:rolling4}
+    if stages is not None:
+        stage_aggs = {s: stage_aggs[s] for s in stages}
+    if presolve:
+        m = PresolvedProblem("RollingScheduling", LpMaximize)
+        zero = ZeroSets(days_horizon, inst, stage_aggs, init_state)
+    else:
+        m = LpProblem("RollingScheduling", LpMaximize)
+        zero = None
     x_vars = {}
     y_vars = {}
     u_vars = {}
     z_vars = {}
+    c_vars = {}
     for stage, aggs in stage_aggs.items():
-        x_vars[stage] = pulp.LpVariable.dicts(
-            f"x{stage}", (aggs, cfg.campaigns, days_horizon),
-            lowBound=0, upBound=1, cat="Binary"
-        )
-        y_vars[stage] = pulp.LpVariable.dicts(
-            f"y{stage}", (aggs, cfg.campaigns, cfg.campaigns, days_horizon[:-1]),
+        x_vars[stage] = var_dicts(
+            f"x{stage}", (aggs, inst.campaigns, days_horizon), zero.x if zero else None,
             lowBound=0, upBound=1, cat="Binary"
         )
+        if changeover == "compact":
+            y_vars[stage] = {}
+            c_vars[stage] = pulp.LpVariable.dicts(
+                f"c{stage}", (aggs, days_horizon[:-1]), lowBound=0
+            )
+        else:
+            y_vars[stage] = var_dicts(
+                f"y{stage}", (aggs, inst.campaigns, inst.campaigns, days_horizon[:-1]),
+                zero.y if zero else None, lowBound=0, upBound=1, cat="Binary"
+            )
         u_vars[stage] = pulp.LpVariable.dicts(
-            f"u{stage}", aggs, lowBound=0, upBound=1, cat="Binary"
+            f"u{stage}", list(aggs), lowBound=0, upBound=1, cat="Binary"
         )
-        z_vars[stage] = pulp.LpVariable.dicts(
-            f"z{stage}", (aggs, days_horizon), lowBound=0, upBound=1, cat="Binary"
+        z_vars[stage] = var_dicts(
+            f"z{stage}", (aggs, days_horizon), zero.z if zero else None,
+            lowBound=0, upBound=1, cat="Binary"
         )
 
     # 2) Общие ограничения для всех стадий
@@ -42,9 +136,9 @@ def build_model(days_horizon: list[int]):
         z = z_vars[stage]
 
         # 2.0. Последовательность vs параллельность на уровне ресурса
-        seq_aggs = [r for r in aggs if not cfg.can_parallel.get(r, False)]
+        seq_aggs = [r for r in aggs if not inst.can_parallel.get(r, False)]
         if seq_aggs:
-            for k in cfg.campaigns:
+            for k in inst.campaigns:
                 for t in days_horizon:
                     m += (
                         pulp.lpSum(x[r][k][t] for r in seq_aggs) <= 1,
@@ -55,38 +149,43 @@ def build_model(days_horizon: list[int]):
             # 2.1. Не более одной кампании на агрегат в день
             for t in days_horizon:
                 m += (
-                    pulp.lpSum(x[r][k][t] for k in cfg.campaigns) <= 1,
+                    pulp.lpSum(x[r][k][t] for k in inst.campaigns) <= 1,
                     f"OneJob_stage{stage}_{r}_{t}"
                 )
 
-            # 2.2. Ремонты блокируют и x, и z
-            for t in cfg.repairs.get(r, []):
-                for k in cfg.campaigns:
+            # 2.2. Ремонты блокируют и x, и z (ремонты вне горизонта пропускаем)
+            for t in inst.repairs.get(r, []):
+                if t not in z[r]:
+                    continue
+                for k in inst.campaigns:
                     m += (x[r][k][t] == 0, f"Repair_stage{stage}_{r}_{k}_{t}")
                 m += (z[r][t] == 0,    f"NoReconfOnRepair_stage{stage}_{r}_{t}")
 
             # 2.3. Фиксация смены кампании + тэг перевалки
-            for k1 in cfg.campaigns:
-                for k2 in cfg.campaigns:
-                    if k1 == k2: continue
-                    for t in days_horizon[:-1]:
-                        # смена
-                        m += (
-                            y[r][k1][k2][t] >= x[r][k1][t] + x[r][k2][t+1] - 1,
-                            f"Reconf_stage{stage}_{r}_{k1}_to_{k2}_{t}"
-                        )
-                        # длительность
-                        days_req = cfg.reconf_matrix[r][(k1, k2)] // cfg.hours_per_day
-                        for d in range(1, days_req+1):
-                            if (t+d) in days_horizon:
-                                m += (
-                                    z[r][t+d] >= y[r][k1][k2][t],
-                                    f"TagReconf_stage{stage}_{r}_{k1}_{k2}_{t}_d{d}"
-                                )
+            if changeover == "compact":
+                _add_compact_changeover(m, days_horizon, stage, r, x[r], c_vars[stage][r], inst)
+            else:
+                for k1 in inst.campaigns:
+                    for k2 in inst.campaigns:
+                        if k1 == k2: continue
+                        for t in days_horizon[:-1]:
+                            # смена
+                            m += (
+                                y[r][k1][k2][t] >= x[r][k1][t] + x[r][k2][t+1] - 1,
+                                f"Reconf_stage{stage}_{r}_{k1}_to_{k2}_{t}"
+                            )
+                            # длительность
+                            days_req = inst.reconf_matrix[r][(k1, k2)] // inst.hours_per_day
+                            for d in range(1, days_req+1):
+                                if (t+d) in days_horizon:
+                                    m += (
+                                        z[r][t+d] >= y[r][k1][k2][t],
+                                        f"TagReconf_stage{stage}_{r}_{k1}_{k2}_{t}_d{d}"
+                                    )
 
             # 2.4. Запрет работы в день перевалки
             for t in days_horizon:
-                for k in cfg.campaigns:
+                for k in inst.campaigns:
                     m += (
                         x[r][k][t] <= 1 - z[r][t],
                         f"NoJobOnReconf_stage{stage}_{r}_{k}_{t}"
@@ -95,69 +194,388 @@ def build_model(days_horizon: list[int]):
             # 2.5. Запрет “нулевых” дней без перевалки
             for idx in range(1, len(days_horizon)-1):
                 tp, tc, tn = days_horizon[idx-1], days_horizon[idx], days_horizon[idx+1]
-                if any(d in cfg.repairs.get(r, []) for d in (tp,tc,tn)):
+                if any(d in inst.repairs.get(r, []) for d in (tp,tc,tn)):
                     continue
-                left  = pulp.lpSum(x[r][k][tp] for k in cfg.campaigns)
-                right = pulp.lpSum(x[r][k][tn] for k in cfg.campaigns)
+                left  = pulp.lpSum(x[r][k][tp] for k in inst.campaigns)
+                right = pulp.lpSum(x[r][k][tn] for k in inst.campaigns)
                 m += (
                     left + right <= z[r][tc] + 1,
                     f"NoIdle_stage{stage}_{r}_{tc}"
                 )
 
             # 2.6. Использование агрегата
-            total_act = pulp.lpSum(x[r][k][t] for k in cfg.campaigns for t in days_horizon)
+            total_act = pulp.lpSum(x[r][k][t] for k in inst.campaigns for t in days_horizon)
             m += (u[r] <= total_act,                f"UseUpper_stage{stage}_{r}")
             m += (u[r] >= total_act/len(days_horizon), f"UseLower_stage{stage}_{r}")
 
-    # 3) Специфичные для стадии ограничения
-    for stage, aggs in stage_aggs.items():
+    # 2.7. Стык с зафиксированным прошлым
+    if init_state:
+        _add_initial_state(m, days_horizon, x_vars, z_vars, init_state, inst)
+
+    # 2.8. Отсечение симметрии взаимозаменяемых агрегатов
+    if symmetry != "none":
+        for stage, aggs in stage_aggs.items():
+            for cls in aggregate_classes(aggs, stage, init_state, inst):
+                for r1, r2 in zip(cls, cls[1:]):
+                    if symmetry == "usage":
+                        lhs, rhs = u_vars[stage][r1], u_vars[stage][r2]
+                    else:
+                        lhs, rhs = (pulp.lpSum(x_vars[stage][r][k][t]
+                                               for k in inst.campaigns for t in days_horizon)
+                                    for r in (r1, r2))
+                    m += (lhs >= rhs, f"Symmetry_stage{stage}_{r1}_{r2}")
+
+    # 3) Специфичные для стадии ограничения: NSI и материал-баланс
+    if matbal_form == "cumulative":
+        _add_cumulative_balance(m, days_horizon, x_vars, init_state, inst)
+    else:
+        _add_direct_balance(m, days_horizon, x_vars, init_state, inst)
+
+    # 4) Целевая функция (как было)
+    obj_prod = pulp.lpSum(
+        x_vars[s][r][k][t]*inst.prod_rate[(r,k)]
+        for s in stage_aggs for r in stage_aggs[s]
+        for k in inst.campaigns for t in days_horizon
+    )
+    if changeover == "compact":
+        obj_conf = pulp.lpSum(
+            c_vars[s][r][t]
+            for s in stage_aggs for r in stage_aggs[s]
+            for t in days_horizon[:-1]
+        )
+    else:
+        obj_conf = pulp.lpSum(
+            y_vars[s][r][k1][k2][t]*inst.reconf_matrix[r][(k1,k2)]
+            for s in stage_aggs for r in stage_aggs[s]
+            for k1 in inst.campaigns for k2 in inst.campaigns if k1!=k2
+            for t in days_horizon[:-1]
+        )
+    obj_use = pulp.lpSum(
+        u_vars[s][r]
+        for s in stage_aggs for r in stage_aggs[s]
+    )
+    m += obj_prod - inst.pen_reconf*obj_conf - inst.pen_resource*obj_use
+
+    if presolve:
+        m.presolve_stats = {
+            "cols_removed": sum(count_zeros(v) for v in (x_vars, y_vars, z_vars)),
+            "rows_removed": m.rows_removed,
+        }
+
+    # 5) Возвращаем универсальные словари
+    return m, x_vars, y_vars, u_vars, z_vars
+
+
+def _add_direct_balance(m: LpProblem, days_horizon: list[int], x_vars: dict,
+                        init_state: dict | None, inst: ProblemInstance):
+    """
+    NSI-лимит и материальный баланс в исходной форме: каждая строка MatBal
+    пересуммирует весь выпуск стадии и предыдущей стадии до дня t.
+    Выпуск до начала горизонта из init_state входит константами.
+    """
+    start = days_horizon[0]
+    for stage in x_vars:
+        aggs = inst.stage_aggs[stage]
         x = x_vars[stage]
 
         if stage == 1:
             # NSI-ограничение
-            for k in cfg.campaigns:
+            for k in inst.campaigns:
+                done = sum(_history(init_state, stage, k, start).values())
                 m += (
-                    pulp.lpSum(x[r][k][t]*cfg.prod_rate[(r,k)]
+                    pulp.lpSum(x[r][k][t]*inst.prod_rate[(r,k)]
                                for r in aggs for t in days_horizon)
-                    <= cfg.total_nsi[k],
+                    <= inst.total_nsi[k] - done,
                     f"NSI_Limit_{k}"
                 )
         else:
             # Материал-баланс с предыдущей стадии
-            prev = stage_aggs[stage-1]
-            for k in cfg.campaigns:
+            # (нет в модели — её выпуск целиком из init_state)
+            modeled = stage-1 in x_vars
+            prev = inst.stage_aggs[stage-1] if modeled else []
+            for k in inst.campaigns:
+                done      = sum(_history(init_state, stage, k, start).values())
+                prev_hist = _history(init_state, stage-1, k, start if modeled else None)
                 for t in days_horizon:
                     prod  = pulp.lpSum(
-                        x[r][k][tau]*cfg.prod_rate[(r,k)]
+                        x[r][k][tau]*inst.prod_rate[(r,k)]
                         for r in aggs for tau in days_horizon if tau <= t
-                    )
+                    ) + done
                     avail = pulp.lpSum(
-                        x_vars[stage-1][r_prev][k][tau]*cfg.prod_rate[(r_prev,k)]
+                        x_vars[stage-1][r_prev][k][tau]*inst.prod_rate[(r_prev,k)]
                         for r_prev in prev for tau in days_horizon
-                        if tau + cfg.cooling_time[k] <= t
-                    )
+                        if tau + inst.cooling_time[k] <= t
+                    ) + sum(v for tau, v in prev_hist.items()
+                            if tau + inst.cooling_time[k] <= t)
                     m += (
                         prod <= avail,
                         f"MatBal_stage{stage}_{k}_{t}"
                     )
 
-    # 4) Целевая функция (как было)
-    obj_prod = pulp.lpSum(
-        x_vars[s][r][k][t]*cfg.prod_rate[(r,k)]
-        for s in stage_aggs for r in stage_aggs[s]
-        for k in cfg.campaigns for t in days_horizon
-    )
-    obj_conf = pulp.lpSum(
-        y_vars[s][r][k1][k2][t]*cfg.reconf_matrix[r][(k1,k2)]
-        for s in stage_aggs for r in stage_aggs[s]
-        for k1 in cfg.campaigns for k2 in cfg.campaigns if k1!=k2
-        for t in days_horizon[:-1]
-    )
-    obj_use = pulp.lpSum(
-        u_vars[s][r]
-        for s in stage_aggs for r in stage_aggs[s]
-    )
-    m += obj_prod - cfg.pen_reconf*obj_conf - cfg.pen_resource*obj_use
 
-    # 5) Возвращаем универсальные словари
-    return m, x_vars, y_vars, u_vars, z_vars
+def _add_cumulative_balance(m: LpProblem, days_horizon: list[int], x_vars: dict,
+                            init_state: dict | None, inst: ProblemInstance):
+    """
+    NSI-лимит и материальный баланс через накопительные переменные:
+      cum[s][k][t] = cum[s][k][t-1] + Σ_r prod_rate[r,k]·x[s][r][k][t],
+      cum[s][k][t] <= cum[s-1][k][t - cooling_time[k]].
+    Каждая строка баланса содержит две переменные вместо O(aggs·T) слагаемых.
+    cum включает выпуск до начала горизонта из init_state.
+    """
+    start = days_horizon[0]
+    cum_vars = {
+        stage: pulp.LpVariable.dicts(
+            f"cum{stage}", (inst.campaigns, days_horizon), lowBound=0
+        )
+        for stage in x_vars
+    }
+
+    for stage in x_vars:
+        aggs = inst.stage_aggs[stage]
+        x   = x_vars[stage]
+        cum = cum_vars[stage]
+        for k in inst.campaigns:
+            done = sum(_history(init_state, stage, k, start).values())
+            prev_t = None
+            for t in days_horizon:
+                produced = pulp.lpSum(x[r][k][t]*inst.prod_rate[(r,k)] for r in aggs)
+                if prev_t is None:
+                    m += (cum[k][t] == produced + done, f"CumProd_stage{stage}_{k}_{t}")
+                else:
+                    m += (
+                        cum[k][t] == cum[k][prev_t] + produced,
+                        f"CumProd_stage{stage}_{k}_{t}"
+                    )
+                prev_t = t
+
+            if stage == 1:
+                # NSI-ограничение: накопленный выпуск к концу горизонта
+                m += (cum[k][days_horizon[-1]] <= inst.total_nsi[k], f"NSI_Limit_{k}")
+                continue
+
+            # Материал-баланс: выпуск до t не больше остывшего выпуска предыдущей стадии
+            # (нет в модели — её выпуск целиком из init_state)
+            prev_cum  = cum_vars.get(stage-1)
+            prev_hist = _history(init_state, stage-1, k,
+                                 start if prev_cum is not None else None)
+            for t in days_horizon:
+                tau = _shifted_day(days_horizon, t, inst.cooling_time[k])
+                if tau is None or prev_cum is None:
+                    arrived = sum(v for tau_h, v in prev_hist.items()
+                                  if tau_h + inst.cooling_time[k] <= t)
+                    m += (cum[k][t] <= arrived, f"MatBal_stage{stage}_{k}_{t}")
+                else:
+                    m += (cum[k][t] <= prev_cum[k][tau], f"MatBal_stage{stage}_{k}_{t}")
+
+    return cum_vars
+
+
+def aggregate_classes(aggs: list[str], stage: int,
+                      init_state: dict | None = None,
+                      inst: ProblemInstance | None = None) -> list[list[str]]:
+    """
+    Классы взаимозаменяемых агрегатов стадии (по два и больше): совпадают
+    prod_rate и reconf_matrix по всем кампаниям, can_parallel, ремонты
+    и состояние на стыке из init_state. Перестановка расписаний внутри
+    класса даёт допустимое решение с той же целью.
+    """
+    if inst is None:
+        inst = ProblemInstance.from_settings()
+    def key(r):
+        past = init_state or {}
+        return (
+            tuple(inst.prod_rate.get((r, k), 0) for k in inst.campaigns),
+            tuple(inst.reconf_matrix[r].get((k1, k2), 0)
+                  for k1 in inst.campaigns for k2 in inst.campaigns if k1 != k2),
+            inst.can_parallel.get(r, False),
+            tuple(sorted(inst.repairs.get(r, []))),
+            tuple(sorted(past.get("tail", {}).get(stage, {}).get(r, {}).items())),
+            past.get("z_prev", {}).get(stage, {}).get(r, 0),
+            past.get("reconf_until", {}).get(stage, {}).get(r),
+        )
+
+    classes: dict[tuple, list[str]] = {}
+    for r in aggs:
+        classes.setdefault(key(r), []).append(r)
+    return [cls for cls in classes.values() if len(cls) > 1]
+
+
+def _add_compact_changeover(m: LpProblem, days_horizon: list[int], stage: int, r: str,
+                            x: dict, c: dict, inst: ProblemInstance):
+    """
+    Переналадки агрегата r без переменных на пару кампаний.
+    В парной формулировке смена k1→k2 «день в день» с перевалкой от суток
+    недопустима (TagReconf ставит z на день работы k2), а более короткая
+    стоит reconf_matrix часов. Поскольку в день работает не больше одной
+    кампании, для каждой k2 и дня t достаточно:
+      x[k2][t+1] + Σ_{k1: перевалка ≥ суток} x[k1][t] <= 1,
+      c[t] >= Σ_{k1: перевалка < суток} часы(k1,k2)·x[k1][t] - M·(1 - x[k2][t+1]),
+    где M — максимум этих часов; c[t] — часы смены между t и t+1 (штрафуется в цели).
+    """
+    for k2 in inst.campaigns:
+        long_from, short_from = [], []
+        for k1 in inst.campaigns:
+            if k1 == k2:
+                continue
+            hours = inst.reconf_matrix[r][(k1, k2)]
+            if hours // inst.hours_per_day >= 1:
+                long_from.append(k1)
+            elif hours > 0:
+                short_from.append((k1, hours))
+        big = max((h for _, h in short_from), default=0)
+
+        for t in days_horizon[:-1]:
+            if long_from:
+                m += (
+                    x[k2][t+1] + pulp.lpSum(x[k1][t] for k1 in long_from) <= 1,
+                    f"NoSwitch_stage{stage}_{r}_to_{k2}_{t}"
+                )
+            if short_from:
+                m += (
+                    c[t] >= pulp.lpSum(h*x[k1][t] for k1, h in short_from)
+                            - big*(1 - x[k2][t+1]),
+                    f"SwitchCost_stage{stage}_{r}_to_{k2}_{t}"
+                )
+
+
+def switch_values(days_horizon: list[int], x_vals: dict,
+                  inst: ProblemInstance | None = None) -> dict:
+    """
+    y по значениям x (переменные или числа): 1, если агрегат сменил
+    кампанию k1 на k2 между соседними днями. Нужна для changeover="compact",
+    где y в модели нет.
+    """
+    if inst is None:
+        inst = ProblemInstance.from_settings()
+    y_vals = {}
+    for stage in x_vals:
+        y_vals[stage] = {}
+        for r in x_vals[stage]:
+            x = {k: {t: pulp.value(x_vals[stage][r][k][t]) or 0 for t in days_horizon}
+                 for k in inst.campaigns}
+            y_vals[stage][r] = {
+                k1: {k2: {t: int(k1 != k2 and x[k1][t] > 0.5 and x[k2][t+1] > 0.5)
+                          for t in days_horizon[:-1]}
+                     for k2 in inst.campaigns}
+                for k1 in inst.campaigns
+            }
+    return y_vals
+
+
+def objective_value(days_horizon: list[int], x_vals: dict, y_vals: dict, u_vals: dict,
+                    inst: ProblemInstance | None = None) -> float:
+    """
+    Значение целевой функции build_model на готовых значениях x/y/u
+    (вложенные словари как у build_model, числа 0/1) — для сравнения
+    планов, собранных не из одной модели.
+    """
+    if inst is None:
+        inst = ProblemInstance.from_settings()
+    prod = conf = use = 0.0
+    for s in x_vals:
+        for r in x_vals[s]:
+            use += u_vals[s][r]
+            for k in inst.campaigns:
+                prod += sum(x_vals[s][r][k][t] for t in days_horizon)*inst.prod_rate[(r,k)]
+                for k2 in inst.campaigns:
+                    if k2 != k:
+                        conf += sum(y_vals[s][r][k][k2][t]
+                                    for t in days_horizon[:-1])*inst.reconf_matrix[r][(k,k2)]
+    return prod - inst.pen_reconf*conf - inst.pen_resource*use
+
+
+def _add_initial_state(m: LpProblem, days_horizon: list[int],
+                       x_vars: dict, z_vars: dict, init_state: dict,
+                       inst: ProblemInstance):
+    """
+    Ограничения на стыке с зафиксированными днями до начала горизонта:
+      — смена кампании с последнего рабочего дня без перевалки запрещена
+        (как Reconf + TagReconf + NoJobOnReconf внутри горизонта);
+      — NoIdle для троек дней, захватывающих прошлое;
+      — незавершённая перевалка продолжается (z=1).
+    """
+    start = days_horizon[0]
+    nxt   = days_horizon[1] if len(days_horizon) > 1 else None
+    tail         = init_state.get("tail", {})
+    reconf_until = init_state.get("reconf_until", {})
+
+    for stage in x_vars:
+        aggs = inst.stage_aggs[stage]
+        x, z = x_vars[stage], z_vars[stage]
+        for r in aggs:
+            rep  = inst.repairs.get(r, [])
+            past = tail.get(stage, {}).get(r, {})   # {день: кампания или ""}
+            z_prev = init_state.get("z_prev", {}).get(stage, {}).get(r, 0)
+            k_last = past.get(start - 1, "")
+
+            # Перевалка с последней кампании
+            if k_last:
+                for k in inst.campaigns:
+                    if k != k_last and inst.reconf_matrix[r][(k_last, k)] // inst.hours_per_day > 0:
+                        m += (x[r][k][start] == 0, f"Carry_stage{stage}_{r}_{k}")
+
+            # NoIdle: tc = start-1 и tc = start
+            if (past.get(start - 2, "") and not z_prev
+                    and not any(d in rep for d in (start - 2, start - 1, start))):
+                m += (
+                    pulp.lpSum(x[r][k][start] for k in inst.campaigns) <= 0,
+                    f"NoIdleCarry_stage{stage}_{r}_{start - 1}"
+                )
+            if (k_last and nxt is not None
+                    and not any(d in rep for d in (start - 1, start, nxt))):
+                m += (
+                    pulp.lpSum(x[r][k][nxt] for k in inst.campaigns) <= z[r][start],
+                    f"NoIdleCarry_stage{stage}_{r}_{start}"
+                )
+
+            # Незавершённая перевалка
+            until = reconf_until.get(stage, {}).get(r)
+            if until is not None:
+                for t in days_horizon:
+                    if t <= until and t not in rep:
+                        m += (z[r][t] == 1, f"CarryReconf_stage{stage}_{r}_{t}")
+
+
+def initial_state_from_values(done_days: list[int],
+                              x_vals: dict, y_vals: dict, z_vals: dict,
+                              inst: ProblemInstance | None = None) -> dict:
+    """
+    Состояние для build_model(init_state=...) после зафиксированных дней done_days
+    по значениям x/y/z (вложенные словари как у build_model, числа 0/1):
+      produced     — {stage: {k: {tau: тонны}}},
+      tail         — {stage: {r: {tau: кампания или ""}}} за два последних дня,
+      z_prev       — {stage: {r: z в последний зафиксированный день}},
+      reconf_until — {stage: {r: последний день перевалки}}, если она
+                     заходит за done_days[-1].
+    """
+    if inst is None:
+        inst = ProblemInstance.from_settings()
+    last = done_days[-1]
+    state = {"produced": {}, "tail": {}, "z_prev": {}, "reconf_until": {}}
+    for stage, aggs in inst.stage_aggs.items():
+        produced = {k: {} for k in inst.campaigns}
+        tail, z_prev, until = {}, {}, {}
+        for r in aggs:
+            tail[r] = {}
+            for t in done_days:
+                for k in inst.campaigns:
+                    if x_vals[stage][r][k][t] > 0.5:
+                        produced[k][t] = produced[k].get(t, 0.0) + inst.prod_rate[(r, k)]
+                        if t >= last - 1:
+                            tail[r][t] = k
+            z_prev[r] = 1 if z_vals[stage][r][last] > 0.5 else 0
+            for k1 in inst.campaigns:
+                for k2 in inst.campaigns:
+                    if k1 == k2:
+                        continue
+                    for t, v in y_vals[stage][r][k1][k2].items():
+                        if t not in done_days or v <= 0.5:
+                            continue
+                        end = t + inst.reconf_matrix[r][(k1, k2)] // inst.hours_per_day
+                        if end > last:
+                            until[r] = max(until.get(r, end), end)
+        state["produced"][stage] = produced
+        state["tail"][stage] = tail
+        state["z_prev"][stage] = z_prev
+        state["reconf_until"][stage] = until
+    return state
@@ -0,0 +1,347 @@
+﻿# models/sparse_model.py
+#
+# Та же модель, что и build_model, но собранная напрямую в виде
+# индексных массивов NumPy и CSR-матрицы SciPy — без объектов PuLP,
+# имён ограничений и временного MPS-файла.
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import milp, LinearConstraint, Bounds
+
+import config.settings as cfg
+from data.instance import ProblemInstance
+
+
+class _Rows:
+    """Накопитель строк в COO-формате: row/col/val + границы строк."""
+
+    def __init__(self):
+        self.n = 0
+        self.families: dict[str, list[int]] = {}   # семейство → [строк, ненулей]
+        self.rows: list[np.ndarray] = []
+        self.cols: list[np.ndarray] = []
+        self.vals: list[np.ndarray] = []
+        self.lb:   list[np.ndarray] = []
+        self.ub:   list[np.ndarray] = []
+
+    def add(self, cols, vals, lb, ub, family: str = "Other"):
+        """
+        cols, vals: массивы формы (n_rows, n_terms) — по строке на ограничение.
+        lb, ub:     скаляры или массивы длины n_rows.
+        family:     семейство ограничений (как префикс имён в build_model).
+        """
+        cols = np.asarray(cols, dtype=np.int64)
+        if cols.size == 0:
+            return
+        cols = cols.reshape(cols.shape[0], -1)
+        vals = np.broadcast_to(np.asarray(vals, dtype=float), cols.shape)
+        n_rows, n_terms = cols.shape
+        idx = np.arange(self.n, self.n + n_rows)
+        self.rows.append(np.repeat(idx, n_terms))
+        self.cols.append(cols.ravel())
+        self.vals.append(vals.ravel())
+        self.lb.append(np.broadcast_to(np.asarray(lb, dtype=float), (n_rows,)))
+        self.ub.append(np.broadcast_to(np.asarray(ub, dtype=float), (n_rows,)))
+        self.n += n_rows
+        fam = self.families.setdefault(family, [0, 0])
+        fam[0] += n_rows
+        fam[1] += n_rows*n_terms
+
+    def matrix(self, n_cols: int) -> tuple[sparse.csr_matrix, np.ndarray, np.ndarray]:
+        if not self.rows:
+            return sparse.csr_matrix((0, n_cols)), np.empty(0), np.empty(0)
+        A = sparse.coo_matrix(
+            (np.concatenate(self.vals),
+             (np.concatenate(self.rows), np.concatenate(self.cols))),
+            shape=(self.n, n_cols),
+        ).tocsr()
+        A.sum_duplicates()
+        return A, np.concatenate(self.lb), np.concatenate(self.ub)
+
+
+class SparseModel:
+    """
+    Модель в матричной форме:  max c·v,  row_lb <= A·v <= row_ub,  lb <= v <= ub.
+    Столбцы проиндексированы целыми массивами:
+      x_idx[stage] — (агрегат, кампания, день),
+      y_idx[stage] — (агрегат, k1, k2, день без последнего),
+      u_idx[stage] — (агрегат,),
+      z_idx[stage] — (агрегат, день),
+      cum_idx[stage] — (кампания, день), только для matbal_form="cumulative".
+    families — {семейство ограничений: (строк, ненулей)}.
+    """
+
+    def __init__(self, days: list[int], matbal_form: str, inst: ProblemInstance):
+        self.days        = list(days)
+        self.matbal_form = matbal_form
+        self.inst        = inst
+        self.campaigns   = list(inst.campaigns)
+        self.stage_aggs  = {s: list(a) for s, a in inst.stage_aggs.items()}
+        self.n_cols = 0
+        self.x_idx:   dict[int, np.ndarray] = {}
+        self.y_idx:   dict[int, np.ndarray] = {}
+        self.u_idx:   dict[int, np.ndarray] = {}
+        self.z_idx:   dict[int, np.ndarray] = {}
+        self.cum_idx: dict[int, np.ndarray] = {}
+        self.c = self.lb = self.ub = self.integrality = None
+        self.A = self.row_lb = self.row_ub = None
+        self.families: dict[str, tuple[int, int]] = {}
+
+    def alloc(self, shape: tuple[int, ...]) -> np.ndarray:
+        """Выделяет блок столбцов заданной формы и возвращает их индексы."""
+        n = int(np.prod(shape))
+        idx = np.arange(self.n_cols, self.n_cols + n).reshape(shape)
+        self.n_cols += n
+        return idx
+
+    @property
+    def n_rows(self) -> int:
+        return self.A.shape[0]
+
+    @property
+    def nnz(self) -> int:
+        return self.A.nnz
+
+
+def build_sparse_model(days_horizon: list[int], matbal_form: str | None = None,
+                       inst: ProblemInstance | None = None) -> SparseModel:
+    """
+    Строит ту же модель, что build_model(days_horizon), в виде CSR-матрицы.
+    Ремонты задаются верхними границами столбцов, а не отдельными строками.
+    Коэффициенты берутся из плотных массивов inst (по умолчанию
+    ProblemInstance.from_settings()). Формулировка — build_model с
+    changeover="pairwise" и symmetry="none": cfg.changeover и
+    cfg.symmetry_breaking не учитываются. cfg.presolve на решение не влияет
+    (убирает только переменные, равные нулю при любом решении), такие
+    столбцы здесь остаются и снимаются предрешением HiGHS.
+    """
+    if inst is None:
+        inst = ProblemInstance.from_settings()
+    if matbal_form is None:
+        matbal_form = cfg.matbal_form
+    if matbal_form not in ("direct", "cumulative"):
+        raise ValueError(f"Неизвестная формулировка баланса: {matbal_form}")
+
+    sm = SparseModel(days_horizon, matbal_form, inst)
+    days = sm.days
+    T, K = len(days), len(sm.campaigns)
+    day_pos = {t: i for i, t in enumerate(days)}
+
+    # 1) Столбцы
+    for stage, aggs in sm.stage_aggs.items():
+        R = len(aggs)
+        sm.x_idx[stage] = sm.alloc((R, K, T))
+        sm.y_idx[stage] = sm.alloc((R, K, K, max(T - 1, 0)))
+        sm.u_idx[stage] = sm.alloc((R,))
+        sm.z_idx[stage] = sm.alloc((R, T))
+    if matbal_form == "cumulative":
+        for stage in sm.stage_aggs:
+            sm.cum_idx[stage] = sm.alloc((K, T))
+
+    n = sm.n_cols
+    c   = np.zeros(n)
+    lb  = np.zeros(n)
+    ub  = np.ones(n)
+    integrality = np.ones(n, dtype=np.int8)
+    for stage in sm.cum_idx:
+        ci = sm.cum_idx[stage].ravel()
+        ub[ci] = np.inf
+        integrality[ci] = 0
+
+    rows = _Rows()
+    for stage, aggs in sm.stage_aggs.items():
+        R = len(aggs)
+        x, y, u, z = sm.x_idx[stage], sm.y_idx[stage], sm.u_idx[stage], sm.z_idx[stage]
+        pos = inst.agg_positions(aggs)
+        rate, hours = inst.rate[pos], inst.reconf_hours[pos]
+        days_req = inst.reconf_days[pos]
+
+        # Целевая функция
+        c[x] = np.broadcast_to(rate[:, :, None], x.shape)
+        c[y] = -inst.pen_reconf * np.broadcast_to(hours[..., None], y.shape)
+        c[u] = -inst.pen_resource
+        diag = np.arange(K)
+        ub[y[:, diag, diag, :]] = 0.0   # y[k][k] в целевой и ограничениях не участвует
+
+        # 2.0. Последовательность vs параллельность
+        seq = [i for i, r in enumerate(aggs) if not inst.can_parallel.get(r, False)]
+        if seq:
+            cols = x[seq].transpose(1, 2, 0).reshape(K * T, len(seq))
+            rows.add(cols, 1.0, -np.inf, 1.0, "SequentialPerResource")
+
+        # 2.1. Не более одной кампании на агрегат в день
+        rows.add(x.transpose(0, 2, 1).reshape(R * T, K), 1.0, -np.inf, 1.0, "OneJob")
+
+        # 2.2. Ремонты блокируют и x, и z — через границы столбцов
+        for i, r in enumerate(aggs):
+            rep = [day_pos[t] for t in inst.repairs.get(r, []) if t in day_pos]
+            if rep:
+                ub[x[i][:, rep]] = 0.0
+                ub[z[i][rep]] = 0.0
+
+        # 2.3. Смена кампании + тэг перевалки
+        if T > 1:
+            k1, k2 = np.nonzero(~np.eye(K, dtype=bool))
+            # y >= x[k1][t] + x[k2][t+1] - 1
+            cols = np.stack([x[:, k1, :-1], x[:, k2, 1:], y[:, k1, k2, :]], axis=-1)
+            rows.add(cols.reshape(-1, 3), [1.0, 1.0, -1.0], -np.inf, 1.0, "Reconf")
+            for i, r in enumerate(aggs):
+                for a, b in zip(k1, k2):
+                    for d in range(1, days_req[i, a, b] + 1):
+                        ts = [j for j, t in enumerate(days[:-1]) if (t + d) in day_pos]
+                        if not ts:
+                            continue
+                        tag = [day_pos[days[j] + d] for j in ts]
+                        cols = np.stack([z[i, tag], y[i, a, b, ts]], axis=-1)
+                        rows.add(cols, [1.0, -1.0], 0.0, np.inf, "TagReconf")
+
+        # 2.4. Запрет работы в день перевалки
+        cols = np.stack([x, np.broadcast_to(z[:, None, :], x.shape)], axis=-1)
+        rows.add(cols.reshape(-1, 2), 1.0, -np.inf, 1.0, "NoJobOnReconf")
+
+        # 2.5. Запрет “нулевых” дней без перевалки
+        for i, r in enumerate(aggs):
+            rep = set(inst.repairs.get(r, []))
+            mids = [j for j in range(1, T - 1)
+                    if not any(days[jj] in rep for jj in (j - 1, j, j + 1))]
+            if mids:
+                mids = np.array(mids)
+                cols = np.concatenate([x[i][:, mids - 1].T, x[i][:, mids + 1].T,
+                                       z[i, mids][:, None]], axis=1)
+                vals = np.r_[np.ones(2 * K), -1.0]
+                rows.add(cols, vals, -np.inf, 1.0, "NoIdle")
+
+        # 2.6. Использование агрегата
+        cols = np.concatenate([u[:, None], x.reshape(R, K * T)], axis=1)
+        rows.add(cols, np.r_[1.0, -np.ones(K * T)], -np.inf, 0.0, "UseUpper")
+        rows.add(cols, np.r_[1.0, -np.ones(K * T) / T], 0.0, np.inf, "UseLower")
+
+    # 3) NSI и материал-баланс
+    if matbal_form == "cumulative":
+        _add_cumulative_balance(sm, rows)
+    else:
+        _add_direct_balance(sm, rows)
+
+    sm.c, sm.lb, sm.ub, sm.integrality = c, lb, ub, integrality
+    sm.A, sm.row_lb, sm.row_ub = rows.matrix(n)
+    sm.families = {f: tuple(v) for f, v in rows.families.items()}
+    return sm
+
+
+def _stage_rates(sm: SparseModel, stage: int) -> np.ndarray:
+    return sm.inst.rate[sm.inst.agg_positions(sm.stage_aggs[stage])]
+
+
+def _add_direct_balance(sm: SparseModel, rows: _Rows):
+    days = np.array(sm.days)
+    inst = sm.inst
+    for stage, aggs in sm.stage_aggs.items():
+        x, rate = sm.x_idx[stage], _stage_rates(sm, stage)
+        for ki, k in enumerate(sm.campaigns):
+            if stage == 1:
+                rows.add(x[:, ki, :].reshape(1, -1),
+                         np.repeat(rate[:, ki], len(days))[None, :],
+                         -np.inf, inst.total_nsi[k], "NSI")
+                continue
+            x_prev, rate_prev = sm.x_idx[stage - 1], _stage_rates(sm, stage - 1)
+            for j, t in enumerate(days):
+                own  = x[:, ki, :j + 1]
+                prev = x_prev[:, ki, days + inst.cooling_time[k] <= t]
+                cols = np.concatenate([own.ravel(), prev.ravel()])
+                vals = np.concatenate([
+                    np.repeat(rate[:, ki], own.shape[1]),
+                    -np.repeat(rate_prev[:, ki], prev.shape[1]),
+                ])
+                rows.add(cols[None, :], vals[None, :], -np.inf, 0.0, "MatBal")
+
+
+def _add_cumulative_balance(sm: SparseModel, rows: _Rows):
+    days = np.array(sm.days)
+    inst = sm.inst
+    T = len(days)
+    for stage, aggs in sm.stage_aggs.items():
+        x, cum, rate = sm.x_idx[stage], sm.cum_idx[stage], _stage_rates(sm, stage)
+        for ki, k in enumerate(sm.campaigns):
+            # cum[t] - cum[t-1] - Σ_r rate·x[r][t] = 0
+            prod_cols = x[:, ki, :].T                               # (T, R)
+            first = np.concatenate([[cum[ki, 0]], prod_cols[0]])[None, :]
+            rows.add(first, np.r_[1.0, -rate[:, ki]][None, :], 0.0, 0.0, "CumProd")
+            if T > 1:
+                cols = np.concatenate([cum[ki, 1:, None], cum[ki, :-1, None],
+                                       prod_cols[1:]], axis=1)
+                vals = np.r_[1.0, -1.0, -rate[:, ki]]
+                rows.add(cols, vals, 0.0, 0.0, "CumProd")
+
+            if stage == 1:
+                rows.add([[cum[ki, -1]]], 1.0, -np.inf, inst.total_nsi[k], "NSI")
+                continue
+
+            # cum[s][t] <= cum[s-1][t - cooling]
+            prev_cum = sm.cum_idx[stage - 1]
+            pos = np.searchsorted(days, days - inst.cooling_time[k], side="right") - 1
+            has = pos >= 0
+            if (~has).any():
+                rows.add(cum[ki, ~has][:, None], 1.0, -np.inf, 0.0, "MatBal")
+            if has.any():
+                cols = np.stack([cum[ki, has], prev_cum[ki, pos[has]]], axis=-1)
+                rows.add(cols, [1.0, -1.0], -np.inf, 0.0, "MatBal")
+
+
+def solve_sparse_model(sm: SparseModel,
+                       time_limit: float | None = None,
+                       gap_rel: float | None = None,
+                       msg: bool = False) -> dict:
+    """
+    Решает модель в памяти (HiGHS через scipy.optimize.milp) и возвращает
+    статус в терминах PuLP и значения переменных в тех же вложенных словарях,
+    что и build_model: x_vars[stage][r][k][t], y_vars[stage][r][k1][k2][t],
+    u_vars[stage][r], z_vars[stage][r][t].
+    """
+    options = {"disp": msg}
+    if time_limit is not None:
+        options["time_limit"] = time_limit
+    if gap_rel is not None:
+        options["mip_rel_gap"] = gap_rel
+
+    res = milp(
+        c=-sm.c,
+        constraints=LinearConstraint(sm.A, sm.row_lb, sm.row_ub),
+        integrality=sm.integrality,
+        bounds=Bounds(sm.lb, sm.ub),
+        options=options,
+    )
+
+    if res.x is not None:
+        status_str = "Optimal"
+        v = np.where(sm.integrality == 1, np.round(res.x), res.x)
+    else:
+        status_str = {2: "Infeasible", 3: "Unbounded"}.get(res.status, "Not Solved")
+        v = np.zeros(sm.n_cols)
+
+    days, campaigns = sm.days, sm.campaigns
+    x_vars, y_vars, u_vars, z_vars = {}, {}, {}, {}
+    for stage, aggs in sm.stage_aggs.items():
+        xv, yv = v[sm.x_idx[stage]], v[sm.y_idx[stage]]
+        uv, zv = v[sm.u_idx[stage]], v[sm.z_idx[stage]]
+        x_vars[stage] = {
+            r: {k: dict(zip(days, xv[i, ki].tolist())) for ki, k in enumerate(campaigns)}
+            for i, r in enumerate(aggs)
+        }
+        y_vars[stage] = {
+            r: {k1: {k2: dict(zip(days[:-1], yv[i, a, b].tolist()))
+                     for b, k2 in enumerate(campaigns)}
+                for a, k1 in enumerate(campaigns)}
+            for i, r in enumerate(aggs)
+        }
+        u_vars[stage] = dict(zip(aggs, uv.tolist()))
+        z_vars[stage] = {r: dict(zip(days, zv[i].tolist())) for i, r in enumerate(aggs)}
+
+    return {
+        "status_str": status_str,
+        "objective":  float(sm.c @ v) if res.x is not None else None,
+        "mip_gap":    getattr(res, "mip_gap", None),
+        # HiGHS минимизирует -c: граница исходной (max) задачи — с обратным знаком
+        "bound":      (-res.mip_dual_bound
+                       if getattr(res, "mip_dual_bound", None) is not None else None),
+        "x_vars": x_vars, "y_vars": y_vars, "u_vars": u_vars, "z_vars": z_vars,
+    }
@@ -0,0 +1,67 @@
+# reports/report_tables.py
+#
+# Выгрузка расписаний в плоские таблицы (CSV / Parquet) для внешних систем:
+# одна строка — стадия, агрегат, день, код, тонны.
+
+import importlib.util
+import os
+
+import pandas as pd
+
+
+def schedule_table(days: list[int],
+                   stage_aggs: dict[int, list[str]],
+                   schedules: dict[int, dict[tuple[str, int], str]],
+                   tonnages: dict[int, dict[tuple[str, int], float]]) -> pd.DataFrame:
+    """Расписание всех стадий в длинном формате: stage, aggregate, day, code, tons."""
+    rows = [
+        (stage, r, d, schedules[stage].get((r, d), ""), tonnages[stage].get((r, d), 0.0))
+        for stage in sorted(stage_aggs) for r in stage_aggs[stage] for d in days
+    ]
+    return pd.DataFrame(rows, columns=["stage", "aggregate", "day", "code", "tons"])
+
+
+def reconf_table(stage_aggs: dict[int, list[str]],
+                 reconfs: dict[int, dict[str, float]]) -> pd.DataFrame:
+    """Часы перевалок по агрегатам: stage, aggregate, reconf_hours."""
+    rows = [(stage, r, reconfs[stage].get(r, 0.0))
+            for stage in sorted(stage_aggs) for r in stage_aggs[stage]]
+    return pd.DataFrame(rows, columns=["stage", "aggregate", "reconf_hours"])
+
+
+def parquet_available() -> bool:
+    """Установлен ли движок Parquet для pandas (pyarrow или fastparquet)."""
+    return any(importlib.util.find_spec(m) for m in ("pyarrow", "fastparquet"))
+
+
+def export_schedule_tables(out_dir: str,
+                           days: list[int],
+                           stage_aggs: dict[int, list[str]],
+                           schedules: dict[int, dict[tuple[str, int], str]],
+                           tonnages: dict[int, dict[tuple[str, int], float]],
+                           reconfs: dict[int, dict[str, float]],
+                           formats: tuple[str, ...] = ("csv",)) -> list[str]:
+    """
+    Пишет schedule.* и reconf.* в out_dir в форматах formats ("csv", "parquet").
+    Parquet требует pyarrow или fastparquet (parquet_available()); без них
+    формат пропускается. Возвращает пути записанных файлов.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    tables = {
+        "schedule": schedule_table(days, stage_aggs, schedules, tonnages),
+        "reconf":   reconf_table(stage_aggs, reconfs),
+    }
+    written = []
+    for fmt in formats:
+        if fmt == "parquet" and not parquet_available():
+            continue
+        if fmt not in ("csv", "parquet"):
+            raise ValueError(f"Неизвестный формат выгрузки: {fmt}")
+        for name, df in tables.items():
+            path = os.path.join(out_dir, f"{name}.{fmt}")
+            if fmt == "csv":
+                df.to_csv(path, index=False, encoding="utf-8-sig")
+            else:
+                df.to_parquet(path, index=False)
+            written.append(path)
+    return written
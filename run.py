@@ -1,18 +1,55 @@
 ﻿# run.py
 
+import argparse
 import os
 import time
 
 import config.settings as cfg
+from data.instance import ProblemInstance
 from solvers.solve import solve_main
+from solvers.greedy import solve_greedy
+from solvers.rolling_horizon import solve_rolling
+from solvers.stagewise import solve_stagewise
+from solvers.hourly import solve_hourly
+from solvers.rounding import solve_rounding
+from solvers.colgen import solve_colgen
+from solvers import runlog
+from solvers.cache import CacheMiss, solve_cached
 from reports.report_excel import write_excel_report
+from reports.report_tables import export_schedule_tables, parquet_available
 
-def run_and_report():
-    print("[INFO] === START run_and_report ===")
+MODES = {
+    "milp":   solve_main,     # MIP-модель (PuLP/CBC или sparse/HiGHS)
+    "greedy": solve_greedy,   # списочная диспетчеризация без MIP, доли секунды
+    "rolling": solve_rolling, # скользящее окно для длинных горизонтов
+    "stagewise": solve_stagewise, # стадии по очереди с передачей выпуска
+    "hourly": solve_hourly,   # N-часовые бакеты, перевалки без округления до суток
+    "rounding": solve_rounding, # LP-релаксация + округление, разрыв к границе LP
+    "colgen": solve_colgen,   # генерация столбцов по расписаниям агрегатов
+}
+
+def run_and_report(mode: str | None = None, inst: ProblemInstance | None = None,
+                   report_only: bool = False):
+    """
+    Решает режим mode (по умолчанию cfg.run_mode) и пишет отчёт в output/.
+    Решения кэшируются по данным и настройкам (solvers/cache.py, cfg.cache_dir);
+    report_only — только перестроить отчёт по решению из кэша.
+    """
+    runlog.log(1, "[INFO] === START run_and_report ===")
     t0 = time.time()
+    if mode is None:
+        mode = cfg.run_mode
+    if inst is None:
+        inst = ProblemInstance.from_settings()
+    if cfg.runlog_path:
+        runlog.start()
+    runlog.record("run", {"mode": mode, "backend": cfg.solver_backend,
+                          "instance": {"stages": len(inst.stage_aggs), "aggregates": len(inst.aggs),
+                                       "campaigns": len(inst.campaigns), "days": len(inst.days)}})
 
     # 1) Решаем модель
-    result = solve_main()
+    with runlog.phase("solve"):
+        result = solve_cached(mode, MODES[mode], inst, require_hit=report_only)
     status_str    = result["status_str"]
     days          = result["days"]
     rolled_total  = result["rolled_total_3"]  # или "rolled_total", если вы унифицировали
@@ -22,31 +59,73 @@ def run_and_report():
     reconfs       = result["reconfs"]
     metrics       = result["metrics"]
 
-    print(f"[DEBUG] Статус={status_str}, days={days}")
+    runlog.log(2, f"[DEBUG] Статус={status_str}, days={days}")
 
     # 2) Записываем отчёт
     out_dir = "output"
     os.makedirs(out_dir, exist_ok=True)
     path = os.path.join(out_dir, "report_full.xlsx")
 
-    write_excel_report(
-        path=path,
-        prod_rate=cfg.prod_rate,
-        cooling_time=cfg.cooling_time,
-        nsi_schedule=cfg.nsi_schedule,
-        total_nsi=cfg.total_nsi,
-        metrics=metrics,
-        days=days,
-        campaigns=cfg.campaigns,
-        stage_aggs=cfg.stage_aggs,
-        schedules=schedules,
-        tonnages=tonnages,
-        reconfs=reconfs,
-        rolled_total=rolled_total
-    )
-
-    print(f"[INFO] Отчёт сохранён в {path}")
-    print(f"[INFO] TOTAL TIME: {time.time() - t0:.2f}s")
+    with runlog.phase("report"):
+        write_excel_report(
+            path=path,
+            inst=inst,
+            metrics=metrics,
+            days=days,
+            schedules=schedules,
+            tonnages=tonnages,
+            reconfs=reconfs,
+            rolled_total=rolled_total
+        )
+
+    runlog.log(1, f"[INFO] Отчёт сохранён в {path}")
+
+    # 3) Табличная выгрузка расписаний (CSV / Parquet)
+    if cfg.report_exports:
+        if "parquet" in cfg.report_exports and not parquet_available():
+            runlog.log(1, "[WARN] Parquet пропущен: не установлен pyarrow или fastparquet")
+        with runlog.phase("export"):
+            for p in export_schedule_tables(out_dir, days, inst.stage_aggs,
+                                            schedules, tonnages, reconfs,
+                                            formats=cfg.report_exports):
+                runlog.log(1, f"[INFO] Выгрузка: {p}")
+    total = time.time() - t0
+    runlog.log(1, f"[INFO] TOTAL TIME: {total:.2f}s")
+
+    # 4) Журнал прогона
+    log = runlog.stop()
+    if log is not None:
+        log.record("result", {"status": status_str, "enough": enough, "metrics": metrics,
+                              "total_s": round(total, 4)})
+        log.write(cfg.runlog_path)
+        runlog.log(1, f"[INFO] Журнал прогона: {cfg.runlog_path}")
 
 if __name__ == "__main__":
-    run_and_report()
+    parser = argparse.ArgumentParser(description="Планирование прокатки и отчёт в Excel")
+    parser.add_argument("--mode", choices=sorted(MODES), default=None,
+                        help="режим решения (по умолчанию cfg.run_mode)")
+    parser.add_argument("--instance", default=None,
+                        help="данные задачи JSON/YAML (по умолчанию config/settings.py)")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="с расписаниями по стадиям (cfg.verbosity = 2)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="без хода решения")
+    parser.add_argument("--runlog", default=None,
+                        help="путь журнала прогона JSON (по умолчанию cfg.runlog_path)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="решать заново, не читая и не записывая кэш решений")
+    parser.add_argument("--report-only", action="store_true",
+                        help="только перестроить отчёт по решению из кэша")
+    args = parser.parse_args()
+    if args.quiet:
+        cfg.verbosity = 0
+    elif args.verbose:
+        cfg.verbosity = 2
+    if args.runlog:
+        cfg.runlog_path = args.runlog
+    if args.no_cache:
+        cfg.cache_dir = None
+    try:
+        run_and_report(args.mode, ProblemInstance.load(args.instance) if args.instance else None,
+                       report_only=args.report_only)
+    except CacheMiss as e:
+        parser.error(str(e))
@@ -0,0 +1,329 @@
+﻿# solvers/backends.py
+#
+# Сменные решатели одной и той же суточной модели. Каждый бэкенд строит
+# свою форму модели, решает её и возвращает одинаковую структуру:
+#   model, status_str, x_vars, y_vars, u_vars, z_vars, solver_stats,
+# где solver_stats — {"backend", "objective", "bound", "gap", "wallclock",
+# "first_incumbent_time", ...}; всё, что решатель не сообщает, — None.
+# Все решатели локальные, без сервера лицензий.
+
+import importlib.util
+import time
+
+import pulp
+from pulp import LpMaximize, LpStatus, PULP_CBC_CMD, PulpSolverError
+
+import config.settings as cfg
+from data.instance import ProblemInstance
+from models.rolling_model import build_model, switch_values
+from models.sparse_model import build_sparse_model, solve_sparse_model
+from models.cpsat_model import build_cpsat_model, cp_model_module, OBJ_SCALE
+from solvers import runlog
+from solvers.cbc_log import read_cbc_log, relative_gap
+from solvers.heuristic import construct_schedule, apply_warm_start
+from solvers.portfolio import PortfolioCBC, append_history, portfolio_configs
+from solvers.streaming import AdaptiveStop, StreamingCBC
+
+
+def _record_size(model):
+    # обход всех ограничений — только при активном журнале прогона
+    if runlog.active() is not None:
+        runlog.record("model_size", runlog.model_size(model))
+    presolve = getattr(model, "presolve_stats", None)
+    if presolve:
+        runlog.record("presolve", presolve)
+        runlog.log(1, f"[INFO] Предрешение: исключено столбцов {presolve['cols_removed']},"
+                      f" строк {presolve['rows_removed']}")
+
+
+def _stats(backend: str, objective=None, bound=None, wallclock=None, **extra) -> dict:
+    stats = {"backend": backend, "objective": objective, "bound": bound,
+             "gap": relative_gap(objective, bound), "wallclock": wallclock,
+             "first_incumbent_time": None}
+    stats.update(extra)
+    return stats
+
+
+def solve_cbc_retry(model, **options) -> int:
+    """
+    model.solve(PULP_CBC_CMD(**options)). На отдельных моделях CBC падает
+    (SIGSEGV) в своём препроцессинге — тогда модель перерешивается с
+    выключенным preprocess.
+    """
+    try:
+        return model.solve(PULP_CBC_CMD(**options))
+    except PulpSolverError:
+        runlog.log(1, "[WARN] CBC завершился с ошибкой, повтор без preprocess")
+        opts = dict(options)
+        opts["options"] = list(opts.get("options") or []) + ["preprocess off"]
+        return model.solve(PULP_CBC_CMD(**opts))
+
+
+def _solve_cbc(days: list[int], inst: ProblemInstance, time_limit: float, gap_rel: float,
+               threads: int | None, warm_start: bool, log_path: str | None,
+               on_event=None) -> dict:
+    """
+    build_model + CBC (через MPS-файл); threads — потоки CBC. При
+    cfg.cbc_streaming CBC запускается StreamingCBC: решения и границы
+    приходят в on_event по мере нахождения, действуют правила cfg.stop_*,
+    а solver_stats содержит events и stop_reason. Со сводкой лога в
+    solver_stats есть io_s — запись MPS и чтение решения (время фазы
+    solver минус время самого CBC).
+    """
+    with runlog.phase("build"):
+        model, x_vars, y_vars, u_vars, z_vars = build_model(days, inst=inst)
+        if warm_start:
+            apply_warm_start(x_vars, y_vars, u_vars, z_vars, construct_schedule(days, inst))
+    _record_size(model)
+    options = dict(msg=log_path is None and cfg.verbosity >= 1, timeLimit=time_limit,
+                   gapRel=gap_rel, warmStart=warm_start, logPath=log_path, threads=threads)
+    if cfg.cbc_streaming:
+        solver = StreamingCBC(**options, on_event=on_event, stop=AdaptiveStop.from_settings())
+    else:
+        solver = PULP_CBC_CMD(**options)
+    with runlog.phase("solver"):
+        t0 = time.perf_counter()
+        status = model.solve(solver)
+        wall = time.perf_counter() - t0
+    if cfg.changeover == "compact":
+        y_vars = switch_values(days, x_vars, inst)
+    if cfg.cbc_streaming or log_path:
+        stats = solver.stats() if cfg.cbc_streaming else read_cbc_log(log_path)
+        stats["backend"] = "pulp"
+        stats["io_s"] = wall - stats["wallclock"] if stats["wallclock"] is not None else None
+        stats["wallclock"] = stats["wallclock"] or wall
+        if stats.get("stop_reason"):
+            runlog.log(1, f"[INFO] Остановка: {stats['stop_reason']}")
+        runlog.log(1, f"[INFO] Первое решение: {stats['first_incumbent_time']} с, "
+                      f"разрыв: {stats['gap']}")
+    else:
+        stats = _stats("pulp", model.objective.value(), wallclock=wall)
+    return {"model": model, "status_str": LpStatus[status],
+            "x_vars": x_vars, "y_vars": y_vars, "u_vars": u_vars, "z_vars": z_vars,
+            "solver_stats": stats}
+
+
+def _solve_portfolio(days: list[int], inst: ProblemInstance, time_limit: float, gap_rel: float,
+                     threads: int | None, warm_start: bool, log_path: str | None,
+                     on_event=None) -> dict:
+    """
+    build_model + портфель конфигураций CBC (solvers/portfolio.py): по
+    процессу на конфигурацию cfg.portfolio_configs (их число —
+    cfg.portfolio_size; каждый процесс CBC в один поток, threads не
+    используется), модели присваивается лучшее решение. MIP-старт
+    из эвристики получают конфигурации с "warm_start" (и все при warm_start).
+    solver_stats: winner — конфигурация с лучшим решением, runs — по
+    конфигурациям; итог дописывается в cfg.portfolio_history.
+    """
+    configs = portfolio_configs()
+    if warm_start:
+        configs = [{**c, "warm_start": True} for c in configs]
+    with runlog.phase("build"):
+        model, x_vars, y_vars, u_vars, z_vars = build_model(days, inst=inst)
+        if any(c.get("warm_start") for c in configs):
+            apply_warm_start(x_vars, y_vars, u_vars, z_vars, construct_schedule(days, inst))
+    _record_size(model)
+    solver = PortfolioCBC(configs, msg=log_path is None and cfg.verbosity >= 2,
+                          timeLimit=time_limit, gapRel=gap_rel, on_event=on_event)
+    with runlog.phase("solver"):
+        status = model.solve(solver)
+    if cfg.changeover == "compact":
+        y_vars = switch_values(days, x_vars, inst)
+    stats = solver.stats()
+    stats["backend"] = "portfolio"
+    runlog.log(1, f"[INFO] Портфель из {len(configs)}: победила {stats['winner']}, "
+                  f"разрыв {stats['gap']}, {stats['stop_reason'] or 'все завершились'}")
+    append_history(stats, {"aggregates": len(inst.aggs), "campaigns": len(inst.campaigns),
+                           "days": len(days)})
+    return {"model": model, "status_str": LpStatus[status],
+            "x_vars": x_vars, "y_vars": y_vars, "u_vars": u_vars, "z_vars": z_vars,
+            "solver_stats": stats}
+
+
+def _solve_highs(days: list[int], inst: ProblemInstance, time_limit: float, gap_rel: float,
+                 threads: int | None, warm_start: bool, log_path: str | None,
+                 on_event=None) -> dict:
+    """
+    build_model + HiGHS через highspy (PuLP, в памяти, с потоками и MIP-стартом).
+    Без highspy — та же модель в CSR (бэкенд "sparse"), HiGHS из SciPy.
+    """
+    if not pulp.HiGHS().available():
+        runlog.log(1, "[WARN] highspy не установлен, HiGHS из SciPy (бэкенд sparse, один поток)")
+        return _solve_sparse(days, inst, time_limit, gap_rel, threads, warm_start, log_path,
+                             on_event)
+    with runlog.phase("build"):
+        model, x_vars, y_vars, u_vars, z_vars = build_model(days, inst=inst)
+        if warm_start:
+            apply_warm_start(x_vars, y_vars, u_vars, z_vars, construct_schedule(days, inst))
+    _record_size(model)
+    solver = pulp.HiGHS(msg=log_path is None and cfg.verbosity >= 1, timeLimit=time_limit,
+                        gapRel=gap_rel, threads=threads, warmStart=warm_start)
+    with runlog.phase("solver"):
+        t0 = time.perf_counter()
+        status = model.solve(solver)
+        wall = time.perf_counter() - t0
+    if cfg.changeover == "compact":
+        y_vars = switch_values(days, x_vars, inst)
+    bound = None
+    highs = getattr(model, "solverModel", None)
+    if highs is not None:
+        bound = getattr(highs.getInfo(), "mip_dual_bound", None)
+        # PuLP решает max как min(-f): граница исходной задачи — с обратным знаком
+        if bound is not None and model.sense == LpMaximize:
+            bound = -bound
+    return {"model": model, "status_str": LpStatus[status],
+            "x_vars": x_vars, "y_vars": y_vars, "u_vars": u_vars, "z_vars": z_vars,
+            "solver_stats": _stats("highs", model.objective.value(), bound, wall)}
+
+
+def _solve_sparse(days: list[int], inst: ProblemInstance, time_limit: float, gap_rel: float,
+                  threads: int | None, warm_start: bool, log_path: str | None,
+                  on_event=None) -> dict:
+    """
+    build_sparse_model + HiGHS из scipy.optimize.milp (без MIP-старта и потоков).
+    Переналадки в CSR-модели только парные, без отсечения симметрии: другие
+    cfg.changeover и cfg.symmetry_breaking не применяются (с предупреждением).
+    """
+    for name, default in (("changeover", "pairwise"), ("symmetry_breaking", "none")):
+        if getattr(cfg, name) != default:
+            runlog.log(1, f"[WARN] Бэкенд sparse не поддерживает {name}="
+                          f"{getattr(cfg, name)!r}, модель строится с {default!r}")
+    with runlog.phase("build"):
+        model = build_sparse_model(days, inst=inst)
+    _record_size(model)
+    with runlog.phase("solver"):
+        t0 = time.perf_counter()
+        sol = solve_sparse_model(model, time_limit=time_limit, gap_rel=gap_rel,
+                                 msg=log_path is None and cfg.verbosity >= 1)
+        wall = time.perf_counter() - t0
+    return {"model": model, "status_str": sol["status_str"],
+            "x_vars": sol["x_vars"], "y_vars": sol["y_vars"],
+            "u_vars": sol["u_vars"], "z_vars": sol["z_vars"],
+            "solver_stats": _stats("sparse", sol["objective"], sol["bound"], wall)}
+
+
+def _solve_cpsat(days: list[int], inst: ProblemInstance, time_limit: float, gap_rel: float,
+                 threads: int | None, warm_start: bool, log_path: str | None,
+                 on_event=None) -> dict:
+    """
+    build_cpsat_model + CP-SAT с параллельным портфелем поиска
+    (num_workers = threads, по умолчанию все ядра); warm_start — подсказки
+    (AddHint) из конструктивной эвристики. Решения приходят в on_event из
+    обратного вызова CP-SAT, правила cfg.stop_* останавливают поиск.
+    """
+    cp_model = cp_model_module()
+    with runlog.phase("build"):
+        model, x_vars, y_vars, u_vars, z_vars = build_cpsat_model(days, inst)
+    if warm_start:
+        x0, y0, u0, z0 = construct_schedule(days, inst)
+        for stage in x_vars:
+            for r in x_vars[stage]:
+                model.AddHint(u_vars[stage][r], u0[stage][r])
+                for t, var in z_vars[stage][r].items():
+                    model.AddHint(var, z0[stage][r][t])
+                for k in x_vars[stage][r]:
+                    for t, var in x_vars[stage][r][k].items():
+                        model.AddHint(var, x0[stage][r][k][t])
+                for k1, row in y_vars[stage][r].items():
+                    for k2, by_t in row.items():
+                        for t, var in by_t.items():
+                            model.AddHint(var, y0[stage][r][k1][k2][t])
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    solver.parameters.relative_gap_limit = gap_rel
+    if threads:
+        solver.parameters.num_workers = threads
+    solver.parameters.log_search_progress = log_path is None and cfg.verbosity >= 1
+
+    events = []
+    stop = AdaptiveStop.from_settings()
+    stop_reason = []
+
+    class _Stream(cp_model.CpSolverSolutionCallback):
+        # CP-SAT сообщает каждое решение сам: тот же поток событий, что у StreamingCBC
+        def on_solution_callback(self):
+            obj, bound = self.ObjectiveValue()/OBJ_SCALE, self.BestObjectiveBound()/OBJ_SCALE
+            ev = {"kind": "incumbent", "wall": self.WallTime(), "time": self.WallTime(),
+                  "objective": obj, "bound": bound, "gap": relative_gap(obj, bound)}
+            events.append(ev)
+            if on_event is not None:
+                on_event(ev)
+            if stop is not None and not stop_reason:
+                stop.update(ev)
+                reason = stop.reason(self.WallTime())
+                if reason is not None:
+                    stop_reason.append(reason)
+                    self.StopSearch()
+
+    with runlog.phase("solver"):
+        code = solver.Solve(model, _Stream())
+    status_str = {cp_model.OPTIMAL: "Optimal", cp_model.FEASIBLE: "Optimal",
+                  cp_model.INFEASIBLE: "Infeasible",
+                  cp_model.MODEL_INVALID: "Undefined"}.get(code, "Not Solved")
+    found = code in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+
+    def val(v):
+        return solver.Value(v) if found else 0
+
+    x_vals = {s: {r: {k: {t: val(v) for t, v in by_t.items()} for k, by_t in by_k.items()}
+                  for r, by_k in x_vars[s].items()} for s in x_vars}
+    y_vals = {s: {r: {k1: {k2: {t: val(v) for t, v in by_t.items()}
+                           for k2, by_t in row.items()} for k1, row in by_k.items()}
+                  for r, by_k in y_vars[s].items()} for s in y_vars}
+    u_vals = {s: {r: val(v) for r, v in u_vars[s].items()} for s in u_vars}
+    z_vals = {s: {r: {t: val(v) for t, v in by_t.items()} for r, by_t in z_vars[s].items()}
+              for s in z_vars}
+    stats = _stats("cpsat",
+                   solver.ObjectiveValue()/OBJ_SCALE if found else None,
+                   solver.BestObjectiveBound()/OBJ_SCALE if found else None,
+                   solver.WallTime(),
+                   first_incumbent_time=events[0]["wall"] if events else None,
+                   status=solver.StatusName(code), events=events,
+                   stop_reason=stop_reason[0] if stop_reason else None)
+    return {"model": model, "status_str": status_str,
+            "x_vars": x_vals, "y_vars": y_vals, "u_vars": u_vals, "z_vars": z_vals,
+            "solver_stats": stats}
+
+
+BACKENDS = {
+    "pulp":   _solve_cbc,     # CBC через PuLP (MPS-файл), потоки — cfg.solver_threads
+    "highs":  _solve_highs,   # HiGHS через highspy (или SciPy без него)
+    "sparse": _solve_sparse,  # CSR-матрица + HiGHS из SciPy в памяти
+    "cpsat":  _solve_cpsat,   # OR-Tools CP-SAT, параллельный поиск
+    "portfolio": _solve_portfolio,  # несколько конфигураций CBC параллельно, лучшая побеждает
+}
+
+
+def available_backends() -> list[str]:
+    """Бэкенды, для которых установлены решатели."""
+    names = ["pulp", "sparse", "portfolio"]
+    if pulp.HiGHS().available():
+        names.append("highs")
+    if importlib.util.find_spec("ortools") is not None:
+        names.append("cpsat")
+    return names
+
+
+def solve_backend(backend: str, days: list[int], inst: ProblemInstance,
+                  time_limit: float | None = None, gap_rel: float | None = None,
+                  threads: int | None = None, warm_start: bool = False,
+                  log_path: str | None = None, on_event=None) -> dict:
+    """
+    Решает модель на днях days бэкендом backend (ключ BACKENDS).
+    time_limit, gap_rel, threads — по умолчанию cfg.solver_time_limit,
+    cfg.solver_gap_rel, cfg.solver_threads. log_path — писать лог решателя
+    в файл (для CBC сводка лога попадает в solver_stats), без него лог
+    выводится в консоль. on_event(event) получает решения по мере
+    нахождения (бэкенды "pulp" при cfg.cbc_streaming и "cpsat").
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Неизвестный backend: {backend}")
+    if time_limit is None:
+        time_limit = cfg.solver_time_limit
+    if gap_rel is None:
+        gap_rel = cfg.solver_gap_rel
+    if threads is None:
+        threads = cfg.solver_threads
+    return BACKENDS[backend](days, inst, time_limit, gap_rel, threads, warm_start, log_path,
+                             on_event)
@@ -0,0 +1,209 @@
+# solvers/batch.py
+#
+# Пакетный запуск сценариев: каждый сценарий — набор подмен config.settings
+# и режим решения из run.MODES; сценарии решаются в пуле процессов,
+# метрики и расписания всех сценариев пишутся в одну базу SQLite.
+# Запуск: python -m solvers.batch scenarios.json [--workers N] [--threads M] [--db путь]
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing as mp
+import os
+import sqlite3
+import tempfile
+import time
+
+import config.settings as cfg
+from config.overrides import apply_overrides
+from data.instance import ProblemInstance
+from reports.report_tables import schedule_table, reconf_table
+from solvers import runlog
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    name TEXT PRIMARY KEY, mode TEXT, overrides TEXT,
+    status TEXT, wall_s REAL, gap REAL, objective REAL, enough INTEGER, error TEXT
+);
+CREATE TABLE IF NOT EXISTS metrics (scenario TEXT, metric TEXT, value REAL);
+CREATE TABLE IF NOT EXISTS rolled_total (scenario TEXT, campaign TEXT, tons REAL);
+"""
+
+
+def load_scenarios(path: str) -> list[dict]:
+    """
+    Список сценариев из JSON или YAML:
+      [{"name": ..., "mode": "milp", "overrides": {"pen_reconf": 10, ...}}, ...]
+    mode по умолчанию — cfg.run_mode.
+    """
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            import yaml
+            scenarios = yaml.safe_load(f)
+        else:
+            scenarios = json.load(f)
+    names = [sc["name"] for sc in scenarios]
+    if len(set(names)) != len(names):
+        raise ValueError("Имена сценариев должны быть уникальны")
+    return scenarios
+
+
+_BLAS_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+
+@contextlib.contextmanager
+def _blas_threads(threads: int):
+    """
+    Потоки BLAS/OpenMP для процессов пула: переменные окружения на время
+    жизни пула. BLAS читает их при загрузке numpy/scipy, поэтому пул
+    запускается через spawn — процессы импортируют их заново с этим окружением.
+    """
+    saved = {var: os.environ.get(var) for var in _BLAS_VARS}
+    os.environ.update({var: str(threads) for var in _BLAS_VARS})
+    try:
+        yield
+    finally:
+        for var, val in saved.items():
+            if val is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = val
+
+
+def _init_worker(threads: int):
+    """Бюджет потоков решателя процесса (cfg.solver_threads); BLAS — _blas_threads."""
+    cfg.solver_threads = threads
+
+
+def run_scenario(scenario: dict) -> dict:
+    """
+    Решает один сценарий в текущем процессе (пул создаёт процесс на каждую
+    задачу, поэтому подмены cfg не переходят в следующий сценарий).
+    Возвращает сводку, таблицы расписания и перевалок.
+    """
+    from run import MODES
+    from solvers.solve import SOLVED_STATUSES, solve_main
+
+    name = scenario["name"]
+    mode = scenario.get("mode") or cfg.run_mode
+    row = {"name": name, "mode": mode,
+           "overrides": json.dumps(scenario.get("overrides", {}), ensure_ascii=False),
+           "status": None, "wall_s": None, "gap": None, "objective": None,
+           "enough": None, "error": None}
+    t0 = time.perf_counter()
+    try:
+        apply_overrides(scenario.get("overrides", {}))
+        inst = ProblemInstance.from_settings()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if mode == "milp" and cfg.solver_backend == "pulp":
+                # лог CBC нужен для разрыва
+                fd, log_path = tempfile.mkstemp(suffix=".log")
+                os.close(fd)
+                try:
+                    res = solve_main(log_path=log_path, inst=inst)
+                finally:
+                    os.remove(log_path)
+            else:
+                res = MODES[mode](inst=inst)
+    except Exception as e:
+        row["wall_s"] = time.perf_counter() - t0
+        row["status"] = "Error"
+        row["error"] = f"{type(e).__name__}: {e}"
+        return {"row": row, "metrics": {}, "rolled_total": {},
+                "schedule": None, "reconf": None}
+
+    row["wall_s"] = time.perf_counter() - t0
+    row["status"] = res["status_str"]
+    stats = res.get("solver_stats") or {}
+    row["gap"] = stats.get("gap")
+    if res["status_str"] not in SOLVED_STATUSES:
+        # решения нет: значения переменных (например, LP-релаксации) не сохраняем
+        return {"row": row, "metrics": {}, "rolled_total": {},
+                "schedule": None, "reconf": None}
+
+    row["enough"] = int(res["enough"])
+    model = res.get("model")
+    if stats.get("objective") is not None:
+        row["objective"] = stats["objective"]
+    elif hasattr(model, "objective") and model.objective is not None:
+        row["objective"] = model.objective.value()
+    elif res.get("objective") is not None:
+        row["objective"] = res["objective"]
+
+    schedule = schedule_table(res["days"], inst.stage_aggs, res["schedules"], res["tonnages"])
+    reconf   = reconf_table(inst.stage_aggs, res["reconfs"])
+    return {"row": row, "metrics": res["metrics"], "rolled_total": res["rolled_total_3"],
+            "schedule": schedule, "reconf": reconf}
+
+
+def _store(con: sqlite3.Connection, out: dict):
+    """Записывает результат сценария (заменяя прежний с тем же именем)."""
+    row = out["row"]
+    name = row["name"]
+    for table in ("scenarios", "metrics", "rolled_total"):
+        con.execute(f"DELETE FROM {table} WHERE {'name' if table == 'scenarios' else 'scenario'} = ?",
+                    (name,))
+    for table in ("schedule", "reconf"):
+        if con.execute("SELECT name FROM sqlite_master WHERE name = ?", (table,)).fetchone():
+            con.execute(f"DELETE FROM {table} WHERE scenario = ?", (name,))
+    con.execute("INSERT INTO scenarios VALUES (:name, :mode, :overrides, :status, :wall_s,"
+                " :gap, :objective, :enough, :error)", row)
+    con.executemany("INSERT INTO metrics VALUES (?, ?, ?)",
+                    [(name, k, float(v)) for k, v in out["metrics"].items()])
+    con.executemany("INSERT INTO rolled_total VALUES (?, ?, ?)",
+                    [(name, k, float(v)) for k, v in out["rolled_total"].items()])
+    for table in ("schedule", "reconf"):
+        df = out[table]
+        if df is not None:
+            df.insert(0, "scenario", name)
+            df.to_sql(table, con, if_exists="append", index=False)
+    con.commit()
+
+
+def run_batch(scenarios: list[dict],
+              db_path: str = os.path.join("output", "batch.sqlite"),
+              workers: int | None = None,
+              threads: int = 1) -> list[dict]:
+    """
+    Решает сценарии в пуле из workers процессов (по умолчанию
+    os.cpu_count() // threads), каждому процессу — threads потоков решателя.
+    Результаты по мере готовности пишутся в SQLite db_path: таблицы
+    scenarios (статус, время, разрыв, цель), metrics, rolled_total,
+    schedule и reconf. Возвращает строки таблицы scenarios.
+    """
+    if workers is None:
+        workers = max(1, (os.cpu_count() or 1) // max(threads, 1))
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    con = sqlite3.connect(db_path)
+    con.executescript(_SCHEMA)
+
+    rows = []
+    with _blas_threads(threads):
+        pool = mp.get_context("spawn").Pool(processes=min(workers, len(scenarios)) or 1,
+                                            initializer=_init_worker, initargs=(threads,),
+                                            maxtasksperchild=1)
+        try:
+            for out in pool.imap_unordered(run_scenario, scenarios):
+                _store(con, out)
+                row = out["row"]
+                rows.append(row)
+                gap = f"{row['gap']:.3f}" if row["gap"] is not None else "—"
+                runlog.log(1, f"[INFO] {row['name']}: {row['status']}, {row['wall_s']:.1f}s, "
+                              f"разрыв {gap}" + (f", {row['error']}" if row["error"] else ""))
+        finally:
+            pool.close()
+            pool.join()
+            con.close()
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Пакетный запуск сценариев")
+    parser.add_argument("scenarios", help="JSON/YAML со списком сценариев")
+    parser.add_argument("--workers", type=int, default=None, help="процессов в пуле")
+    parser.add_argument("--threads", type=int, default=1, help="потоков решателя на процесс")
+    parser.add_argument("--db", default=os.path.join("output", "batch.sqlite"),
+                        help="файл SQLite для результатов")
+    args = parser.parse_args()
+    run_batch(load_scenarios(args.scenarios), args.db, args.workers, args.threads)
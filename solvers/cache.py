@@ -0,0 +1,209 @@
+# solvers/cache.py
+#
+# Кэш решений по содержимому: ключ — SHA-256 от данных задачи
+# (ProblemInstance.to_dict) и настроек, влияющих на модель и решатель в
+# выбранном режиме. Запись кэша — каталог <cache_dir>/<ключ>/ с моделью
+# в MPS (если режим строит одну модель PuLP) и результатом решения;
+# повторный прогон с теми же данными и настройками не строит и не решает
+# модель. Размер кэша ограничен cfg.cache_max_mb, вытесняются давно не
+# использованные записи.
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+
+import config.settings as cfg
+from data.instance import ProblemInstance
+from solvers import runlog
+from solvers.schedule_result import tree_values
+from solvers.solve import SOLVED_STATUSES
+
+# Версия формата записи; меняется вместе со смыслом модели или результата,
+# чтобы старые записи не совпадали с новыми ключами
+CACHE_VERSION = 1
+
+# Настройки, от которых зависит решение, по режимам run.MODES
+_FORMULATION = ("matbal_form", "presolve", "changeover", "symmetry_breaking")
+MODE_OPTIONS = {
+    "milp":      _FORMULATION + ("solver_backend", "solver_time_limit", "solver_gap_rel",
+                                 "solver_threads", "warm_start", "cbc_streaming",
+                                 "stop_stall_seconds", "stop_min_rate", "stop_rate_window",
+                                 "stop_target_gap", "portfolio_configs", "portfolio_size"),
+    "greedy":    (),
+    "rolling":   _FORMULATION + ("rolling_window", "rolling_lookahead", "rolling_time_limit",
+                                 "rolling_gap_rel", "solver_threads"),
+    "stagewise": _FORMULATION + ("stagewise_time_limit", "stagewise_gap_rel",
+                                 "stagewise_feedback_iters", "stagewise_bonus_weights",
+                                 "solver_threads"),
+    "rounding":  _FORMULATION + ("rounding_rounds", "rounding_seed", "rounding_time_limit"),
+    "hourly":    ("bucket_hours", "hourly_time_limit", "hourly_gap_rel",
+                  "hourly_coarse_share", "solver_threads"),
+    "colgen":    ("colgen_max_iters", "colgen_time_limit", "colgen_rounds", "colgen_seed",
+                  "colgen_mip_time_limit", "colgen_gap_rel"),
+}
+
+# Ключи результата с переменными решателя: в кэш попадают их значения
+_VAR_KEYS = ("x_vars", "y_vars", "u_vars", "z_vars")
+
+
+class CacheMiss(KeyError):
+    """Нет решения в кэше при solve_cached(require_hit=True)."""
+
+    def __str__(self):
+        return self.args[0] if self.args else ""
+
+
+def cache_key(mode: str, inst: ProblemInstance) -> str:
+    """SHA-256 (hex) от версии формата, режима, данных задачи и настроек режима."""
+    payload = {
+        "version":  CACHE_VERSION,
+        "mode":     mode,
+        "instance": inst.to_dict(),
+        "options":  {name: getattr(cfg, name) for name in MODE_OPTIONS.get(mode, ())},
+    }
+    text = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, f))
+               for root, _, files in os.walk(path) for f in files)
+
+
+class SolveCache:
+    """
+    Каталог записей <root>/<ключ>/:
+      result.pkl — результат режима без модели (переменные — числами),
+      model.mps  — модель PuLP, если результат её содержит,
+      meta.json  — режим, настройки, время записи, размер.
+    Время изменения meta.json — время последнего использования записи;
+    при превышении max_bytes удаляются самые давние записи.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def get(self, key: str) -> dict | None:
+        """Результат по ключу или None; попадание обновляет время использования."""
+        entry = self.path(key)
+        try:
+            with open(os.path.join(entry, "result.pkl"), "rb") as f:
+                result = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        os.utime(os.path.join(entry, "meta.json"))
+        return result
+
+    def put(self, key: str, result: dict, meta: dict | None = None) -> str:
+        """Записывает результат (и модель в MPS) атомарно: через временный каталог."""
+        os.makedirs(self.root, exist_ok=True)
+        entry = self.path(key)
+        tmp = f"{entry}.tmp{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+
+        model = result.get("model")
+        if hasattr(model, "writeMPS"):
+            model.writeMPS(os.path.join(tmp, "model.mps"))
+        stored = {k: v for k, v in result.items() if k != "model"}
+        for k in _VAR_KEYS:
+            if k in stored:
+                stored[k] = tree_values(stored[k])
+        with open(os.path.join(tmp, "result.pkl"), "wb") as f:
+            pickle.dump(stored, f, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({**(meta or {}), "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                       "bytes": _dir_size(tmp)}, f, ensure_ascii=False, indent=2, default=str)
+
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+        self.evict()
+        return entry
+
+    def entries(self) -> list[tuple[float, int, str]]:
+        """[(время использования, байт, ключ)] от давних к свежим."""
+        out = []
+        if not os.path.isdir(self.root):
+            return out
+        for key in os.listdir(self.root):
+            meta = os.path.join(self.root, key, "meta.json")
+            if os.path.exists(meta):
+                out.append((os.path.getmtime(meta), _dir_size(self.path(key)), key))
+        return sorted(out)
+
+    def evict(self) -> list[str]:
+        """Удаляет давно не использованные записи сверх max_bytes; возвращает их ключи."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(self.path(key), ignore_errors=True)
+            total -= size
+            removed.append(key)
+        return removed
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def default_cache() -> SolveCache | None:
+    """Кэш по cfg.cache_dir и cfg.cache_max_mb; None, если кэш выключен."""
+    if not cfg.cache_dir:
+        return None
+    return SolveCache(cfg.cache_dir, int(cfg.cache_max_mb*2**20))
+
+
+def solve_cached(mode: str, solve, inst: ProblemInstance,
+                 cache: SolveCache | None = None, require_hit: bool = False) -> dict:
+    """
+    solve(inst=inst) через кэш (по умолчанию default_cache()): при попадании
+    результат читается из кэша, иначе режим решается и результат с
+    решением (статус из SOLVED_STATUSES) записывается. В журнал прогона
+    пишется раздел "cache" ({"key", "hit", "path", "seconds"}), у
+    результата — ключ "cache".
+    require_hit — только из кэша (перестроение отчёта): при промахе CacheMiss.
+    У результата из кэша "model" = None, переменные — числами.
+    """
+    if cache is None:
+        cache = default_cache()
+    if cache is None:
+        if require_hit:
+            raise CacheMiss("Кэш решений выключен (cfg.cache_dir = None)")
+        return solve(inst=inst)
+
+    key = cache_key(mode, inst)
+    t0 = time.perf_counter()
+    with runlog.phase("cache"):
+        result = cache.get(key)
+    if result is not None:
+        info = {"key": key, "hit": True, "path": cache.path(key),
+                "seconds": round(time.perf_counter() - t0, 4)}
+        result["model"] = None
+        runlog.log(1, f"[INFO] Кэш: решение {key[:12]} из {cache.path(key)}")
+    elif require_hit:
+        raise CacheMiss(f"Нет решения в кэше для ключа {key[:12]} (режим {mode})")
+    else:
+        result = solve(inst=inst)
+        if result["status_str"] in SOLVED_STATUSES:
+            t0 = time.perf_counter()
+            with runlog.phase("cache"):
+                cache.put(key, result, {"mode": mode, "instance": repr(inst)})
+            info = {"key": key, "hit": False, "path": cache.path(key),
+                    "seconds": round(time.perf_counter() - t0, 4)}
+            runlog.log(1, f"[INFO] Кэш: промах, решение записано ({key[:12]})")
+        else:
+            # без решения (Not Solved, Infeasible, ...) не кэшируем: следующий прогон решит заново
+            info = {"key": key, "hit": False, "path": None, "seconds": 0.0}
+            runlog.log(1, f"[INFO] Кэш: промах, статус {result['status_str']} не записан")
+    result["cache"] = info
+    runlog.record("cache", info)
+    return result
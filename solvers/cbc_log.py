@@ -0,0 +1,101 @@
+﻿# solvers/cbc_log.py
+#
+# Разбор лога CBC: найденные решения, границы, итоговый разрыв.
+
+import re
+
+_INCUMBENT = re.compile(
+    r"(?:Cbc0012I Integer solution of|Cbc0004I Integer solution of)\s+(-?[\d.eE+-]+)"
+    r".*?\(([\d.]+) seconds\)"
+)
+_MIPSTART = re.compile(r"Cbc0045I .*?(?:solution|cost)\D*?(-?[\d.eE+-]+)")
+_PROGRESS = re.compile(
+    r"Cbc0010I After (\d+) nodes, \d+ on tree, (-?[\d.eE+-]+) best solution, "
+    r"best possible (-?[\d.eE+-]+) \(([\d.]+) seconds\)"
+)
+_RESULT    = re.compile(r"^Result - (.+)$")
+_OBJECTIVE = re.compile(r"^Objective value:\s+(-?[\d.eE+-]+)")
+_BOUND     = re.compile(r"^(?:Upper|Lower) bound:\s+(-?[\d.eE+-]+)")
+_NODES     = re.compile(r"^Enumerated nodes:\s+(\d+)")
+_WALLCLOCK = re.compile(r"^Total time \(CPU seconds\):\s+([\d.]+)\s+\(Wallclock seconds\):\s+([\d.]+)")
+
+
+def parse_cbc_line(line: str, maximize: bool = True) -> dict | None:
+    """
+    Разбирает одну строку лога CBC в событие:
+      {"kind": "incumbent", "objective": ..., "time": ...}
+      {"kind": "progress", "nodes": ..., "objective": ..., "bound": ..., "time": ...}
+    При -max CBC печатает ход решения во внутреннем (минимизируемом) знаке,
+    поэтому для задачи на максимум знак меняется. Исключение — решения,
+    достроенные из MIP-старта («found by Reduced search»): они, как и
+    строка Cbc0045I, напечатаны в знаке исходной задачи.
+    """
+    m = _INCUMBENT.search(line)
+    if m:
+        internal = "Reduced search" not in line
+        return {"kind": "incumbent", "objective": _fix_sign(m.group(1), maximize, internal),
+                "time": float(m.group(2))}
+    m = _PROGRESS.search(line)
+    if m:
+        return {"kind": "progress", "nodes": int(m.group(1)),
+                "objective": _fix_sign(m.group(2), maximize),
+                "bound": _fix_sign(m.group(3), maximize),
+                "time": float(m.group(4))}
+    return None
+
+
+def _fix_sign(text: str, maximize: bool, internal: bool = True) -> float:
+    """Значение из лога в знаке исходной задачи (internal — во внутреннем знаке CBC)."""
+    value = float(text)
+    return -value if maximize and internal else value
+
+
+def relative_gap(objective: float | None, bound: float | None) -> float | None:
+    """Относительный разрыв |bound - objective| / |bound| (как gapRel в CBC)."""
+    if objective is None or bound is None:
+        return None
+    return abs(bound - objective) / max(abs(bound), 1e-9)
+
+
+def parse_cbc_log(text: str, maximize: bool = True) -> dict:
+    """
+    Сводка по полному логу CBC:
+      incumbents            — [(время, значение цели)] в порядке нахождения,
+      first_incumbent_time  — время первого решения, с (MIP-старт — 0.0),
+      result, objective, bound, gap, nodes, wallclock.
+    """
+    stats = {
+        "incumbents": [], "first_incumbent_time": None,
+        "result": None, "objective": None, "bound": None,
+        "gap": None, "nodes": None, "wallclock": None,
+    }
+    for line in text.splitlines():
+        line = line.strip()
+        ev = parse_cbc_line(line, maximize)
+        if ev and ev["kind"] == "incumbent":
+            stats["incumbents"].append((ev["time"], ev["objective"]))
+            continue
+        m = _MIPSTART.search(line)
+        if m and "infeasible" not in line.lower():
+            stats["incumbents"].append((0.0, _fix_sign(m.group(1), maximize, internal=False)))
+            continue
+        for key, rx, conv in (("result", _RESULT, str),
+                              ("objective", _OBJECTIVE, float),
+                              ("bound", _BOUND, float),
+                              ("nodes", _NODES, int)):
+            m = rx.match(line)
+            if m:
+                stats[key] = conv(m.group(1))
+        m = _WALLCLOCK.match(line)
+        if m:
+            stats["wallclock"] = float(m.group(2))
+
+    if stats["incumbents"]:
+        stats["first_incumbent_time"] = min(t for t, _ in stats["incumbents"])
+    stats["gap"] = relative_gap(stats["objective"], stats["bound"])
+    return stats
+
+
+def read_cbc_log(path: str, maximize: bool = True) -> dict:
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return parse_cbc_log(f.read(), maximize)
@@ -0,0 +1,535 @@
+# solvers/colgen.py
+#
+# Генерация столбцов по расписаниям агрегатов: столбец — допустимое для
+# build_model расписание одного агрегата на весь горизонт (серии кампаний,
+# ремонты, смены по reconf_matrix, не больше двух рабочих дней подряд),
+# главная LP-задача выбирает смесь столбцов каждого агрегата при NSI-лимите,
+# материальном балансе (накопительный выпуск, как matbal_form="cumulative")
+# и can_parallel. Новые столбцы даёт динамическое программирование по дням
+# для каждого агрегата на двойственных ценах главной задачи; главная LP
+# живёт в HiGHS (highspy) и перерешивается с прошлого базиса, без highspy
+# решается заново через scipy linprog. Размер главной задачи —
+# O(стадий·кампаний·дней), без переменных смен на пару кампаний.
+# Граница — Лагранжа по ценам главной задачи. План — эвристика, а не поиск
+# по дереву: лучший из планов конструктивной эвристики по долям решения LP
+# и главной задачи с бинарными весами на найденных столбцах (price-and-
+# branch, HiGHS из scipy) — столбцы после корня не генерируются, поэтому
+# оптимальность доказывается только совпадением плана с границей.
+# Граница Данцига–Вулфа бывает слабой: на сгенерированных 12-дневных
+# задачах разрыв 20–30 % при планах в пределах нескольких процентов от CBC
+# за 120 с; на 30 днях × 8 кампаний корень сходится за 1–2 с, на 60 × 12
+# не сходится за 20 с. Режим — быстрый план с честной границей, не замена milp.
+
+import time
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog, milp, LinearConstraint, Bounds
+
+try:
+    from highspy import Highs
+except ImportError:
+    Highs = None
+
+import config.settings as cfg
+from data.instance import ProblemInstance
+from solvers import runlog
+from solvers.cbc_log import relative_gap
+from solvers.heuristic import construct_schedule, _to_values
+from solvers.rounding import EXPLORE_LEVELS, lp_chooser
+from models.rolling_model import objective_value
+from solvers.solve import _collect_result
+
+# Порог приведённой стоимости нового столбца (доля от максимальной производительности)
+RC_TOL = 1e-6
+
+# Вес центра стабилизации в сглаженных двойственных ценах (_generate)
+SMOOTHING = 0.5
+
+# Генерация столбцов сошлась, если граница Лагранжа ближе к LP (доля границы)
+BOUND_GAP = 1e-4
+
+# Столбцы с нулевым весом дольше стольких итераций удаляются из главной задачи
+MAX_IDLE_ITERS = 50
+
+# Состояния дня в price_aggregate
+IDLE0, IDLE1, WORK1, WORK2 = range(4)
+
+
+class _Master:
+    """
+    Главная задача в матричной форме (max), столбцы — расписания агрегатов
+    work[t] (индекс кампании или -1 для простоя) и накопительный выпуск
+    cum[s][k][t]; LP решается в HiGHS (_lp) с прошлого базиса или, без
+    него, через linprog по matrices():
+      Conv[a]       Σ_p λ[a][p] = 1,
+      Prod[s][k][t] Σ_p rate·[work_p[t] = k]·λ - cum[t] + cum[t-1] = 0,
+      NSI[k]        cum[1][k][T] <= total_nsi[k],
+      MatBal[s][k][t] cum[s][k][t] <= cum[s-1][k][t - cooling[k]],
+      Seq[s][k][t]  Σ_{p агрегатов без can_parallel} [work_p[t] = k]·λ <= 1.
+    """
+
+    def __init__(self, inst: ProblemInstance):
+        self.inst = inst
+        self.days = np.array(inst.days)
+        self.stages = sorted(inst.stage_aggs)
+        self.T, self.K, self.S = len(inst.days), len(inst.campaigns), len(self.stages)
+        self.A = len(inst.aggs)
+        self.stage_of = np.array([si for si, s in enumerate(self.stages)
+                                  for _ in inst.stage_aggs[s]])
+        # Seq связывает только стадии с двумя и больше агрегатами без can_parallel
+        seq = [not inst.can_parallel.get(r, False) for r in inst.aggs]
+        self.seq = np.array([seq[a] and sum(seq[b] for b in range(self.A)
+                                            if self.stage_of[b] == self.stage_of[a]) > 1
+                             for a in range(self.A)], dtype=bool)
+        self.columns: list[tuple[int, np.ndarray, float]] = []   # (агрегат, work, цель)
+        self.used: list[int] = []                                # последняя итерация с λ > 0
+        self._seen: set[tuple[int, bytes]] = set()
+
+        T, K, S = self.T, self.K, self.S
+        self.n_cum = S*K*T
+        self.n_eq = self.A + S*K*T
+        self.n_ub = K + S*K*T + S*K*T
+        self._cum = self._cum_block()
+        # постоянная LP: столбцы cum, затем λ по порядку self.columns
+        self._lp = self._init_highs() if Highs is not None else None
+
+    def _cum_row(self, si, k, t):
+        return (si*self.K + k)*self.T + t
+
+    def _cum_block(self):
+        """Строки cum: (eq rows, eq cols, eq vals, ub rows, ub cols, ub vals, b_ub) без λ."""
+        inst, T, K = self.inst, self.T, self.K
+        eq_r, eq_c, eq_v, ub_r, ub_c, ub_v = [], [], [], [], [], []
+        b_ub = np.zeros(self.n_ub)
+        idx = np.arange(self.n_cum).reshape(self.S, K, T)   # cum относительно начала блока
+        # Prod: -cum[t] + cum[t-1]
+        eq_r.append(self.A + idx.ravel()); eq_c.append(idx.ravel()); eq_v.append(-np.ones(self.n_cum))
+        eq_r.append(self.A + idx[:, :, 1:].ravel()); eq_c.append(idx[:, :, :-1].ravel())
+        eq_v.append(np.ones(self.S*K*(T - 1)))
+        for si, s in enumerate(self.stages):
+            for ki, k in enumerate(inst.campaigns):
+                if s == 1:
+                    ub_r.append(np.array([ki])); ub_c.append(idx[si, ki, -1:]); ub_v.append(np.ones(1))
+                    b_ub[ki] = inst.total_nsi[k]
+                    continue
+                rows = K + idx[si, ki]
+                # последний день, выпуск которого к дню t успевает остыть (-1 — нет)
+                pos = np.searchsorted(self.days, self.days - inst.cooling_time[k], side="right") - 1
+                ub_r.append(rows); ub_c.append(idx[si, ki]); ub_v.append(np.ones(T))
+                has = pos >= 0
+                ub_r.append(rows[has]); ub_c.append(idx[si - 1, ki, pos[has]])
+                ub_v.append(-np.ones(int(has.sum())))
+        b_ub[K + self.n_cum:] = 1.0
+        return (np.concatenate(eq_r), np.concatenate(eq_c), np.concatenate(eq_v),
+                np.concatenate(ub_r), np.concatenate(ub_c), np.concatenate(ub_v), b_ub)
+
+    def _init_highs(self):
+        lp = Highs()
+        lp.setOptionValue("output_flag", False)
+        # новые столбцы сохраняют прямую допустимость базиса — прямой симплекс
+        lp.setOptionValue("simplex_strategy", 4)
+        c_r, c_c, c_v, cu_r, cu_c, cu_v, b_ub = self._cum
+        b_eq = np.concatenate([np.ones(self.A), np.zeros(self.n_cum)])
+        n_rows = self.n_eq + self.n_ub
+        lp.addRows(n_rows, np.concatenate([b_eq, np.full(self.n_ub, -np.inf)]),
+                   np.concatenate([b_eq, b_ub]), 0, np.zeros(n_rows, dtype=np.int32),
+                   np.zeros(0, dtype=np.int32), np.zeros(0))
+        block = sparse.coo_matrix(
+            (np.concatenate([c_v, cu_v]),
+             (np.concatenate([c_r, cu_r + self.n_eq]), np.concatenate([c_c, cu_c]))),
+            shape=(n_rows, self.n_cum)).tocsc()
+        lp.addCols(self.n_cum, np.zeros(self.n_cum), np.zeros(self.n_cum),
+                   np.full(self.n_cum, np.inf), block.nnz, block.indptr[:-1].astype(np.int32),
+                   block.indices.astype(np.int32), block.data.astype(float))
+        return lp
+
+    def _entries(self, a: int, work: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Коэффициенты столбца λ: строки (равенства, затем n_eq + неравенства) и значения."""
+        ts = np.nonzero(work >= 0)[0]
+        ks = work[ts]
+        rows = self._cum_row(self.stage_of[a], ks, ts)
+        r = [np.array([a]), self.A + rows]
+        v = [np.ones(1), self.inst.rate[a, ks]]
+        if self.seq[a]:
+            r.append(self.n_eq + self.K + self.n_cum + rows)
+            v.append(np.ones(ts.size))
+        return np.concatenate(r), np.concatenate(v).astype(float)
+
+    def add(self, a: int, work: np.ndarray) -> bool:
+        """Добавляет столбец агрегата a (если такого ещё нет)."""
+        key = (a, work.tobytes())
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        value = column_value(self.inst, a, work)
+        self.columns.append((a, work, value))
+        self.used.append(-1)
+        if self._lp is not None:
+            # HiGHS минимизирует: цена -c
+            rows, vals = self._entries(a, work)
+            self._lp.addCols(1, np.array([-value]), np.zeros(1), np.array([np.inf]), rows.size,
+                             np.zeros(1, dtype=np.int32), rows.astype(np.int32), vals)
+        return True
+
+    def prune(self, lam: np.ndarray, it: int, max_idle: int) -> np.ndarray:
+        """
+        Отмечает столбцы с λ > 0 использованными на итерации it и удаляет
+        те, что не использовались больше max_idle итераций (кроме пустых
+        расписаний — с ними главная задача всегда допустима). Удалённый
+        столбец может быть сгенерирован снова. Возвращает индексы
+        оставшихся столбцов (для весов lam).
+        """
+        keep = []
+        for j, (a, work, _) in enumerate(self.columns):
+            if lam[j] > 1e-9 or self.used[j] < 0:
+                self.used[j] = it
+            if it - self.used[j] <= max_idle or not (work >= 0).any():
+                keep.append(j)
+            else:
+                self._seen.discard((a, work.tobytes()))
+        if self._lp is not None and len(keep) < len(self.columns):
+            drop = np.setdiff1d(np.arange(len(self.columns)), keep)
+            self._lp.deleteCols(drop.size, (self.n_cum + drop).astype(np.int32))
+        self.columns = [self.columns[j] for j in keep]
+        self.used = [self.used[j] for j in keep]
+        return np.array(keep, dtype=np.int64)
+
+    def matrices(self):
+        """c, A_eq, b_eq, A_ub, b_ub; столбцы — λ по порядку self.columns, затем cum."""
+        n_l = len(self.columns)
+        eq_r, eq_c, eq_v, ub_r, ub_c, ub_v = [], [], [], [], [], []
+        for j, (a, work, _) in enumerate(self.columns):
+            rows, vals = self._entries(a, work)
+            eq = rows < self.n_eq
+            eq_r.append(rows[eq]); eq_c.append(np.full(eq.sum(), j)); eq_v.append(vals[eq])
+            ub_r.append(rows[~eq] - self.n_eq); ub_c.append(np.full((~eq).sum(), j))
+            ub_v.append(vals[~eq])
+        c_r, c_c, c_v, cu_r, cu_c, cu_v, b_ub = self._cum
+        eq = sparse.coo_matrix(
+            (np.concatenate(eq_v + [c_v]),
+             (np.concatenate(eq_r + [c_r]), np.concatenate(eq_c + [c_c + n_l]))),
+            shape=(self.n_eq, n_l + self.n_cum)).tocsr()
+        ub = sparse.coo_matrix(
+            (np.concatenate(ub_v + [cu_v]),
+             (np.concatenate(ub_r + [cu_r]), np.concatenate(ub_c + [cu_c + n_l]))),
+            shape=(self.n_ub, n_l + self.n_cum)).tocsr()
+        c = np.concatenate([[v for _, _, v in self.columns], np.zeros(self.n_cum)])
+        b_eq = np.concatenate([np.ones(self.A), np.zeros(self.n_cum)])
+        return c, eq, b_eq, ub, b_ub
+
+    def solve_lp(self):
+        """LP главной задачи: (цель, λ, двойственные цены Conv, Prod, Seq)."""
+        if self._lp is not None:
+            lp = self._lp
+            lp.run()
+            status = lp.modelStatusToString(lp.getModelStatus())
+            if status != "Optimal":
+                raise RuntimeError(f"Главная задача не решена: {status}")
+            sol = lp.getSolution()
+            y = np.array(sol.row_dual)
+            obj, eq, ub = -lp.getInfo().objective_function_value, y[:self.n_eq], y[self.n_eq:]
+            lam = np.array(sol.col_value)[self.n_cum:]
+        else:
+            c, A_eq, b_eq, A_ub, b_ub = self.matrices()
+            res = linprog(-c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq,
+                          bounds=(0, None), method="highs")
+            if res.status != 0:
+                raise RuntimeError(f"Главная задача не решена: {res.message}")
+            obj, eq, ub = -res.fun, res.eqlin.marginals, res.ineqlin.marginals
+            lam = res.x[:len(self.columns)]
+        # HiGHS минимизирует -c: двойственные цены (row_dual, marginals) —
+        # производные -цели, цены исходной (max) задачи с обратным знаком;
+        # приведённая стоимость столбца rc = c + Σ_строк коэффициент·цена
+        shape = (self.S, self.K, self.T)
+        duals = {"conv": eq[:self.A], "prod": eq[self.A:].reshape(shape),
+                 "nsi": ub[:self.K], "seq": ub[self.K + self.n_cum:].reshape(shape)}
+        return obj, lam, duals
+
+    def solve_mip(self, time_limit: float | None, gap_rel: float | None):
+        """Главная задача с бинарными λ (HiGHS): (цель или None, граница, λ)."""
+        c, A_eq, b_eq, A_ub, b_ub = self.matrices()
+        n_l = len(self.columns)
+        integrality = np.r_[np.ones(n_l), np.zeros(self.n_cum)]
+        options = {"disp": cfg.verbosity >= 2}
+        if time_limit is not None:
+            options["time_limit"] = time_limit
+        if gap_rel is not None:
+            options["mip_rel_gap"] = gap_rel
+        res = milp(-c, integrality=integrality,
+                   bounds=Bounds(0, np.r_[np.ones(n_l), np.full(self.n_cum, np.inf)]),
+                   constraints=[LinearConstraint(A_eq, b_eq, b_eq),
+                                LinearConstraint(A_ub, -np.inf, b_ub)],
+                   options=options)
+        if res.x is None:
+            return None, None, None
+        bound = -res.mip_dual_bound if getattr(res, "mip_dual_bound", None) is not None else None
+        return -res.fun, bound, np.round(res.x[:n_l])
+
+
+def column_value(inst: ProblemInstance, a: int, work: np.ndarray) -> float:
+    """Вклад расписания work агрегата inst.aggs[a] в цель build_model."""
+    ts = np.nonzero(work >= 0)[0]
+    if not ts.size:
+        return 0.0
+    prod = inst.rate[a, work[ts]].sum()
+    both = (work[:-1] >= 0) & (work[1:] >= 0)
+    hours = inst.reconf_hours[a, work[:-1][both], work[1:][both]].sum()
+    return float(prod - inst.pen_reconf*hours - inst.pen_resource)
+
+
+def price_aggregate(inst: ProblemInstance, a: int, value: np.ndarray) -> tuple[float, np.ndarray]:
+    """
+    Лучшее непустое расписание агрегата inst.aggs[a] по ценам дня value[k, t]
+    (динамическое программирование по дням, O(T·K²)). Состояния дня:
+      IDLE0 — простой до первой работы, IDLE1 — простой после работы,
+      WORK1[k], WORK2[k] — первый и второй рабочий день подряд кампании k
+      (третий подряд запрещён NoIdle).
+    Смена k1→k2 «день в день» возможна только при перевалке короче суток
+    и стоит pen_reconf·часы, после простоя — без ограничений (как в build_model).
+    Ремонты и кампании с нулевой производительностью исключены.
+    Возвращает (ценность без pen_resource, work) или (-inf, пустое), если
+    агрегат не может работать.
+    """
+    K, T = value.shape
+    v = np.where((inst.rate[a] > 0)[:, None] & ~inst.repair_mask[a][None, :], value, -np.inf)
+    switch = np.where(inst.reconf_days[a] > 0, np.inf, inst.pen_reconf*inst.reconf_hours[a])
+    np.fill_diagonal(switch, 0.0)
+
+    # откуда пришли: IDLE1 — (состояние, кампания) вчера, WORK1 — IDLE0/IDLE1,
+    # WORK2[k] — кампания вчерашнего WORK1
+    back_idle = np.zeros((T, 2), dtype=np.int64)
+    back_w1 = np.zeros(T, dtype=np.int64)
+    back_w2 = np.zeros((T, K), dtype=np.int64)
+    idle1, w1, w2 = -np.inf, v[:, 0].copy(), np.full(K, -np.inf)
+    for t in range(1, T):
+        k1, k2 = int(np.argmax(w1)), int(np.argmax(w2))
+        opts = (idle1, w1[k1], w2[k2])
+        i = int(np.argmax(opts))
+        back_idle[t] = ((IDLE1, 0), (WORK1, k1), (WORK2, k2))[i]
+        back_w1[t] = IDLE1 if idle1 > 0.0 else IDLE0
+        cand = w1[:, None] - switch                       # (вчера k1, сегодня k2)
+        back_w2[t] = np.argmax(cand, axis=0)
+        w2 = v[:, t] + cand[back_w2[t], np.arange(K)]
+        w1 = v[:, t] + max(idle1, 0.0)
+        idle1 = opts[i]
+
+    k1, k2 = int(np.argmax(w1)), int(np.argmax(w2))
+    opts = (idle1, w1[k1], w2[k2])
+    i = int(np.argmax(opts))
+    work = np.full(T, -1, dtype=np.int64)
+    if not np.isfinite(opts[i]):
+        return -np.inf, work
+    state, k = ((IDLE1, 0), (WORK1, k1), (WORK2, k2))[i]
+    for t in range(T - 1, -1, -1):
+        if state == IDLE1:
+            state, k = back_idle[t]
+        elif state == WORK1:
+            work[t] = k
+            state = back_w1[t]
+        elif state == WORK2:
+            work[t] = k
+            state, k = WORK1, back_w2[t, k]
+        else:
+            break
+    return float(opts[i]), work
+
+
+def _day_values(master: _Master, a: int, duals: dict) -> np.ndarray:
+    """Цена рабочего дня value[k, t] агрегата a при двойственных ценах duals."""
+    si = master.stage_of[a]
+    value = master.inst.rate[a][:, None]*(1.0 + duals["prod"][si])
+    if master.seq[a]:
+        value = value + duals["seq"][si]
+    return value
+
+
+def _path_value(inst: ProblemInstance, a: int, value: np.ndarray, work: np.ndarray) -> float:
+    """Ценность расписания work по ценам дня value (как в price_aggregate)."""
+    ts = np.nonzero(work >= 0)[0]
+    both = (work[:-1] >= 0) & (work[1:] >= 0)
+    hours = inst.reconf_hours[a, work[:-1][both], work[1:][both]].sum()
+    return float(value[work[ts], ts].sum() - inst.pen_reconf*hours)
+
+
+def _generate(master: _Master, max_iters: int, deadline: float, tol: float):
+    """
+    Генерация столбцов до сходимости, max_iters итераций или момента deadline
+    (time.perf_counter()). Ценообразование на каждой итерации — по текущим
+    ценам и по сглаженным SMOOTHING·центр + (1 - SMOOTHING)·текущие (центр —
+    цены с лучшей границей Лагранжа); добавляются расписания с
+    положительной приведённой стоимостью при текущих ценах.
+    Граница Лагранжа при ценах y: Σ_строк b·y + Σ_агрегатов max(0, лучшее
+    расписание - pen_resource) — верхняя граница цели build_model.
+    Сходимость — нет новых столбцов или граница в пределах BOUND_GAP от LP.
+    Столбцы без веса дольше MAX_IDLE_ITERS итераций удаляются.
+    Возвращает (LP, λ, лучшая граница, итераций, сошлась ли).
+    """
+    inst = master.inst
+    center, bound, it = None, np.inf, 0
+    while True:
+        it += 1
+        lp_obj, lam, duals = master.solve_lp()
+        lam = lam[master.prune(lam, it, MAX_IDLE_ITERS)]
+        added = 0
+        for smooth in ((SMOOTHING, 0.0) if center is not None else (0.0,)):
+            price = {k: smooth*center[k] + (1 - smooth)*v for k, v in duals.items()} \
+                if smooth else duals
+            # строки NSI (b = total_nsi) и Seq (b = 1); marginals <= 0
+            lagr = -float(inst.nsi_total @ price["nsi"]) - float(price["seq"].sum())
+            for a in range(master.A):
+                best, work = price_aggregate(inst, a, _day_values(master, a, price))
+                lagr += max(0.0, best - inst.pen_resource)
+                if smooth:
+                    best = _path_value(inst, a, _day_values(master, a, duals), work)
+                if best - inst.pen_resource + duals["conv"][a] > tol:
+                    added += master.add(a, work)
+            if lagr < bound:
+                center, bound = price, lagr
+        runlog.log(2, f"[DEBUG] CG итерация {it}: LP {lp_obj:.1f}, граница {bound:.1f}, "
+                      f"столбцов +{added} = {len(master.columns)}")
+        converged = not added or bound - lp_obj <= BOUND_GAP*max(abs(bound), 1.0)
+        if converged or it >= max_iters or time.perf_counter() > deadline:
+            return lp_obj, lam, max(bound, lp_obj), it, converged
+
+
+def _occupancy(master: _Master, lam: np.ndarray) -> dict:
+    """
+    Доли x[stage][r][k][t] по весам λ решения главной задачи (как значения
+    x LP-релаксации build_model для solvers.rounding.lp_chooser).
+    """
+    inst = master.inst
+    occ = np.zeros((master.A, master.K, master.T))
+    for (a, work, _), w in zip(master.columns, lam):
+        ts = np.nonzero(work >= 0)[0]
+        if w > 1e-9 and ts.size:
+            occ[a, work[ts], ts] += w
+    return {s: {r: {k: dict(zip(inst.days, occ[inst.agg_index[r], ki].tolist()))
+                    for ki, k in enumerate(inst.campaigns)}
+                for r in aggs}
+            for s, aggs in inst.stage_aggs.items()}
+
+
+def _add_plan(master: _Master, x_vals: dict):
+    """Расписания агрегатов допустимого плана (значения x) — столбцами в главную задачу."""
+    inst = master.inst
+    for stage, aggs in inst.stage_aggs.items():
+        for r in aggs:
+            work = np.full(master.T, -1, dtype=np.int64)
+            for ki, k in enumerate(inst.campaigns):
+                for i, t in enumerate(inst.days):
+                    if x_vals[stage][r][k][t] > 0.5:
+                        work[i] = ki
+            master.add(inst.agg_index[r], work)
+
+
+def solve_colgen(inst: ProblemInstance | None = None,
+                 max_iters: int | None = None,
+                 time_limit: float | None = None,
+                 rounds: int | None = None,
+                 seed: int | None = None,
+                 mip_time_limit: float | None = None,
+                 gap_rel: float | None = None) -> dict:
+    """
+    Генерация столбцов + price-and-branch (по умолчанию inst —
+    ProblemInstance.from_settings(); max_iters, time_limit — итераций и
+    секунд генерации столбцов; rounds, seed — округлений решения главной
+    задачи и их seed; mip_time_limit, gap_rel — лимит и разрыв
+    целочисленной главной задачи: cfg.colgen_*).
+    Стартовые столбцы — пустые расписания и конструктивная эвристика.
+    После генерации столбцов пул пополняется планами конструктивной
+    эвристики, которую направляют доли x решения главной задачи
+    (rounding.lp_chooser: детерминированно и rounds раз случайно), —
+    каждый из них допустим целиком, поэтому целочисленная главная задача
+    не хуже лучшего из них; если HiGHS остановился по лимиту раньше,
+    возвращается лучший из этих планов.
+    Возвращает словарь тех же ключей, что solve_main (model=None);
+    solver_stats — цель, граница, разрыв, итерации, столбцы и время фаз.
+    """
+    if inst is None:
+        inst = ProblemInstance.from_settings()
+    if max_iters is None:
+        max_iters = cfg.colgen_max_iters
+    if time_limit is None:
+        time_limit = cfg.colgen_time_limit
+    if rounds is None:
+        rounds = cfg.colgen_rounds
+    if seed is None:
+        seed = cfg.colgen_seed
+    if mip_time_limit is None:
+        mip_time_limit = cfg.colgen_mip_time_limit
+    if gap_rel is None:
+        gap_rel = cfg.colgen_gap_rel
+    days = list(inst.days)
+    t_start = time.perf_counter()
+
+    master = _Master(inst)
+    with runlog.phase("heuristic"):
+        for a in range(master.A):
+            master.add(a, np.full(master.T, -1, dtype=np.int64))
+        start = construct_schedule(days, inst)
+        _add_plan(master, start[0])
+
+    with runlog.phase("colgen"):
+        t0 = time.perf_counter()
+        tol = RC_TOL*max(float(inst.rate.max()), 1.0)
+        lp_obj, lam, bound, it, converged = _generate(master, max_iters, t0 + time_limit, tol)
+        lp_s = time.perf_counter() - t0
+
+    with runlog.phase("rounding"):
+        t0 = time.perf_counter()
+        x_lp = _occupancy(master, lam)
+        rng = np.random.default_rng(seed)
+        best = (objective_value(days, start[0], start[1], start[2], inst), start)
+        for i in range(rounds + 1):
+            choose = lp_chooser(x_lp) if i == 0 else \
+                lp_chooser(x_lp, rng, EXPLORE_LEVELS[i % len(EXPLORE_LEVELS)])
+            plan = construct_schedule(days, inst, choose)
+            _add_plan(master, plan[0])
+            value = objective_value(days, plan[0], plan[1], plan[2], inst)
+            if value > best[0]:
+                best = (value, plan)
+        rounding_s = time.perf_counter() - t0
+
+    with runlog.phase("mip"):
+        t0 = time.perf_counter()
+        _, _, lam = master.solve_mip(mip_time_limit, gap_rel)
+        mip_s = time.perf_counter() - t0
+
+    objective, (x_vals, y_vals, u_vals, z_vals) = best
+    if lam is not None:
+        chosen = [master.columns[j] for j in np.nonzero(lam > 0.5)[0]]
+        plan = ({}, {}, {}, {})
+        for stage, aggs in inst.stage_aggs.items():
+            work = {r: {} for r in aggs}
+            for a, w, _ in chosen:
+                r = inst.aggs[a]
+                if r in work:
+                    work[r] = {days[i]: inst.campaigns[k] for i, k in enumerate(w) if k >= 0}
+            for vals, v in zip(plan, _to_values(inst, days, aggs, work)):
+                vals[stage] = v
+        value = objective_value(days, plan[0], plan[1], plan[2], inst)
+        # при остановке по лимиту HiGHS может вернуть план хуже эвристического
+        if value > objective:
+            objective, (x_vals, y_vals, u_vals, z_vals) = value, plan
+
+    stats = {"backend": "colgen", "objective": objective, "bound": bound,
+             "gap": relative_gap(objective, bound),
+             "wallclock": time.perf_counter() - t_start, "first_incumbent_time": None,
+             "lp_objective": lp_obj, "iterations": it, "converged": converged,
+             "columns": len(master.columns), "lp_s": lp_s, "rounding_s": rounding_s,
+             "mip_s": mip_s}
+    runlog.log(1, f"[INFO] Генерация столбцов: цель {objective:.1f}, граница {bound:.1f}, "
+                  f"разрыв {stats['gap']:.3f} ({it} итераций, {len(master.columns)} столбцов, "
+                  f"{stats['wallclock']:.2f}s)")
+
+    status = "Optimal" if stats["gap"] is not None and stats["gap"] < 1e-9 else "Feasible"
+    result = _collect_result(None, status, days, x_vals, y_vals, u_vals, z_vals, inst)
+    result["solver_stats"] = stats
+    runlog.record("solver_stats", stats)
+    return result
+
+
+if __name__ == "__main__":
+    res = solve_colgen()
+    print("Статус:", res["status_str"], res["solver_stats"])
@@ -0,0 +1,36 @@
+﻿# solvers/greedy.py
+#
+# Быстрый режим без MIP: расписание строится списочной диспетчеризацией
+# (solvers/heuristic.py) и упаковывается в тот же результат, что solve_main.
+
+import time
+
+from data.instance import ProblemInstance
+from solvers import runlog
+from solvers.heuristic import construct_schedule
+from solvers.solve import _collect_result
+
+
+def solve_greedy(inst: ProblemInstance | None = None) -> dict:
+    """
+    Диспетчеризация кампаний по агрегатам стадий в порядке inst.stage_aggs
+    с учётом охлаждения, перевалок reconf_matrix, can_parallel и ремонтов.
+    Возвращает словарь тех же ключей, что solve_main (model=None,
+    status_str="Heuristic"), поэтому отчёт пишется без изменений.
+    inst — данные задачи (по умолчанию ProblemInstance.from_settings()).
+    """
+    if inst is None:
+        inst = ProblemInstance.from_settings()
+    days = list(inst.days)
+    t0 = time.perf_counter()
+    x_vals, y_vals, u_vals, z_vals = construct_schedule(days, inst)
+    runlog.log(1, f"[INFO] Жадное расписание построено за {time.perf_counter() - t0:.3f}s")
+
+    result = _collect_result(None, "Heuristic", days, x_vals, y_vals, u_vals, z_vals, inst)
+    result["solver_stats"] = None
+    return result
+
+
+if __name__ == "__main__":
+    res = solve_greedy()
+    print("Статус:", res["status_str"], res["metrics"])
@@ -0,0 +1,218 @@
+﻿# solvers/heuristic.py
+#
+# Конструктивная эвристика: строит допустимое для build_model расписание
+# стадия за стадией и отдаёт его значениями x/y/u/z (для MIP-старта CBC).
+
+from data.instance import ProblemInstance
+
+
+def campaign_priority(inst: ProblemInstance) -> list[str]:
+    """Кампании в порядке первого появления в nsi_schedule, затем остальные."""
+    order: list[str] = []
+    for d in sorted(inst.nsi_schedule):
+        k = inst.nsi_schedule[d][0]
+        if k not in order:
+            order.append(k)
+    return order + [k for k in inst.campaigns if k not in order]
+
+
+def _reconf_days(inst: ProblemInstance, r: str, k1: str, k2: str) -> int:
+    """Число дней перевалки k1→k2 на агрегате r (как в build_model)."""
+    return inst.reconf_day_count(r, k1, k2)
+
+
+def _schedule_stage(inst: ProblemInstance,
+                    days: list[int],
+                    aggs: list[str],
+                    supply,
+                    order: list[str],
+                    choose=None) -> dict[str, dict[int, str]]:
+    """
+    Раскладывает кампании по агрегатам одной стадии день за днём.
+    supply(k, t) — сколько тонн кампании k стадия может выпустить
+    суммарно к концу дня t. Возвращает {r: {t: k}} для рабочих дней.
+    choose(r, t, feasible, last) — выбор из допустимых кампаний (None —
+    простой); по умолчанию продолжается последняя кампания, иначе
+    берётся кампания с наибольшим запасом.
+    Соблюдаются ограничения build_model:
+      — ремонты, одна кампания в день, can_parallel;
+      — между разными кампаниями не меньше дней перевалки из reconf_matrix;
+      — NoIdle: не более двух рабочих дней подряд без дня перевалки.
+    """
+    rank = {k: i for i, k in enumerate(order)}
+    used = {k: 0.0 for k in inst.campaigns}
+    work: dict[str, dict[int, str]] = {r: {} for r in aggs}
+    last: dict[str, str | None] = {r: None for r in aggs}
+    idle: dict[str, int] = {r: 0 for r in aggs}   # свободных (не ремонтных) дней с последней работы
+
+    for i, t in enumerate(days):
+        seq_taken: set[str] = set()
+        for r in aggs:
+            rep = inst.repairs.get(r, [])
+            if t in rep:
+                continue
+
+            # NoIdle: после двух рабочих дней подряд третий запрещён
+            blocked = (i >= 2
+                       and days[i-1] in work[r] and days[i-2] in work[r]
+                       and days[i-1] not in rep and days[i-2] not in rep)
+
+            choice = None
+            if not blocked:
+                feasible = []
+                for k in inst.campaigns:
+                    rate = inst.prod_rate.get((r, k), 0)
+                    if rate <= 0 or used[k] + rate > supply(k, t):
+                        continue
+                    if not inst.can_parallel.get(r, False) and k in seq_taken:
+                        continue
+                    if last[r] is not None and k != last[r]:
+                        need = _reconf_days(inst, r, last[r], k)
+                        # перевалка нужна и ещё не отстояна
+                        if need > idle[r]:
+                            continue
+                        # смена «день в день» возможна только без дней перевалки
+                        if i >= 1 and days[i-1] in work[r] and need > 0:
+                            continue
+                    feasible.append(k)
+                if feasible and choose is not None:
+                    choice = choose(r, t, feasible, last[r])
+                elif feasible:
+                    if last[r] in feasible:
+                        choice = last[r]
+                    else:
+                        choice = max(feasible,
+                                     key=lambda k: (supply(k, t) - used[k], -rank[k]))
+
+            if choice is None:
+                idle[r] += 1
+                continue
+            work[r][t] = choice
+            used[choice] += inst.prod_rate[(r, choice)]
+            last[r] = choice
+            idle[r] = 0
+            if not inst.can_parallel.get(r, False):
+                seq_taken.add(choice)
+    return work
+
+
+def construct_schedule(days: list[int],
+                       inst: ProblemInstance | None = None,
+                       choose=None) -> tuple[dict, dict, dict, dict]:
+    """
+    Строит допустимое расписание всех стадий inst.stage_aggs
+    (по умолчанию ProblemInstance.from_settings()):
+      стадия 1 ограничена суммарными NSI-объёмами (приоритет — порядок nsi_schedule),
+      стадия s — остывшим выпуском стадии s-1 (cooling_time).
+    choose(stage, r, t, feasible, last) — правило выбора кампании
+    (см. _schedule_stage; solvers/rounding.py — по LP-релаксации).
+    Возвращает значения x_vars, y_vars, u_vars, z_vars в тех же вложенных
+    словарях, что и build_model (0/1 вместо переменных).
+    """
+    if inst is None:
+        inst = ProblemInstance.from_settings()
+    order = campaign_priority(inst)
+    x_vals, y_vals, u_vals, z_vals = {}, {}, {}, {}
+    produced: dict[str, dict[int, float]] | None = None   # выпуск предыдущей стадии по дням
+
+    for stage, aggs in inst.stage_aggs.items():
+        if produced is None:
+            def supply(k, t):
+                return inst.total_nsi[k]
+        else:
+            cum = {k: {} for k in inst.campaigns}
+            for k in inst.campaigns:
+                for t in days:
+                    cum[k][t] = sum(v for tau, v in produced[k].items()
+                                    if tau + inst.cooling_time[k] <= t)
+
+            def supply(k, t, cum=cum):
+                return cum[k][t]
+
+        stage_choose = ((lambda r, t, feasible, last, stage=stage:
+                         choose(stage, r, t, feasible, last))
+                        if choose is not None else None)
+        work = _schedule_stage(inst, days, aggs, supply, order, stage_choose)
+        x_vals[stage], y_vals[stage], u_vals[stage], z_vals[stage] = \
+            _to_values(inst, days, aggs, work)
+
+        produced = {k: {} for k in inst.campaigns}
+        for r in aggs:
+            for t, k in work[r].items():
+                produced[k][t] = produced[k].get(t, 0.0) + inst.prod_rate[(r, k)]
+
+    return x_vals, y_vals, u_vals, z_vals
+
+
+def _to_values(inst: ProblemInstance, days: list[int], aggs: list[str],
+               work: dict[str, dict[int, str]]):
+    """
+    Переводит раскладку {r: {t: k}} в значения x/y/u/z.
+    z=1 ставится на свободные дни перевалок между разными кампаниями
+    и на одиночные пустые дни между рабочими (требование NoIdle).
+    """
+    x = {r: {k: {t: 0 for t in days} for k in inst.campaigns} for r in aggs}
+    y = {r: {k1: {k2: {t: 0 for t in days[:-1]} for k2 in inst.campaigns}
+             for k1 in inst.campaigns} for r in aggs}
+    u = {r: 0 for r in aggs}
+    z = {r: {t: 0 for t in days} for r in aggs}
+
+    for r in aggs:
+        rep = inst.repairs.get(r, [])
+        w = work[r]
+        for t, k in w.items():
+            x[r][k][t] = 1
+        u[r] = 1 if w else 0
+
+        # смена «день в день» (перевалка короче суток) — фиксируем y
+        for i, t in enumerate(days[:-1]):
+            k1, k2 = w.get(t), w.get(days[i+1])
+            if k1 and k2 and k1 != k2:
+                y[r][k1][k2][t] = 1
+
+        # одиночный пустой день между рабочими
+        for i in range(1, len(days) - 1):
+            tp, tc, tn = days[i-1], days[i], days[i+1]
+            if tc in w or any(d in rep for d in (tp, tc, tn)):
+                continue
+            if tp in w and tn in w:
+                z[r][tc] = 1
+
+        # дни перевалки перед сменой кампании
+        prev_k, gap = None, []
+        for t in days:
+            if t in w:
+                if prev_k is not None and w[t] != prev_k:
+                    need = _reconf_days(inst, r, prev_k, w[t])
+                    for tt in gap[len(gap) - need:] if need else []:
+                        z[r][tt] = 1
+                prev_k, gap = w[t], []
+            elif t not in rep:
+                gap.append(t)
+    return x, y, u, z
+
+
+def apply_warm_start(x_vars: dict, y_vars: dict, u_vars: dict, z_vars: dict,
+                     values: tuple[dict, dict, dict, dict]):
+    """
+    Задаёт начальные значения переменных PuLP из construct_schedule
+    (используется вместе с PULP_CBC_CMD(warmStart=True)).
+    При changeover="compact" y в модели нет, стоимость смен CBC досчитает сам.
+    Нули вместо переменных (предрешение build_model) пропускаются.
+    """
+    x_vals, y_vals, u_vals, z_vals = values
+    for stage in x_vars:
+        for r in x_vars[stage]:
+            u_vars[stage][r].setInitialValue(u_vals[stage][r])
+            for k in x_vars[stage][r]:
+                for t, var in x_vars[stage][r][k].items():
+                    if not isinstance(var, int):
+                        var.setInitialValue(x_vals[stage][r][k][t])
+            for k1 in y_vars[stage].get(r, {}):
+                for k2 in y_vars[stage][r][k1]:
+                    for t, var in y_vars[stage][r][k1][k2].items():
+                        if not isinstance(var, int):
+                            var.setInitialValue(y_vals[stage][r][k1][k2][t])
+            for t, var in z_vars[stage][r].items():
+                if not isinstance(var, int):
+                    var.setInitialValue(z_vals[stage][r][t])
@@ -0,0 +1,165 @@
+# solvers/hourly.py
+#
+# Решение модели в N-часовых бакетах (models/hourly_model.py) и сведение
+# результата к суточному отчёту; блоки «кампания»/«переналадка» по дням
+# строятся group_events_by_days.
+
+import time
+
+import pandas as pd
+from pulp import LpStatus, PULP_CBC_CMD, value
+
+import config.settings as cfg
+from data.instance import ProblemInstance
+from data.processing import group_events_by_days
+from models.hourly_model import build_hourly_model, day_buckets
+from solvers import runlog
+
+
+def _coarse_start(days: list[int], n_hours: int, x_vars: dict, u_vars: dict,
+                  time_limit: float, inst: ProblemInstance | None = None) -> bool:
+    """
+    Сжатие шкалы «грубо → точно»: решает модель в суточных бакетах и задаёт
+    её решение, развёрнутое на бакеты по n_hours часов, как MIP-старт.
+    Развёрнутое решение допустимо: суточный разрыв между кампаниями покрывает
+    перевалки до суток, а накопленный выпуск внутри суток — выпуклая комбинация
+    суточных значений, для которых баланс уже выполнен.
+    Возвращает False, если грубая модель не дала решения.
+    """
+    if inst is None:
+        inst = ProblemInstance.from_settings()
+    coarse, _, _, xc, uc = build_hourly_model(days, inst.hours_per_day, inst)
+    coarse.solve(PULP_CBC_CMD(msg=False, timeLimit=time_limit, gapRel=cfg.hourly_gap_rel,
+                              threads=cfg.solver_threads))
+    if LpStatus[coarse.status] != "Optimal":
+        return False
+    by_day = day_buckets(days, n_hours, inst.hours_per_day)
+    for stage, aggs in inst.stage_aggs.items():
+        for r in aggs:
+            u_vars[stage][r].setInitialValue(round(value(uc[stage][r]) or 0))
+            for k in inst.campaigns:
+                for i, t in enumerate(days):
+                    v = round(value(xc[stage][r][k][i + 1]) or 0)
+                    for b in by_day[t]:
+                        x_vars[stage][r][k][b].setInitialValue(v)
+    return True
+
+
+def solve_hourly(n_hours: int | None = None, time_limit: float | None = None,
+                 inst: ProblemInstance | None = None) -> dict:
+    """
+    Решает inst.days (по умолчанию ProblemInstance.from_settings()) в бакетах
+    по n_hours часов (по умолчанию cfg.bucket_hours или bucket_size()),
+    лимит CBC — cfg.hourly_time_limit.
+    Возвращает словарь тех же ключей, что solve_main (schedules, tonnages,
+    reconfs, metrics, ... по суткам), плюс:
+      n_hours          — размер бакета,
+      schedule_by_hour — {stage: {(r, час): кампания}},
+      events           — {stage: {r: group_events_by_days(...)}}.
+    В сутках может быть несколько кампаний: ячейка расписания — "K1+K2".
+    Для бакетов мельче суток доля cfg.hourly_coarse_share лимита уходит на
+    суточную модель, её решение — MIP-старт точной (_coarse_start).
+    """
+    if time_limit is None:
+        time_limit = cfg.hourly_time_limit
+    if inst is None:
+        inst = ProblemInstance.from_settings()
+    days = list(inst.days)
+
+    t0 = time.perf_counter()
+    model, n_hours, buckets, x_vars, u_vars = build_hourly_model(days, n_hours, inst)
+    warm = False
+    if n_hours < inst.hours_per_day and cfg.hourly_coarse_share > 0:
+        coarse_limit = time_limit*cfg.hourly_coarse_share
+        warm = _coarse_start(days, n_hours, x_vars, u_vars, coarse_limit, inst)
+        time_limit -= coarse_limit
+    t_build = time.perf_counter() - t0
+    status = model.solve(PULP_CBC_CMD(msg=False, timeLimit=time_limit,
+                                      gapRel=cfg.hourly_gap_rel, warmStart=warm,
+                                      threads=cfg.solver_threads))
+    status_str = LpStatus[status]
+    runlog.log(1, f"[INFO] Бакет {n_hours} ч, {len(buckets)} бакетов: "
+                  f"build+coarse {t_build:.2f}s, "
+                  f"solve {time.perf_counter() - t0 - t_build:.2f}s, {status_str}")
+
+    by_day = day_buckets(days, n_hours, inst.hours_per_day)
+    schedule_by_hour, events = {}, {}
+    schedules, tonnages, reconfs = {}, {}, {}
+    rolled_total = {k: 0.0 for k in inst.campaigns}
+    total_prod1, loads, used_aggs = 0.0, [], 0
+    final_stage = max(inst.stage_aggs)
+
+    for stage, aggs in inst.stage_aggs.items():
+        x = x_vars[stage]
+        sched_h: dict[tuple[str, int], str] = {}
+        schedules[stage], tonnages[stage], reconfs[stage] = {}, {}, {}
+        events[stage] = {}
+        for r in aggs:
+            work = {b: k for b in buckets for k in inst.campaigns
+                    if (value(x[r][k][b]) or 0) > 0.5}
+            for b, k in work.items():
+                for h in range((b - 1)*n_hours + 1, b*n_hours + 1):
+                    sched_h[(r, h)] = k
+            # перевалки — смены кампании между соседними рабочими бакетами
+            seq = [work[b] for b in sorted(work)]
+            reconfs[stage][r] = sum(inst.reconf_matrix[r][(k1, k2)]
+                                    for k1, k2 in zip(seq, seq[1:]) if k1 != k2)
+            loads.append(len(work)*n_hours/inst.hours_per_day)
+            used_aggs += int(bool(work))
+
+            for t in days:
+                codes = []
+                tons  = 0.0
+                for b in by_day[t]:
+                    k = work.get(b)
+                    if k:
+                        tons += inst.prod_rate[(r, k)]*n_hours/inst.hours_per_day
+                        if k not in codes:
+                            codes.append(k)
+                if t in inst.repairs.get(r, []):
+                    label = "РЕМОНТ"
+                elif codes:
+                    label = "+".join(codes)
+                else:
+                    label = ""
+                schedules[stage][(r, t)] = label
+                tonnages[stage][(r, t)]  = tons
+                if stage == 1:
+                    total_prod1 += tons
+                if stage == final_stage:
+                    for k in codes:
+                        rolled_total[k] += sum(
+                            inst.prod_rate[(r, k)]*n_hours/inst.hours_per_day
+                            for b in by_day[t] if work.get(b) == k)
+
+            events[stage][r] = group_events_by_days(
+                sched_h, inst.prod_rate, {r: inst.reconf_matrix[r]},
+                days, inst.hours_per_day, r)
+        schedule_by_hour[stage] = sched_h
+
+    enough = all(rolled_total[k] >= inst.total_nsi[k] for k in inst.campaigns)
+    metrics = {
+        "Суммарно перевалок, ч":    round(sum(sum(v.values()) for v in reconfs.values()), 2),
+        "Суммарно выплавлено, т":   round(total_prod1, 2),
+        "Суммарно прокатано, т":    round(sum(rolled_total.values()), 2),
+        "Задействовано агрегатов":  used_aggs,
+        "Отклонение загрузки":      round(pd.Series(loads).std(), 2) if loads else 0.0,
+    }
+    result = {
+        "model": model, "status_str": status_str, "days": days,
+        "rolled_total_3": rolled_total, "enough": enough,
+        "x_vars": x_vars, "u_vars": u_vars,
+        "schedules": schedules, "tonnages": tonnages, "reconfs": reconfs,
+        "metrics": metrics, "solver_stats": None,
+        "n_hours": n_hours, "schedule_by_hour": schedule_by_hour, "events": events,
+    }
+    for stage in inst.stage_aggs:
+        result[f"rolling{stage}_schedule"] = schedules[stage]
+        result[f"rolling{stage}_tonnage"]  = tonnages[stage]
+        result[f"rolling{stage}_reconf"]   = reconfs[stage]
+    return result
+
+
+if __name__ == "__main__":
+    res = solve_hourly()
+    print("Статус:", res["status_str"], res["metrics"])
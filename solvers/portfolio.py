@@ -0,0 +1,199 @@
+# solvers/portfolio.py
+#
+# Портфель конфигураций CBC: одна и та же модель (один MPS-файл) решается
+# одновременно несколькими процессами CBC с разными seed, уровнем
+# отсечений, эвристиками и MIP-стартом. Решения и границы всех процессов
+# читаются из их логов; как только лучшее решение портфеля доказано в
+# пределах целевого разрыва (граница — лучшая из всех процессов), остальные
+# процессы останавливаются по SIGINT. Победившая конфигурация дописывается
+# в журнал портфеля, по которому портфель настраивается со временем.
+# Процессы CBC и чтение их логов — solvers.streaming.CBCProcess.
+
+import functools
+import json
+import os
+import threading
+import time
+
+from pulp import PULP_CBC_CMD, LpMaximize, PulpSolverError
+
+import config.settings as cfg
+from solvers.cbc_log import parse_cbc_log, relative_gap
+from solvers.streaming import CBCProcess, assign_solution, cbc_command
+
+
+class PortfolioCBC(PULP_CBC_CMD):
+    """
+    PULP_CBC_CMD, который запускает конфигурации configs параллельно:
+      configs — [{"name", "options": [опции CBC без "-"], "warm_start": bool}],
+                каждая решается своим процессом CBC в один поток;
+      on_event(event) — решения и прогресс всех процессов, event["config"] —
+                имя конфигурации, "objective"/"bound"/"gap" — по портфелю.
+    timeLimit и gapRel общие; процессы останавливаются, когда разрыв
+    портфеля (лучшее решение к лучшей границе) не больше gapRel или один
+    из процессов закончил сам. Модели присваивается лучшее из решений.
+    После решения: winner — имя конфигурации с лучшим решением,
+    runs — сводка по конфигурациям, logs — их логи, events — временной ряд.
+    """
+
+    def __init__(self, configs: list[dict], *args, on_event=None, poll: float = 0.2, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.configs = configs
+        self.on_event = on_event
+        self.poll = poll
+        self.events: list[dict] = []
+        self.runs: dict[str, dict] = {}
+        self.logs: dict[str, list[str]] = {}
+        self.winner: str | None = None
+        self.stop_reason: str | None = None
+        self.wallclock: float | None = None
+        self._maximize = True
+
+    def solve_CBC(self, lp, use_mps=True):
+        if not self.executable(self.path):
+            raise PulpSolverError(f"Pulp: cannot execute {self.path} cwd: {os.getcwd()}")
+        tmpMps, tmpMst = self.create_tmp_files(lp.name, "mps", "mst")
+        sol_files = {conf["name"]: next(self.create_tmp_files(f"{lp.name}-{conf['name']}", "sol"))
+                     for conf in self.configs}
+        try:
+            return self._solve(lp, tmpMps, tmpMst, sol_files)
+        finally:
+            self.delete_tmp_files(tmpMps, tmpMst, *sol_files.values())
+
+    def _solve(self, lp, tmpMps: str, tmpMst: str, sol_files: dict[str, str]) -> int:
+        vs, var_names, con_names, _ = lp.writeMPS(tmpMps, rename=1)
+        maximize = self._maximize = lp.sense == LpMaximize
+        if any(c.get("warm_start") for c in self.configs):
+            self.writesol(tmpMst, lp, vs, var_names, con_names)
+
+        lock = threading.Lock()
+        procs: dict[str, CBCProcess] = {}
+        self.runs = {conf["name"]: {"objective": None, "bound": None, "first_incumbent_time": None,
+                                    "status": None, "result": None, "stopped": False}
+                     for conf in self.configs}
+        self.logs = {name: [] for name in self.runs}
+        t0 = time.perf_counter()
+        for conf in self.configs:
+            name = conf["name"]
+            options = ["threads 1", "timeMode elapsed"] + list(conf.get("options", []))
+            if self.optionsDict.get("gapRel") is not None:
+                options.insert(0, f"ratioGap {self.optionsDict['gapRel']}")
+            args = cbc_command(self.path, tmpMps, sol_files[name], maximize,
+                               tmpMst if conf.get("warm_start") else None,
+                               self.timeLimit, options)
+            procs[name] = CBCProcess(args, maximize, t0,
+                                     functools.partial(self._event, name, lock, maximize),
+                                     echo=self.msg, prefix=f"[{name}] ")
+            self.logs[name] = procs[name].lines
+
+        while any(p.poll() is None for p in procs.values()):
+            time.sleep(self.poll)
+            if self.stop_reason is not None:
+                continue
+            with lock:
+                reason = self._stop_reason(procs, maximize)
+            if reason is not None:
+                self.stop_reason = reason
+                for name, p in procs.items():
+                    if p.poll() is None:
+                        self.runs[name]["stopped"] = True
+                        p.interrupt()
+        returncodes = {name: p.wait() for name, p in procs.items()}
+        self.wallclock = time.perf_counter() - t0
+        # Итоговая граница и исход — из сводки в конце лога каждого процесса
+        for name, run in self.runs.items():
+            summary = parse_cbc_log(procs[name].log_text, maximize)
+            run["result"] = summary["result"]
+            if summary["bound"] is not None:
+                run["bound"] = summary["bound"]
+
+        # Лучшее из прочитанных решений
+        best = None
+        for name, run in self.runs.items():
+            if returncodes[name] != 0 or not os.path.exists(sol_files[name]):
+                continue
+            run["status"] = self.readsol_MPS(sol_files[name], lp, vs, var_names, con_names)[0]
+            if run["objective"] is None:
+                continue
+            if best is None or (run["objective"] > best[0]) == maximize:
+                best = (run["objective"], name)
+        if best is None:
+            raise PulpSolverError("Pulp: ни одна конфигурация портфеля не нашла решения")
+
+        self.winner = best[1]
+        return assign_solution(self, lp, sol_files[self.winner], vs, var_names, con_names)
+
+    def _portfolio(self, maximize: bool) -> tuple[float | None, float | None]:
+        """Лучшее решение и лучшая (самая сильная) граница по всем процессам."""
+        objs   = [r["objective"] for r in self.runs.values() if r["objective"] is not None]
+        bounds = [r["bound"] for r in self.runs.values() if r["bound"] is not None]
+        pick = (max, min) if maximize else (min, max)
+        return (pick[0](objs) if objs else None), (pick[1](bounds) if bounds else None)
+
+    def _stop_reason(self, procs: dict, maximize: bool) -> str | None:
+        done = [name for name, p in procs.items() if p.poll() == 0]
+        if done:
+            return f"конфигурация {done[0]} завершилась"
+        objective, bound = self._portfolio(maximize)
+        gap = relative_gap(objective, bound)
+        target = self.optionsDict.get("gapRel")
+        if gap is not None and target is not None and gap <= target:
+            return f"разрыв портфеля {gap:.4f} <= {target}"
+        return None
+
+    def _event(self, name: str, lock: threading.Lock, maximize: bool, ev: dict):
+        """Событие процесса name: обновляет его сводку, в ev — решение и граница портфеля."""
+        run = self.runs[name]
+        with lock:
+            run["objective"], run["bound"] = ev["objective"], ev["bound"]
+            if ev["kind"] == "incumbent" and run["first_incumbent_time"] is None:
+                run["first_incumbent_time"] = ev["wall"]
+            objective, bound = self._portfolio(maximize)
+            ev.update(config=name, objective=objective, bound=bound,
+                      gap=relative_gap(objective, bound))
+            self.events.append(ev)
+        if self.on_event is not None:
+            self.on_event(ev)
+
+    def stats(self) -> dict:
+        """Сводка: решение и граница портфеля, победитель, runs, events."""
+        objective, bound = self._portfolio(self._maximize)
+        firsts = [r["first_incumbent_time"] for r in self.runs.values()
+                  if r["first_incumbent_time"] is not None]
+        return {"objective": objective, "bound": bound, "gap": relative_gap(objective, bound),
+                "wallclock": self.wallclock, "first_incumbent_time": min(firsts, default=None),
+                "winner": self.winner, "stop_reason": self.stop_reason,
+                "runs": self.runs, "events": self.events}
+
+
+def portfolio_configs(size: int | None = None) -> list[dict]:
+    """
+    Первые size конфигураций cfg.portfolio_configs (по умолчанию
+    cfg.portfolio_size, None — по числу ядер, не больше списка).
+    """
+    if size is None:
+        size = cfg.portfolio_size
+    if size is None:
+        size = os.cpu_count() or 1
+    return list(cfg.portfolio_configs[:max(size, 1)])
+
+
+def append_history(stats: dict, instance: dict, path: str | None = None):
+    """
+    Дописывает итог портфеля строкой JSON в path (по умолчанию
+    cfg.portfolio_history; None — не писать): размер задачи, победитель,
+    решение, граница и время первого решения каждой конфигурации.
+    """
+    if path is None:
+        path = cfg.portfolio_history
+    if not path:
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    row = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "instance": instance,
+           "winner": stats["winner"], "gap": stats["gap"], "wallclock": stats["wallclock"],
+           "stop_reason": stats["stop_reason"],
+           "runs": {name: {k: run[k] for k in ("objective", "bound", "first_incumbent_time",
+                                              "result", "stopped")}
+                    for name, run in stats["runs"].items()}}
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(row, ensure_ascii=False) + "\n")
@@ -1,71 +1,190 @@
 ﻿# solvers/recommend_days.py
-'''
-import math
+
+import multiprocessing as mp
+import os
+import queue
+import signal
+
 import pulp
 from pulp import LpStatus, PULP_CBC_CMD
 
 import config.settings as cfg
+from data.instance import ProblemInstance
 from models.rolling_model import build_model
+from solvers import runlog
+
 
-def recommend_days(initial_days: int, limit_days: int = None) -> int | None:
+def _day_capacity(inst: ProblemInstance, aggs: list[str], k: str, t: int) -> float:
     """
-    Рекомендует минимальный горизонт D (initial_days < D <= limit_days), в днях, при котором:
-      1) модель решается со статусом Optimal,
-      2) на этапе 3 прокатано ≥ NSI-объёмы (cfg.total_nsi).
+    Максимум тонн кампании k, который стадия может выпустить за день t:
+    параллельные агрегаты суммируются, из последовательных работает один.
     """
-    if limit_days is None:
-        limit_days = len(cfg.days)
-
-    # Lower bound: дни, необходимые для прокатки NSI
-    lb = initial_days
-    days_needed = []
-    for k in cfg.campaigns:
-        if cfg.total_nsi.get(k, 0) > 0:
-            max_rate = max(cfg.prod_rate.get((r, k), 0) for r in cfg.rolling3)
-            if max_rate > 0:
-                days_needed.append(math.ceil(cfg.total_nsi[k] / max_rate))
-    if days_needed:
-        lb = max(lb, max(days_needed))
-
-    lo = max(initial_days + 1, lb + 1)
-    if lo > limit_days:
-        return None
+    par = [inst.prod_rate.get((r, k), 0) for r in aggs
+           if inst.can_parallel.get(r, False) and t not in inst.repairs.get(r, [])]
+    seq = [inst.prod_rate.get((r, k), 0) for r in aggs
+           if not inst.can_parallel.get(r, False) and t not in inst.repairs.get(r, [])]
+    return sum(par) + (max(seq) if seq else 0)
+
+
+def capacity_feasible(D: int, inst: ProblemInstance | None = None) -> bool:
+    """
+    Нижняя оценка по мощностям всех стадий: может ли горизонт из D дней
+    в принципе вместить NSI-объёмы. Стадия s начинает работу не раньше,
+    чем материал пройдёт охлаждение после всех предыдущих стадий.
+    False — горизонт заведомо недостаточен, True — нужна проверка моделью.
+    """
+    if inst is None:
+        inst = ProblemInstance.from_settings()
+    demand = {k: v for k, v in inst.total_nsi.items() if v > 0}
+    if not demand:
+        return True
+    for stage in sorted(inst.stage_aggs):
+        aggs = inst.stage_aggs[stage]
 
-    def is_feasible(D: int) -> bool:
-        days_horizon = cfg.days[:D]
-        model, x1, x2, x3, y1, y2, y3, u1, u2, u3 = build_model(days_horizon)
-        status = model.solve(PULP_CBC_CMD(msg=False, timeLimit=30))
-        if LpStatus[status] != "Optimal":
+        # По каждой кампании отдельно
+        for k, volume in demand.items():
+            first = 1 + (stage - 1) * inst.cooling_time[k]
+            cap = sum(_day_capacity(inst, aggs, k, t) for t in range(first, D + 1))
+            if cap < volume:
+                return False
+
+        # По суммарной загрузке: один агрегат — одна кампания в день
+        need = 0.0
+        for k, volume in demand.items():
+            best = max(inst.prod_rate.get((r, k), 0) for r in aggs)
+            if best <= 0:
+                return False
+            need += volume / best
+        first = 1 + (stage - 1) * min(inst.cooling_time[k] for k in demand)
+        agg_days = sum(1 for r in aggs for t in range(first, D + 1)
+                       if t not in inst.repairs.get(r, []))
+        if agg_days < need:
             return False
-        rolled3 = {
-            k: sum(
-                cfg.prod_rate[(r, k)] * pulp.value(x3[r][k][d])
-                for r in cfg.rolling3 for d in days_horizon
-            )
-            for k in cfg.campaigns
-        }
-        return all(rolled3[k] >= cfg.total_nsi.get(k, 0) for k in cfg.campaigns)
-
-    if is_feasible(lo):
-        return lo
-
-    hi = lo
-    while hi < limit_days:
-        hi = min(limit_days, hi * 2)
-        if is_feasible(hi):
-            break
-    else:
+    return True
+
+
+def is_feasible(D: int, time_limit: float = 30,
+                inst: ProblemInstance | None = None) -> bool | None:
+    """
+    Проверяет горизонт D моделью: на последней стадии должно быть прокатано
+    не меньше NSI по каждой кампании. Достаточно любого допустимого решения,
+    поэтому CBC останавливается на первом же целочисленном решении.
+    Возвращает True — допустим, False — доказана недопустимость,
+    None — за time_limit ни решение, ни недопустимость не получены.
+    """
+    if inst is None:
+        inst = ProblemInstance.from_settings()
+    days_horizon = list(range(1, D + 1))
+    model, x_vars, y_vars, u_vars, z_vars = build_model(days_horizon, inst=inst)
+    final_stage = max(inst.stage_aggs)
+    for k in inst.campaigns:
+        if inst.total_nsi.get(k, 0) <= 0:
+            continue
+        model += (
+            pulp.lpSum(x_vars[final_stage][r][k][t]*inst.prod_rate[(r, k)]
+                       for r in inst.stage_aggs[final_stage] for t in days_horizon)
+            >= inst.total_nsi[k],
+            f"Demand_{k}"
+        )
+    status = model.solve(PULP_CBC_CMD(msg=False, timeLimit=time_limit, gapRel=1.0))
+    if LpStatus[status] == "Optimal":
+        return True
+    if LpStatus[status] == "Infeasible":
+        return False
+    return None
+
+
+def _init_worker():
+    """
+    Каждый рабочий процесс — лидер своей группы процессов, чтобы при
+    отмене вместе с ним завершался и запущенный им CBC.
+    """
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()
+
+        def _stop(signum, frame):
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            os.killpg(0, signal.SIGTERM)
+
+        signal.signal(signal.SIGTERM, _stop)
+
+
+def _probe(D: int, time_limit: float, inst: ProblemInstance) -> tuple[int, bool | None]:
+    return D, is_feasible(D, time_limit, inst)
+
+
+def recommend_days(initial_days: int,
+                   limit_days: int | None = None,
+                   workers: int | None = None,
+                   time_limit: float = 30,
+                   inst: ProblemInstance | None = None) -> int | None:
+    """
+    Рекомендует минимальный горизонт D (initial_days < D <= limit_days), в днях, при котором
+    на последней стадии прокатано ≥ NSI-объёмов (inst.total_nsi).
+      1) горизонты, не проходящие оценку мощностей capacity_feasible, отбрасываются;
+      2) оставшиеся проверяются моделью параллельно в пуле процессов, по возрастанию D;
+      3) как только найден допустимый D и все меньшие кандидаты недопустимы,
+         остальные проверки отменяются.
+    Допустимость монотонна по D (лишние дни можно оставить пустыми), поэтому
+    допустимый D отсекает все большие кандидаты, а недопустимый — все меньшие.
+    Если меньший кандидат не решён за time_limit, возвращается найденный D
+    с предупреждением: минимальность в этом случае не доказана.
+    inst — данные задачи (по умолчанию ProblemInstance.from_settings()),
+    передаются рабочим процессам целиком, без повторного чтения настроек.
+    """
+    if inst is None:
+        inst = ProblemInstance.from_settings()
+    if limit_days is None:
+        limit_days = len(inst.days)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    candidates = [D for D in range(initial_days + 1, limit_days + 1) if capacity_feasible(D, inst)]
+    if not candidates:
         return None
+    runlog.log(1, f"[INFO] Кандидаты горизонта после оценки мощностей: "
+                  f"{candidates[0]}…{candidates[-1]}")
+
+    results: queue.Queue = queue.Queue()
+    pool = mp.Pool(processes=min(workers, len(candidates)), initializer=_init_worker)
+    try:
+        for D in candidates:
+            pool.apply_async(_probe, (D, time_limit, inst),
+                             callback=results.put,
+                             error_callback=lambda e: results.put((None, e)))
+
+        status: dict[int, bool | None] = {}
+        best = None
+        while True:
+            D, ok = results.get()
+            if D is None:
+                raise ok
+            status[D] = ok
+            runlog.log(2, f"[DEBUG] D={D}: {_STATUS_TEXT[ok]}")
+            if ok:
+                best = D if best is None else min(best, D)
+            elif ok is False:
+                # недопустимость D доказывает недопустимость всех меньших горизонтов
+                for c in candidates:
+                    if c < D:
+                        status.setdefault(c, False)
+
+            if best is not None and all(c in status for c in candidates if c < best):
+                unknown = [c for c in candidates if c < best and status[c] is None]
+                if unknown:
+                    runlog.log(1, f"[WARN] Не решены за {time_limit} с: {unknown}; "
+                                  f"минимальность D={best} не доказана")
+                return best
+            if best is None and len(status) == len(candidates):
+                return None
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+_STATUS_TEXT = {True: "допустим", False: "недопустим", None: "не решён за лимит времени"}
+
 
-    best = None
-    left, right = lo, hi
-    while left <= right:
-        mid = (left + right) // 2
-        if is_feasible(mid):
-            best = mid
-            right = mid - 1
-        else:
-            left = mid + 1
-
-    return best
-'''
\ No newline at end of file
+if __name__ == "__main__":
+    D = recommend_days(initial_days=0, limit_days=3 * cfg.horizon_days)
+    print("Рекомендуемый горизонт:", D)
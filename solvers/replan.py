@@ -0,0 +1,166 @@
+# solvers/replan.py
+#
+# Перепланирование с текущего дня: выполненные дни прошлого плана
+# фиксируются, модель строится только на оставшемся горизонте с состоянием
+# на стыке (последняя кампания агрегата, незавершённая перевалка, выпуск
+# стадий для материального баланса с учётом охлаждения — init_state
+# build_model), решатель стартует с прошлого плана на оставшихся днях.
+# Новые ремонты и изменения НСИ применяются к копии данных задачи.
+
+import time
+
+from pulp import LpStatus, value
+
+import config.settings as cfg
+from data.instance import ProblemInstance
+from models.rolling_model import build_model, initial_state_from_values, switch_values
+from solvers import runlog
+from solvers.backends import solve_cbc_retry
+from solvers.heuristic import apply_warm_start
+from solvers.schedule_result import tree_values
+from solvers.solve import _collect_result
+
+
+def updated_instance(inst: ProblemInstance, repairs: dict[str, list[int]] | None = None,
+                     nsi_schedule: dict | None = None) -> ProblemInstance:
+    """
+    Копия inst с новыми событиями:
+      repairs      — {агрегат: [дни]} — дни добавляются к ремонтам агрегата,
+      nsi_schedule — {день: (кампания, тонны)} — заменяют/дополняют поставки
+                     НСИ (total_nsi пересчитывается).
+    """
+    changes = {}
+    if repairs:
+        merged = {r: set(ts) for r, ts in inst.repairs.items()}
+        for r, ts in repairs.items():
+            merged.setdefault(r, set()).update(ts)
+        changes["repairs"] = {r: sorted(ts) for r, ts in merged.items()}
+    if nsi_schedule:
+        changes["nsi_schedule"] = {**inst.nsi_schedule, **nsi_schedule}
+    return inst.replace(**changes) if changes else inst
+
+
+def _shifted_start(days: list[int], x_vals: dict, z_vals: dict,
+                   inst: ProblemInstance) -> tuple[dict, dict, dict, dict]:
+    """
+    MIP-старт на днях days из прошлого плана: дни, ставшие ремонтом, очищаются,
+    y пересчитываются по оставшимся x, u — по наличию работы.
+    """
+    x = {s: {r: {k: {t: 0 if t in inst.repairs.get(r, ()) else round(x_vals[s][r][k][t])
+                     for t in days} for k in inst.campaigns} for r in aggs}
+         for s, aggs in inst.stage_aggs.items()}
+    z = {s: {r: {t: 0 if t in inst.repairs.get(r, ()) else round(z_vals[s][r][t])
+                 for t in days} for r in aggs}
+         for s, aggs in inst.stage_aggs.items()}
+    y = switch_values(days, x, inst)
+    u = {s: {r: int(any(x[s][r][k][t] for k in inst.campaigns for t in days)) for r in aggs}
+         for s, aggs in inst.stage_aggs.items()}
+    return x, y, u, z
+
+
+def replan(prev_result: dict, current_day: int,
+           repairs: dict[str, list[int]] | None = None,
+           nsi_schedule: dict | None = None,
+           inst: ProblemInstance | None = None,
+           time_limit: float | None = None,
+           gap_rel: float | None = None,
+           warm_start: bool = True) -> dict:
+    """
+    Перепланирует с дня current_day по результату prev_result (solve_main,
+    solve_rolling, replan, ... — переменные или числа, дни inst.days):
+      дни раньше current_day — выполнены и фиксируются как в prev_result,
+      repairs, nsi_schedule — новые события (см. updated_instance),
+      inst — данные, на которых получен prev_result (по умолчанию
+             prev_result["inst"] или ProblemInstance.from_settings()),
+      time_limit, gap_rel — по умолчанию cfg.replan_time_limit, cfg.replan_gap_rel,
+      warm_start — MIP-старт CBC из prev_result на оставшихся днях.
+    Возвращает словарь тех же ключей, что solve_main, по всему горизонту
+    (переменные — числами), плюс "inst" — данные с новыми событиями (для
+    следующего replan) и "replan" — фиксированные дни, время построения и решения.
+    ValueError — current_day вне горизонта или новый НСИ кампании меньше
+    уже выпущенного первой стадией в выполненные дни.
+    """
+    if inst is None:
+        inst = prev_result.get("inst") or ProblemInstance.from_settings()
+    if time_limit is None:
+        time_limit = cfg.replan_time_limit
+    if gap_rel is None:
+        gap_rel = cfg.replan_gap_rel
+    inst = updated_instance(inst, repairs, nsi_schedule)
+
+    days = list(inst.days)
+    done = [t for t in days if t < current_day]
+    rest = [t for t in days if t >= current_day]
+    if not rest:
+        raise ValueError(f"День {current_day} за пределами горизонта {days[0]}–{days[-1]}")
+
+    x_vals = tree_values(prev_result["x_vars"])
+    z_vals = tree_values(prev_result["z_vars"])
+    y_prev = prev_result.get("y_vars")
+    y_vals = tree_values(y_prev) if y_prev and all(y_prev.values()) \
+        else switch_values(days, x_vals, inst)
+    state = initial_state_from_values(done, x_vals, y_vals, z_vals, inst) if done else None
+    if state is not None and 1 in state["produced"]:
+        # новый НСИ не может быть меньше уже прокатанного на первой стадии
+        for k, rolled in state["produced"][1].items():
+            rolled = sum(rolled.values())
+            if rolled > inst.total_nsi[k] + 1e-6:
+                raise ValueError(f"НСИ кампании {k} ({inst.total_nsi[k]:g} т) меньше "
+                                 f"выпуска первой стадии до дня {current_day} ({rolled:g} т)")
+
+    t0 = time.perf_counter()
+    with runlog.phase("build"):
+        model, x_vars, y_vars, u_vars, z_vars = build_model(rest, init_state=state, inst=inst)
+        if warm_start:
+            apply_warm_start(x_vars, y_vars, u_vars, z_vars,
+                             _shifted_start(rest, x_vals, z_vals, inst))
+    t_build = time.perf_counter() - t0
+
+    options = dict(msg=cfg.verbosity >= 2, timeLimit=time_limit, gapRel=gap_rel,
+                   threads=cfg.solver_threads, warmStart=warm_start)
+    t0 = time.perf_counter()
+    with runlog.phase("solver"):
+        status = solve_cbc_retry(model, **options)
+    t_solve = time.perf_counter() - t0
+    runlog.log(1, f"[INFO] Перепланирование с дня {current_day}: "
+                  f"build {t_build:.2f}s, solve {t_solve:.2f}s, {LpStatus[status]}")
+
+    # Выполненные дни — из prev_result, оставшиеся — из новой модели
+    new_y = switch_values(rest, x_vars, inst) if cfg.changeover == "compact" else y_vars
+    for stage, aggs in inst.stage_aggs.items():
+        for r in aggs:
+            for t in rest:
+                z_vals[stage][r][t] = round(value(z_vars[stage][r][t]) or 0)
+                for k in inst.campaigns:
+                    x_vals[stage][r][k][t] = round(value(x_vars[stage][r][k][t]) or 0)
+            for k1 in inst.campaigns:
+                for k2 in inst.campaigns:
+                    for t in rest[:-1]:
+                        y_vals[stage][r][k1][k2][t] = round(value(new_y[stage][r][k1][k2][t]) or 0)
+            # смена кампании на стыке выполненных и новых дней
+            if done:
+                t = done[-1]
+                for k1 in inst.campaigns:
+                    for k2 in inst.campaigns:
+                        y_vals[stage][r][k1][k2][t] = int(
+                            k1 != k2 and x_vals[stage][r][k1][t] and x_vals[stage][r][k2][t + 1])
+    u_vals = {s: {r: int(any(x_vals[s][r][k][t] for k in inst.campaigns for t in days))
+                  for r in aggs} for s, aggs in inst.stage_aggs.items()}
+
+    result = _collect_result(model, LpStatus[status], days, x_vals, y_vals, u_vals, z_vals, inst)
+    result["solver_stats"] = None
+    result["inst"] = inst
+    result["replan"] = {"current_day": current_day, "frozen_days": len(done),
+                        "build_s": round(t_build, 3), "solve_s": round(t_solve, 3),
+                        "warm_start": warm_start}
+    runlog.record("replan", result["replan"])
+    return result
+
+
+if __name__ == "__main__":
+    from solvers.solve import solve_main
+    base = solve_main()
+    inst0 = ProblemInstance.from_settings()
+    day = inst0.days[len(inst0.days)//2]
+    res = replan(base, day, repairs={inst0.aggs[0]: [day, day + 1]}, inst=inst0)
+    print("Статус:", res["status_str"], res["replan"], res["metrics"])
@@ -0,0 +1,122 @@
+﻿# solvers/rolling_horizon.py
+#
+# Декомпозиция по скользящему окну: модель решается на окне W дней
+# с упреждением L дней, первые W дней фиксируются, состояние на стыке
+# (последняя кампания агрегатов, перевалки, запасы между стадиями)
+# переносится в следующее окно через init_state.
+
+import time
+
+from pulp import LpStatus, value
+
+import config.settings as cfg
+from data.instance import ProblemInstance
+from models.rolling_model import build_model, initial_state_from_values
+from solvers import runlog
+from solvers.backends import solve_cbc_retry
+from solvers.solve import _collect_result
+
+
+def _empty_values(days: list[int], inst: ProblemInstance) -> tuple[dict, dict, dict, dict]:
+    x = {s: {r: {k: {t: 0 for t in days} for k in inst.campaigns} for r in aggs}
+         for s, aggs in inst.stage_aggs.items()}
+    y = {s: {r: {k1: {k2: {t: 0 for t in days[:-1]} for k2 in inst.campaigns}
+                 for k1 in inst.campaigns} for r in aggs}
+         for s, aggs in inst.stage_aggs.items()}
+    u = {s: {r: 0 for r in aggs} for s, aggs in inst.stage_aggs.items()}
+    z = {s: {r: {t: 0 for t in days} for r in aggs} for s, aggs in inst.stage_aggs.items()}
+    return x, y, u, z
+
+
+def solve_rolling(window: int | None = None,
+                  lookahead: int | None = None,
+                  time_limit: float | None = None,
+                  inst: ProblemInstance | None = None) -> dict:
+    """
+    Решает горизонт inst.days (по умолчанию ProblemInstance.from_settings())
+    последовательностью окон:
+      окно i оптимизирует дни [s, s + window + lookahead) и фиксирует [s, s + window).
+    window, lookahead, time_limit (на одно окно) — по умолчанию из cfg.rolling_*.
+    Возвращает словарь тех же ключей, что solve_main, плюс "windows" —
+    время построения/решения и статус каждого окна.
+    """
+    if window is None:
+        window = cfg.rolling_window
+    if lookahead is None:
+        lookahead = cfg.rolling_lookahead
+    if time_limit is None:
+        time_limit = cfg.rolling_time_limit
+    if inst is None:
+        inst = ProblemInstance.from_settings()
+
+    days = list(inst.days)
+    x_vals, y_vals, u_vals, z_vals = _empty_values(days, inst)
+    windows: list[dict] = []
+    state = None
+    statuses = set()
+
+    for i in range(0, len(days), window):
+        commit  = days[i:i + window]
+        horizon = days[i:i + window + lookahead]
+
+        t0 = time.perf_counter()
+        model, x_vars, y_vars, u_vars, z_vars = build_model(horizon, init_state=state, inst=inst)
+        t_build = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        status = solve_cbc_retry(model, msg=False, timeLimit=time_limit,
+                                 gapRel=cfg.rolling_gap_rel, threads=cfg.solver_threads)
+        t_solve = time.perf_counter() - t0
+        status_str = LpStatus[status]
+        statuses.add(status_str)
+
+        for stage, aggs in inst.stage_aggs.items():
+            for r in aggs:
+                for t in commit:
+                    z_vals[stage][r][t] = round(value(z_vars[stage][r][t]) or 0)
+                    for k in inst.campaigns:
+                        x_vals[stage][r][k][t] = round(value(x_vars[stage][r][k][t]) or 0)
+
+        done = days[:i + len(commit)]
+        _fill_switches(days[max(i - 1, 0):i + len(commit)], x_vals, y_vals, inst)
+        state = initial_state_from_values(done, x_vals, y_vals, z_vals, inst)
+
+        windows.append({
+            "days": (commit[0], commit[-1]), "horizon": (horizon[0], horizon[-1]),
+            "build_s": round(t_build, 3), "solve_s": round(t_solve, 3),
+            "status": status_str,
+        })
+        runlog.log(1, f"[INFO] Окно {commit[0]}–{commit[-1]} (до {horizon[-1]}): "
+                      f"build {t_build:.2f}s, solve {t_solve:.2f}s, {status_str}")
+
+    for stage, aggs in inst.stage_aggs.items():
+        for r in aggs:
+            u_vals[stage][r] = int(any(x_vals[stage][r][k][t]
+                                       for k in inst.campaigns for t in days))
+
+    status_str = "Optimal" if statuses == {"Optimal"} else ", ".join(sorted(statuses))
+    result = _collect_result(None, status_str, days, x_vals, y_vals, u_vals, z_vals, inst)
+    result["solver_stats"] = None
+    result["windows"] = windows
+    return result
+
+
+def _fill_switches(days: list[int], x_vals: dict, y_vals: dict, inst: ProblemInstance):
+    """
+    y по зафиксированным дням: смена k1→k2 «день в день», в том числе на
+    стыке окон (минимальное значение y, которое выбрал бы и решатель).
+    """
+    for stage, aggs in inst.stage_aggs.items():
+        for r in aggs:
+            for i, t in enumerate(days[:-1]):
+                tn = days[i + 1]
+                for k1 in inst.campaigns:
+                    for k2 in inst.campaigns:
+                        if k1 != k2:
+                            y_vals[stage][r][k1][k2][t] = int(
+                                x_vals[stage][r][k1][t] and x_vals[stage][r][k2][tn])
+
+
+if __name__ == "__main__":
+    res = solve_rolling()
+    print("Статус:", res["status_str"], res["metrics"])
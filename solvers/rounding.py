@@ -0,0 +1,167 @@
+# solvers/rounding.py
+#
+# Быстрый план с оценкой качества без поиска MIP: LP-релаксация build_model
+# даёт верхнюю границу цели, её значения x направляют конструктивную
+# эвристику (рандомизированное округление: кампания агрегата на день
+# выбирается с вероятностью по LP среди допустимых, допустимость держит
+# solvers.heuristic._schedule_stage). Лучший план проверяется в самой
+# модели, разрыв к LP-границе — доказанная оценка качества плана.
+
+import time
+
+import numpy as np
+import pulp
+from pulp import LpStatus, PULP_CBC_CMD
+
+import config.settings as cfg
+from data.instance import ProblemInstance
+from models.rolling_model import build_model, objective_value
+from solvers import runlog
+from solvers.cbc_log import relative_gap
+from solvers.heuristic import construct_schedule
+from solvers.schedule_result import tree_values
+from solvers.solve import _collect_result
+
+# Уровни explore случайных округлений (по кругу): дробные x релаксации
+# завышают простои (NoIdle в LP выполняется долями дня), поэтому часть
+# округлений сильнее тянется к работе, чем подсказывает LP
+EXPLORE_LEVELS = (0.3, 1.0, 3.0, 10.0)
+
+
+def lp_chooser(x_lp: dict, rng: np.random.Generator | None = None, explore: float = 0.05):
+    """
+    Правило выбора для construct_schedule по значениям x LP-релаксации:
+      rng=None — детерминированно: допустимая кампания с наибольшим x
+                 (при равенстве — продолжение последней), простой, если
+                 у всех допустимых x = 0;
+      rng      — случайно: кампания k с весом x[k] + explore, простой —
+                 с весом 1 - Σ x (доля дня, которую LP оставляет свободной).
+    """
+    def choose(stage, r, t, feasible, last):
+        x = x_lp[stage][r]
+        if rng is None:
+            k = max(feasible, key=lambda k: (x[k][t], k == last))
+            return k if x[k][t] > 1e-6 else None
+        weights = [max(x[k][t], 0.0) + explore for k in feasible]
+        weights.append(max(0.0, 1.0 - sum(x[k][t] for k in x)))
+        total = sum(weights)
+        if total <= 0:
+            return None
+        i = rng.choice(len(weights), p=np.asarray(weights)/total)
+        return feasible[i] if i < len(feasible) else None
+    return choose
+
+
+def _leaves(tree, vals):
+    """
+    Пары (лист модели, значение) по вложенным словарям модели и значений;
+    лист — переменная или 0 на месте исключённой предрешением.
+    """
+    if isinstance(tree, dict):
+        for key, sub in tree.items():
+            yield from _leaves(sub, vals[key])
+    else:
+        yield tree, vals
+
+
+def verify_plan(model, var_trees: tuple, values: tuple, threads: int | None = None) -> float | None:
+    """
+    Цель модели на плане values (значения x, y, u, z) или None, если план
+    недопустим: целочисленные переменные фиксируются, остальные (cum, c)
+    находит LP. Границы переменных восстанавливаются.
+    """
+    fixed = []
+    for tree, vals in zip(var_trees, values):
+        for var, val in _leaves(tree, vals):
+            if isinstance(var, pulp.LpVariable):
+                fixed.append((var, var.lowBound, var.upBound, val))
+            elif abs(var - val) > 1e-9:
+                return None   # ненулевое значение там, где предрешение доказало 0
+    for var, _, _, val in fixed:
+        var.lowBound = var.upBound = val
+    try:
+        status = model.solve(PULP_CBC_CMD(msg=False, mip=False, threads=threads))
+    finally:
+        for var, lo, up, _ in fixed:
+            var.lowBound, var.upBound = lo, up
+    return model.objective.value() if status == pulp.LpStatusOptimal else None
+
+
+def solve_rounding(inst: ProblemInstance | None = None,
+                   rounds: int | None = None,
+                   seed: int | None = None,
+                   time_limit: float | None = None) -> dict:
+    """
+    LP-релаксация + округление (по умолчанию inst — ProblemInstance.from_settings(),
+    rounds, seed — cfg.rounding_rounds, cfg.rounding_seed; time_limit —
+    секунд на округления, по умолчанию cfg.rounding_time_limit).
+    Кандидаты: конструктивная эвристика, детерминированное и rounds
+    случайных округлений по LP (explore — по кругу EXPLORE_LEVELS); лучший по цели, допустимость которого
+    подтверждает модель, — результат.
+    Возвращает словарь тех же ключей, что solve_main; solver_stats — цель,
+    граница LP, разрыв (доказанный: план допустим, граница верхняя) и время.
+    """
+    if inst is None:
+        inst = ProblemInstance.from_settings()
+    if rounds is None:
+        rounds = cfg.rounding_rounds
+    if seed is None:
+        seed = cfg.rounding_seed
+    if time_limit is None:
+        time_limit = cfg.rounding_time_limit
+    days = list(inst.days)
+    t_start = time.perf_counter()
+
+    with runlog.phase("build"):
+        model, x_vars, y_vars, u_vars, z_vars = build_model(days, inst=inst)
+    with runlog.phase("lp"):
+        t0 = time.perf_counter()
+        status = model.solve(PULP_CBC_CMD(msg=False, mip=False, threads=cfg.solver_threads))
+        lp_s = time.perf_counter() - t0
+    if status != pulp.LpStatusOptimal:
+        raise RuntimeError(f"LP-релаксация не решена: {LpStatus[status]}")
+    bound = model.objective.value()
+    x_lp = tree_values(x_vars)
+
+    with runlog.phase("rounding"):
+        rng = np.random.default_rng(seed)
+        choosers = [None, lp_chooser(x_lp)]
+        candidates = []
+        t0 = time.perf_counter()
+        for i in range(rounds + 2):
+            choose = choosers[i] if i < 2 else \
+                lp_chooser(x_lp, rng, EXPLORE_LEVELS[i % len(EXPLORE_LEVELS)])
+            values = construct_schedule(days, inst, choose)
+            candidates.append((objective_value(days, *values[:3], inst), i, values))
+            if time.perf_counter() - t0 > time_limit:
+                break
+        candidates.sort(key=lambda c: -c[0])
+
+    with runlog.phase("verify"):
+        var_trees = (x_vars, y_vars, u_vars, z_vars)
+        for _, best_round, values in candidates:
+            objective = verify_plan(model, var_trees, values, cfg.solver_threads)
+            if objective is not None:
+                break
+        else:
+            raise RuntimeError("Ни один план округления не допустим в модели")
+
+    stats = {"backend": "rounding", "objective": objective, "bound": bound,
+             "gap": relative_gap(objective, bound),
+             "wallclock": time.perf_counter() - t_start, "first_incumbent_time": None,
+             "lp_s": lp_s, "rounds": len(candidates), "best_round": best_round}
+    runlog.log(1, f"[INFO] Округление LP: цель {objective:.1f}, граница {bound:.1f}, "
+                  f"разрыв {stats['gap']:.3f} ({len(candidates)} планов, "
+                  f"{stats['wallclock']:.2f}s)")
+
+    x_vals, y_vals, u_vals, z_vals = values
+    result = _collect_result(model, "Optimal" if stats["gap"] < 1e-9 else "Feasible",
+                             days, x_vals, y_vals, u_vals, z_vals, inst)
+    result["solver_stats"] = stats
+    runlog.record("solver_stats", stats)
+    return result
+
+
+if __name__ == "__main__":
+    res = solve_rounding()
+    print("Статус:", res["status_str"], res["solver_stats"])
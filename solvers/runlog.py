@@ -0,0 +1,162 @@
+# solvers/runlog.py
+#
+# Структурированный журнал прогона: время и пиковая память (tracemalloc)
+# по фазам, размеры модели по семействам ограничений, статистика решателя.
+# Журнал включается start() (run.py) и пишется в JSON; без активного
+# журнала phase() и record() ничего не делают, поэтому решатели вызывают
+# их безусловно.
+
+import contextlib
+import json
+import re
+import time
+import tracemalloc
+
+import config.settings as cfg
+
+_STAGE_TOKEN = re.compile(r"[Ss]tage\d+$")
+
+
+class RunLog:
+    """
+    Журнал одного прогона:
+      phases  — [{"name", "wall_s", "peak_mb"}] в порядке завершения,
+                вложенные фазы именуются через "/" ("solve/build"),
+      records — произвольные разделы (model_size, solver_stats, ...).
+    peak_mb — пик выделенной Python-памяти за фазу (включая вложенные),
+    None при track_memory=False; память внешних решателей (CBC, HiGHS)
+    tracemalloc не видит.
+    """
+
+    def __init__(self, track_memory: bool = True):
+        self.track_memory = track_memory
+        self.started = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.phases: list[dict] = []
+        self.records: dict = {}
+        self._stack: list[list] = []   # [имя, пик вложенных фаз]
+        self._own_tracing = False
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._own_tracing = True
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        if self._stack:
+            name = f"{self._stack[-1][0]}/{name}"
+        if self.track_memory:
+            # пик до входа принадлежит объемлющей фазе
+            if self._stack:
+                self._stack[-1][1] = max(self._stack[-1][1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        self._stack.append([name, 0])
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - t0
+            _, inner_peak = self._stack.pop()
+            peak = None
+            if self.track_memory:
+                peak = max(tracemalloc.get_traced_memory()[1], inner_peak)
+                if self._stack:
+                    self._stack[-1][1] = max(self._stack[-1][1], peak)
+            self.phases.append({"name": name, "wall_s": round(wall, 4),
+                                "peak_mb": round(peak / 2**20, 2) if peak is not None else None})
+
+    def record(self, key: str, value):
+        self.records[key] = value
+
+    def close(self):
+        if self._own_tracing:
+            tracemalloc.stop()
+            self._own_tracing = False
+
+    def to_dict(self) -> dict:
+        return {"started": self.started, "phases": self.phases, **self.records}
+
+    def write(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2, default=json_default)
+
+
+def json_default(v):
+    # numpy-скаляры и прочее — через float/str
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return str(v)
+
+
+_active: RunLog | None = None
+
+
+def start(track_memory: bool | None = None) -> RunLog:
+    """Начинает журнал прогона (по умолчанию память — cfg.runlog_memory)."""
+    global _active
+    if _active is not None:
+        _active.close()
+    _active = RunLog(cfg.runlog_memory if track_memory is None else track_memory)
+    return _active
+
+
+def stop() -> RunLog | None:
+    """Завершает текущий журнал и возвращает его."""
+    global _active
+    current, _active = _active, None
+    if current is not None:
+        current.close()
+    return current
+
+
+def active() -> RunLog | None:
+    return _active
+
+
+def phase(name: str):
+    """Фаза текущего журнала; без журнала — пустой контекст."""
+    return _active.phase(name) if _active is not None else contextlib.nullcontext()
+
+
+def record(key: str, value):
+    if _active is not None:
+        _active.record(key, value)
+
+
+def log(level: int, *args):
+    """print(*args), если cfg.verbosity >= level (0 — тихо, 1 — ход решения, 2 — отладка)."""
+    if cfg.verbosity >= level:
+        print(*args)
+
+
+# --- Размеры модели ---
+
+def constraint_family(name: str) -> str:
+    """Семейство ограничения по имени build_model: "TagReconf_stage2_R_K1_K2_3_d1" → "TagReconf"."""
+    for token in name.split("_"):
+        if token and not _STAGE_TOKEN.match(token):
+            return token
+    return name
+
+
+def model_size(model) -> dict | None:
+    """
+    Размер модели: {"n_vars", "n_rows", "nnz", "families": {семейство: {"rows", "nnz"}}}.
+    model — LpProblem (семейства по именам ограничений) или SparseModel
+    (семейства, отмеченные при сборке); для прочих моделей (CpModel) — None.
+    """
+    families: dict[str, dict[str, int]] = {}
+    if hasattr(model, "constraints"):
+        for name, c in model.constraints.items():
+            fam = families.setdefault(constraint_family(name), {"rows": 0, "nnz": 0})
+            fam["rows"] += 1
+            fam["nnz"]  += len(c)
+        size = {"n_vars": model.numVariables(), "n_rows": len(model.constraints),
+                "nnz": sum(f["nnz"] for f in families.values())}
+    elif hasattr(model, "families"):
+        for fam_name, (rows, nnz) in model.families.items():
+            families[fam_name] = {"rows": rows, "nnz": nnz}
+        size = {"n_vars": model.n_cols, "n_rows": model.n_rows, "nnz": model.nnz}
+    else:
+        return None
+    size["families"] = dict(sorted(families.items(), key=lambda kv: -kv[1]["nnz"]))
+    return size
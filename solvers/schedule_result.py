@@ -0,0 +1,186 @@
+# solvers/schedule_result.py
+#
+# Решение в массивах NumPy: значения x/y/u/z считываются за один проход,
+# расписания, тоннажи, перевалки и метрики считаются векторно.
+# Словари schedules/tonnages/reconfs — представления для отчёта
+# и прежних ключей результата.
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from data.instance import ProblemInstance
+
+
+def _leaf_value(v) -> float:
+    """Значение LpVariable/выражения или числа (None — 0)."""
+    if isinstance(v, (int, float)):
+        return v
+    if hasattr(v, "varValue"):
+        return v.varValue or 0.0
+    if hasattr(v, "value"):
+        return v.value() or 0.0
+    return 0.0
+
+
+def tree_values(tree):
+    """Вложенный словарь переменных → такой же словарь чисел."""
+    if isinstance(tree, dict):
+        return {k: tree_values(v) for k, v in tree.items()}
+    return _leaf_value(tree)
+
+
+class ScheduleResult:
+    """
+    Значения решения по индексам (стадия, агрегат, кампания, день):
+      X[s, r, k, t], Y[s, r, k1, k2, t], Z[s, r, t], U[s, r] —
+    s, r — позиции в inst.stage_aggs (агрегаты стадии дополнены до общего
+    максимума, лишние позиции нулевые и скрыты маской agg_mask[s, r]),
+    k — позиция в inst.campaigns, t — позиция в days.
+    """
+
+    def __init__(self, days: list[int],
+                 x_vars: dict, y_vars: dict, u_vars: dict, z_vars: dict,
+                 inst: ProblemInstance | None = None):
+        if inst is None:
+            inst = ProblemInstance.from_settings()
+        self.hours_per_day = inst.hours_per_day
+        self.days      = list(days)
+        self.stages    = list(inst.stage_aggs)
+        self.aggs      = {s: list(inst.stage_aggs[s]) for s in self.stages}
+        self.campaigns = list(inst.campaigns)
+
+        S, K, T = len(self.stages), len(self.campaigns), len(self.days)
+        R = max(len(a) for a in self.aggs.values())
+        self.agg_mask = np.zeros((S, R), dtype=bool)
+        self.X = np.zeros((S, R, K, T))
+        self.Y = np.zeros((S, R, K, K, max(T - 1, 0)))
+        self.Z = np.zeros((S, R, T))
+        self.U = np.zeros((S, R))
+        # Параметры в тех же индексах — строки плотных массивов inst
+        self.rate   = np.zeros((S, R, K))
+        self.hours  = np.zeros((S, R, K, K))
+        self.repair = np.zeros((S, R, T), dtype=bool)
+
+        day_pos = {t: i for i, t in enumerate(self.days)}
+        for si, s in enumerate(self.stages):
+            pos = inst.agg_positions(self.aggs[s])
+            n = len(pos)
+            self.rate[si, :n]  = inst.rate[pos]
+            self.hours[si, :n] = inst.reconf_hours[pos]
+            for ri, r in enumerate(self.aggs[s]):
+                self.agg_mask[si, ri] = True
+                self.U[si, ri] = _leaf_value(u_vars[s][r])
+                self.Z[si, ri] = [_leaf_value(z_vars[s][r][t]) for t in self.days]
+                for ki, k in enumerate(self.campaigns):
+                    self.X[si, ri, ki] = [_leaf_value(x_vars[s][r][k][t]) for t in self.days]
+                y_r = y_vars[s].get(r, {})
+                for k1i, k1 in enumerate(self.campaigns):
+                    if k1 not in y_r:
+                        continue
+                    for k2i, k2 in enumerate(self.campaigns):
+                        if k1 != k2:
+                            self.Y[si, ri, k1i, k2i] = [_leaf_value(y_r[k1][k2][t])
+                                                        for t in self.days[:-1]]
+                for t in inst.repairs.get(r, []):
+                    if t in day_pos:
+                        self.repair[si, ri, day_pos[t]] = True
+
+        self._labels  = None
+        self._tonnage = None
+
+    # --- Векторные расчёты ---
+
+    def _compute_stage_tables(self):
+        """Метки и тоннажи по (s, r, t), как в прежнем _extract_stage."""
+        work = self.X > 0.5                                   # (S, R, K, T)
+        busy = work.any(axis=2)                               # (S, R, T)
+        first = work.argmax(axis=2)                           # первая кампания дня
+        on_reconf = (self.Z > 0.5) & ~self.repair
+
+        labels = np.full(busy.shape, "", dtype=object)
+        codes  = np.array(self.campaigns, dtype=object)
+        job = busy & ~self.repair & ~on_reconf
+        labels[job] = codes[first[job]]
+        labels[on_reconf] = "ПЕРЕВАЛКА"
+        labels[self.repair] = "РЕМОНТ"
+
+        rate_day = np.take_along_axis(self.rate, first, axis=2)   # (S, R, T)
+        tonnage = np.where(job, rate_day, 0.0)
+
+        # Блоки перевалок из y: дни t+1 … t+ceil(часы/сутки) — "ПЕРЕВАЛКА k1→k2"
+        for si, ri, k1i, k2i, ti in zip(*np.nonzero(self.Y > 0.5)):
+            days_req = math.ceil(self.hours[si, ri, k1i, k2i] / self.hours_per_day)
+            lo, hi = ti + 1, min(ti + days_req, len(self.days) - 1)
+            if lo <= hi:
+                labels[si, ri, lo:hi + 1] = (f"ПЕРЕВАЛКА {self.campaigns[k1i]}"
+                                             f"→{self.campaigns[k2i]}")
+                tonnage[si, ri, lo:hi + 1] = 0.0
+
+        self._labels, self._tonnage = labels, tonnage
+
+    @property
+    def labels(self) -> np.ndarray:
+        """Метки расписания (s, r, t): кампания, РЕМОНТ, ПЕРЕВАЛКА[ k1→k2] или ""."""
+        if self._labels is None:
+            self._compute_stage_tables()
+        return self._labels
+
+    @property
+    def tonnage(self) -> np.ndarray:
+        """Тоннаж (s, r, t)."""
+        if self._tonnage is None:
+            self._compute_stage_tables()
+        return self._tonnage
+
+    @property
+    def reconf_hours(self) -> np.ndarray:
+        """Часы переналадок по (s, r): Σ y·reconf_matrix."""
+        return np.einsum("srabt,srab->sr", (self.Y > 0.5).astype(float), self.hours)
+
+    @property
+    def produced(self) -> np.ndarray:
+        """Выпуск (s, k) за горизонт, т."""
+        return np.einsum("srkt,srk->sk", self.X, self.rate)
+
+    @property
+    def loads(self) -> np.ndarray:
+        """Рабочих дней по каждому агрегату (в порядке стадий и агрегатов)."""
+        return np.rint(self.X).sum(axis=(2, 3))[self.agg_mask]
+
+    def rolled_total(self) -> dict[str, float]:
+        """Выпуск последней стадии по кампаниям."""
+        final = self.produced[self.stages.index(max(self.stages))]
+        return dict(zip(self.campaigns, final.tolist()))
+
+    def metrics(self) -> dict:
+        loads = self.loads
+        return {
+            "Суммарно перевалок, ч":    round(float(self.reconf_hours.sum()), 2),
+            "Суммарно выплавлено, т":   round(float(self.produced[self.stages.index(1)].sum()), 2),
+            "Суммарно прокатано, т":    round(sum(self.rolled_total().values()), 2),
+            "Задействовано агрегатов":  int(np.rint(self.U)[self.agg_mask].sum()),
+            "Отклонение загрузки":      round(pd.Series(loads).std(), 2) if loads.size else 0.0,
+        }
+
+    # --- Словарные представления (прежний формат) ---
+
+    def schedules(self) -> dict[int, dict[tuple[str, int], str]]:
+        return self._dict_view(self.labels)
+
+    def tonnages(self) -> dict[int, dict[tuple[str, int], float]]:
+        return self._dict_view(self.tonnage)
+
+    def reconfs(self) -> dict[int, dict[str, float]]:
+        hours = self.reconf_hours
+        return {s: {r: float(hours[si, ri]) for ri, r in enumerate(self.aggs[s])}
+                for si, s in enumerate(self.stages)}
+
+    def _dict_view(self, table: np.ndarray) -> dict:
+        rows = table.tolist()
+        return {
+            s: {(r, t): rows[si][ri][ti]
+                for ri, r in enumerate(self.aggs[s]) for ti, t in enumerate(self.days)}
+            for si, s in enumerate(self.stages)
+        }
@@ -0,0 +1,355 @@
+# solvers/service.py
+#
+# Долгоживущий сервис планирования: asyncio-сервер принимает задания
+# решения и перепланирования, выполняет их в ограниченном пуле потоков
+# (CBC — отдельные процессы, поэтому потоков достаточно) и передаёт
+# состояние и ход решения по мере поступления. Недавние результаты
+# (с моделями) держатся в памяти: повторный запрос с теми же данными и
+# настройками отвечает сразу, одинаковые запросы в работе объединяются.
+# Протокол — строки JSON (один объект на строку) через Unix-сокет или TCP:
+#   {"op": "solve", "mode": "milp", "instance": {...}}     — instance в формате
+#                                                             ProblemInstance.to_dict,
+#                                                             без него — config.settings
+#   {"op": "replan", "job": id, "current_day": 8, "repairs": {...}, "nsi_schedule": {...}}
+#   {"op": "status", "job": id}  {"op": "result", "job": id}  {"op": "jobs"}
+# solve/replan отвечают потоком {"job", "state"} / {"job", "event"} до
+# "done" или "failed" (с "wait": false — только первым ответом).
+# Ход решения (event) приходит у режима milp с бэкендами, отдающими
+# решения по мере нахождения: "pulp" при cfg.cbc_streaming, "cpsat", "portfolio".
+# LocalClient — тот же протокол без сокета, в одном процессе.
+# Запуск: python -m solvers.service [--socket путь | --host H --port P] [--workers N]
+
+import argparse
+import asyncio
+import functools
+import hashlib
+import itertools
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import config.settings as cfg
+from data.instance import ProblemInstance
+from reports.report_tables import schedule_table, reconf_table
+from solvers import runlog
+from solvers.cache import cache_key, solve_cached
+from solvers.replan import replan
+from solvers.solve import solve_main
+
+FINAL_STATES = ("done", "failed")
+
+
+def summarize(result: dict, inst: ProblemInstance) -> dict:
+    """Результат режима в JSON-виде: статус, метрики, расписание и перевалки таблицами."""
+    stats = {k: v for k, v in (result.get("solver_stats") or {}).items()
+             if k not in ("events", "runs")}
+    return {
+        "status": result["status_str"],
+        "enough": result["enough"],
+        "metrics": result["metrics"],
+        "rolled_total": result["rolled_total_3"],
+        "solver_stats": stats,
+        "schedule": schedule_table(result["days"], inst.stage_aggs, result["schedules"],
+                                   result["tonnages"]).to_dict("records"),
+        "reconf": reconf_table(inst.stage_aggs, result["reconfs"]).to_dict("records"),
+    }
+
+
+class Job:
+    """
+    Задание сервиса: kind ("solve"/"replan"), key — ключ результата,
+    state — "queued", "running", "done", "failed"; events — ход решения
+    (события on_event решателя), result — результат режима, summary — его
+    JSON-вид, cached — "memory", если ответ взят из памяти сервиса.
+    """
+
+    def __init__(self, job_id: str, kind: str, key: str, params: dict):
+        self.id = job_id
+        self.kind = kind
+        self.key = key
+        self.params = params
+        self.state = "queued"
+        self.events: list[dict] = []
+        self.inst: ProblemInstance | None = None
+        self.result: dict | None = None
+        self.summary: dict | None = None
+        self.error: str | None = None
+        self.cached: str | None = None
+        self.created = time.time()
+        self.started: float | None = None
+        self.finished: float | None = None
+        self.listeners: list[asyncio.Queue] = []
+
+    def info(self) -> dict:
+        last = self.events[-1] if self.events else None
+        return {"job": self.id, "kind": self.kind, "state": self.state, "cached": self.cached,
+                "error": self.error, "progress": last,
+                "wait_s": round((self.started or time.time()) - self.created, 3),
+                "run_s": round(self.finished - self.started, 3)
+                if self.finished and self.started else None}
+
+
+class PlanningService:
+    """
+    Очередь заданий и пул из workers потоков (по умолчанию cfg.service_workers);
+    в памяти — memory_size последних результатов (cfg.service_memory),
+    вытесняются давно не запрошенные.
+    """
+
+    def __init__(self, workers: int | None = None, memory_size: int | None = None):
+        self.workers = workers or cfg.service_workers
+        self.memory_size = memory_size if memory_size is not None else cfg.service_memory
+        self.jobs: dict[str, Job] = {}
+        self.memory: OrderedDict[str, Job] = OrderedDict()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                            thread_name_prefix="planner")
+        self._ids = itertools.count(1)
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    # --- Задания ---
+
+    def submit(self, kind: str, params: dict) -> Job:
+        """Ставит задание в очередь (или возвращает готовое/выполняемое с тем же ключом)."""
+        self._loop = asyncio.get_running_loop()
+        if kind == "solve":
+            inst = ProblemInstance.from_dict(params["instance"]) if params.get("instance") \
+                else ProblemInstance.from_settings()
+            mode = params.get("mode") or cfg.run_mode
+            from run import MODES
+            if mode not in MODES:
+                raise ValueError(f"Неизвестный режим: {mode} (есть: {', '.join(sorted(MODES))})")
+            key = cache_key(mode, inst)
+        elif kind == "replan":
+            base = self.jobs.get(params.get("job"))
+            if base is None or base.result is None:
+                raise KeyError(f"Нет выполненного задания {params.get('job')} "
+                               f"(или его результат вытеснен из памяти)")
+            inst = None
+            payload = json.dumps({k: params.get(k) for k in
+                                  ("current_day", "repairs", "nsi_schedule")}, sort_keys=True)
+            key = hashlib.sha256(f"{base.key}|{payload}".encode("utf-8")).hexdigest()
+        else:
+            raise ValueError(f"Неизвестное задание: {kind}")
+
+        same = self.memory.get(key)
+        if same is not None and same.state != "failed":
+            self.memory.move_to_end(key)
+            if same.state != "done":
+                # тот же запрос ещё решается — ответ придёт вместе с ним
+                return same
+            job = Job(f"j{next(self._ids)}", kind, key, params)
+            job.inst, job.result, job.summary = same.inst, same.result, same.summary
+            job.state, job.cached = "done", "memory"
+            job.started = job.finished = time.time()
+            self.jobs[job.id] = job
+            return job
+
+        job = Job(f"j{next(self._ids)}", kind, key, params)
+        job.inst = inst
+        self.jobs[job.id] = job
+        self._remember(job)
+        asyncio.ensure_future(self._run(job))
+        return job
+
+    def _remember(self, job: Job):
+        self.memory[job.key] = job
+        self.memory.move_to_end(job.key)
+        while len(self.memory) > self.memory_size:
+            key, _ = self.memory.popitem(last=False)
+            # модель и переменные вытесненного результата освобождаются,
+            # сводка для status/result остаётся
+            for old in self.jobs.values():
+                if old.key == key and old.state in FINAL_STATES:
+                    old.result = None
+
+    async def _run(self, job: Job):
+        loop = asyncio.get_running_loop()
+        on_event = functools.partial(loop.call_soon_threadsafe, self._event, job)
+        try:
+            job.result = await loop.run_in_executor(self._executor, self._execute, job, on_event)
+            job.summary = summarize(job.result, job.inst)
+            self._set_state(job, "done")
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            self._set_state(job, "failed")
+
+    def _execute(self, job: Job, on_event) -> dict:
+        """Выполняется в потоке пула."""
+        job.started = time.time()
+        self._loop.call_soon_threadsafe(self._set_state, job, "running")
+        if job.kind == "solve":
+            mode = job.params.get("mode") or cfg.run_mode
+            if mode == "milp":
+                solve = functools.partial(solve_main, on_event=on_event)
+            else:
+                from run import MODES
+                solve = MODES[mode]
+            return solve_cached(mode, solve, job.inst)
+        base = self.jobs[job.params["job"]]
+        repairs = job.params.get("repairs")
+        nsi = job.params.get("nsi_schedule")
+        res = replan(base.result, int(job.params["current_day"]),
+                     repairs={r: [int(t) for t in ts] for r, ts in repairs.items()}
+                     if repairs else None,
+                     nsi_schedule={int(d): tuple(v) for d, v in nsi.items()} if nsi else None,
+                     inst=base.inst)
+        job.inst = res["inst"]
+        return res
+
+    def _event(self, job: Job, event: dict):
+        job.events.append(event)
+        self._publish(job, {"job": job.id, "event": event})
+
+    def _set_state(self, job: Job, state: str):
+        job.state = state
+        if state in FINAL_STATES:
+            job.finished = time.time()
+        self._publish(job, self._state_message(job))
+
+    def _state_message(self, job: Job) -> dict:
+        msg = {"job": job.id, "state": job.state}
+        if job.state == "done":
+            msg["result"] = job.summary
+            msg["cached"] = job.cached
+        elif job.state == "failed":
+            msg["error"] = job.error
+        return msg
+
+    def _publish(self, job: Job, msg: dict):
+        for queue in job.listeners:
+            queue.put_nowait(msg)
+
+    async def watch(self, job: Job):
+        """Асинхронный поток сообщений задания до конечного состояния."""
+        queue: asyncio.Queue = asyncio.Queue()
+        job.listeners.append(queue)
+        try:
+            yield self._state_message(job)
+            if job.state in FINAL_STATES:
+                return
+            while True:
+                msg = await queue.get()
+                yield msg
+                if msg.get("state") in FINAL_STATES:
+                    return
+        finally:
+            job.listeners.remove(queue)
+
+    # --- Протокол ---
+
+    async def request(self, msg: dict):
+        """Ответы на запрос протокола (асинхронный генератор словарей)."""
+        op = msg.get("op")
+        try:
+            if op in ("solve", "replan"):
+                job = self.submit(op, msg)
+                if not msg.get("wait", True):
+                    yield self._state_message(job)
+                    return
+                async for out in self.watch(job):
+                    yield out
+            elif op == "status":
+                yield self.jobs[msg["job"]].info()
+            elif op == "result":
+                job = self.jobs[msg["job"]]
+                yield self._state_message(job)
+            elif op == "jobs":
+                yield {"jobs": [job.info() for job in self.jobs.values()]}
+            else:
+                yield {"error": f"Неизвестная операция: {op}"}
+        except (KeyError, ValueError) as e:
+            yield {"error": f"{type(e).__name__}: {e}"}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Соединение: строки JSON запросов → строки JSON ответов."""
+        try:
+            while line := await reader.readline():
+                try:
+                    msg = json.loads(line)
+                except json.JSONDecodeError as e:
+                    writer.write(_encode({"error": f"Неверный JSON: {e}"}))
+                    await writer.drain()
+                    continue
+                async for out in self.request(msg):
+                    writer.write(_encode(out))
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path: str | None = None, host: str | None = None,
+                    port: int | None = None):
+        """Слушает Unix-сокет socket_path или TCP host:port (по умолчанию cfg.service_*)."""
+        if socket_path is None and host is None:
+            socket_path = cfg.service_socket
+        if socket_path and hasattr(asyncio, "start_unix_server"):
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            server = await asyncio.start_unix_server(self.handle, path=socket_path)
+            where = socket_path
+        else:
+            host = host or cfg.service_host
+            port = port or cfg.service_port
+            server = await asyncio.start_server(self.handle, host, port)
+            where = f"{host}:{port}"
+        runlog.log(1, f"[INFO] Сервис планирования: {where}, потоков {self.workers}")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+def _encode(msg: dict) -> bytes:
+    return (json.dumps(msg, ensure_ascii=False, default=runlog.json_default) + "\n").encode("utf-8")
+
+
+class LocalClient:
+    """
+    Клиент сервиса в том же процессе (без сокета): те же запросы и ответы,
+    что у сервера, ответы проходят через JSON, как по сети.
+    """
+
+    def __init__(self, service: PlanningService | None = None):
+        self.service = service or PlanningService()
+
+    async def stream(self, msg: dict):
+        async for out in self.service.request(msg):
+            yield json.loads(_encode(out))
+
+    async def call(self, msg: dict) -> dict:
+        """Последний ответ на запрос (для solve/replan — итог задания)."""
+        out = None
+        async for out in self.stream(msg):
+            pass
+        return out
+
+    async def solve(self, mode: str | None = None, instance: dict | None = None) -> dict:
+        return await self.call({"op": "solve", "mode": mode, "instance": instance})
+
+    async def replan(self, job: str, current_day: int, repairs: dict | None = None,
+                     nsi_schedule: dict | None = None) -> dict:
+        return await self.call({"op": "replan", "job": job, "current_day": current_day,
+                                "repairs": repairs, "nsi_schedule": nsi_schedule})
+
+    async def status(self, job: str) -> dict:
+        return await self.call({"op": "status", "job": job})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сервис планирования (строки JSON)")
+    parser.add_argument("--socket", default=None, help="Unix-сокет (по умолчанию cfg.service_socket)")
+    parser.add_argument("--host", default=None)
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    service = PlanningService(args.workers)
+    try:
+        asyncio.run(service.serve(args.socket, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
@@ -1,157 +1,89 @@
 ﻿# solve.py
 
-import pulp
-from pulp import LpStatus, PULP_CBC_CMD, value
-import pandas as pd
-import math
-
 import config.settings as cfg
-from models.rolling_model import build_model
-from data.processing import count_reconfigurations
-
-def _extract_stage(days: list[int],
-                   aggs: list[str],
-                   x: dict,
-                   z: dict,
-                   y: dict,
-                   repairs: dict[str, list[int]]
-                  ) -> tuple[
-                      dict[tuple[str,int], str],
-                      dict[tuple[str,int], float],
-                      dict[str, float]
-                  ]:
-    """
-    Извлекает для одной стадии:
-      — расписание (код/РЕМОНТ/ПЕРЕВАЛКА или пусто),
-      — тоннаж,
-      — суммарное время переналадок (часов) на каждом агрегате.
+from data.instance import ProblemInstance
+from solvers import runlog
+from solvers.backends import solve_backend
+from solvers.schedule_result import ScheduleResult
+
+# статусы, при которых в результате есть допустимое расписание
+SOLVED_STATUSES = ("Optimal", "Feasible", "Heuristic")
+
+def solve_main(backend: str | None = None,
+               warm_start: bool | None = None,
+               log_path: str | None = None,
+               inst: ProblemInstance | None = None,
+               time_limit: float | None = None,
+               gap_rel: float | None = None,
+               on_event=None) -> dict:
     """
-    schedule: dict[tuple[str,int], str] = {}
-    tonnage:  dict[tuple[str,int], float] = {}
-    reconf:   dict[str, float] = {r: 0.0 for r in aggs}
-
-    # Базовая раскладка: ремонт, флаг перевалки, кампании
-    for r in aggs:
-        for t in days:
-            if t in repairs.get(r, []):
-                schedule[(r, t)] = "РЕМОНТ"
-                tonnage[(r, t)] = 0.0
-            elif value(z[r][t]) > 0.5:
-                schedule[(r, t)] = "ПЕРЕВАЛКА"
-                tonnage[(r, t)] = 0.0
-            else:
-                found = False
-                for k in cfg.campaigns:
-                    if value(x[r][k][t]) > 0.5:
-                        schedule[(r, t)] = k
-                        tonnage[(r, t)] = cfg.prod_rate[(r, k)]
-                        found = True
-                        break
-                if not found:
-                    schedule[(r, t)] = ""
-                    tonnage[(r, t)] = 0.0
-
-        # Суммируем время переналадок по y
-        for k1 in cfg.campaigns:
-            for k2 in cfg.campaigns:
-                if k1 == k2: continue
-                for t in days[:-1]:
-                    if value(y[r][k1][k2][t]) > 0.5:
-                        reconf[r] += cfg.reconf_matrix[r][(k1, k2)]
-
-    # Собираем задачи перевалок из y
-    reconf_tasks: list[tuple[str,str,str,int,int]] = []
-    for r in aggs:
-        for k1 in cfg.campaigns:
-            for k2 in cfg.campaigns:
-                if k1 == k2: continue
-                for t in days[:-1]:
-                    if value(y[r][k1][k2][t]) > 0.5:
-                        hours    = cfg.reconf_matrix[r][(k1, k2)]
-                        days_req = math.ceil(hours / cfg.hours_per_day)
-                        start    = t + 1
-                        end      = start + days_req - 1
-                        reconf_tasks.append((r, k1, k2, start, end))
-
-    # Убираем все старые метки "ПЕРЕВАЛКА"
-    #for (r, t), v in list(schedule.items()):
-        #if v == "ПЕРЕВАЛКА":
-            #schedule[(r, t)] = ""
-
-    # Склеиваем блоки перевалок как "ПЕРЕВАЛКА k1→k2"
-    for r, k1, k2, start, end in reconf_tasks:
-        for tt in range(start, end + 1):
-            if (r, tt) in schedule:
-                schedule[(r, tt)] = f"ПЕРЕВАЛКА {k1}→{k2}"
-                tonnage[(r, tt)] = 0.0
-
-    return schedule, tonnage, reconf
-
-
-def solve_main() -> dict:
-    """
-    Решает модель для произвольного числа стадий и агрегатов из cfg.stage_aggs.
+    Решает модель для произвольного числа стадий и агрегатов из inst.stage_aggs.
+    backend:    ключ solvers.backends.BACKENDS — "pulp" (CBC), "highs",
+                "sparse" (HiGHS в памяти, без MPS-файла), "cpsat" (OR-Tools);
+                по умолчанию cfg.solver_backend.
+    warm_start: передать решателю MIP-старт (CP-SAT — подсказки) из
+                конструктивной эвристики (solvers.heuristic); по умолчанию cfg.warm_start.
+    log_path:   писать лог решателя в файл; для CBC его сводка (время первого
+                решения, итоговый разрыв и т.д.) попадает в "solver_stats".
+    inst:       данные задачи (по умолчанию ProblemInstance.from_settings()).
+    time_limit, gap_rel: по умолчанию cfg.solver_time_limit, cfg.solver_gap_rel.
+    on_event:   обработчик решений по мере нахождения ({"kind", "wall",
+                "objective", "bound", "gap", ...}); весь ряд — solver_stats["events"].
+                Досрочная остановка — правила cfg.stop_* (solvers/streaming.py).
     Возвращает словарь с результатами, включая backward‐compatibility keys:
       model, status_str, days,
       rolled_total_3, enough,
       x_vars, y_vars, u_vars, z_vars,
       schedules, tonnages, reconfs,
       rolling1_schedule, rolling1_tonnage, rolling1_reconf, ...
-      metrics
+      metrics, solver_stats (backend, objective, bound, gap, wallclock, ...)
     """
-    days = cfg.days
+    if inst is None:
+        inst = ProblemInstance.from_settings()
+    days = list(inst.days)
+    if backend is None:
+        backend = cfg.solver_backend
+    if warm_start is None:
+        warm_start = cfg.warm_start
+
+    # 1) Построение и решение модели выбранным бэкендом
+    out = solve_backend(backend, days, inst, time_limit, gap_rel,
+                        warm_start=warm_start, log_path=log_path, on_event=on_event)
+
+    with runlog.phase("extract"):
+        result = _collect_result(out["model"], out["status_str"], days, out["x_vars"],
+                                 out["y_vars"], out["u_vars"], out["z_vars"], inst)
+    result["solver_stats"] = out["solver_stats"]
+    runlog.record("solver_stats", out["solver_stats"])
+    return result
 
-    # 1) Построение и решение модели
-    model, x_vars, y_vars, u_vars, z_vars = build_model(days)
-    solver     = PULP_CBC_CMD(msg=True, timeLimit=60
-    ,gapRel=0.2
-    )
-    status     = model.solve(solver)
-    status_str = LpStatus[status]
+
+def _collect_result(model, status_str: str, days: list[int],
+                    x_vars: dict, y_vars: dict, u_vars: dict, z_vars: dict,
+                    inst: ProblemInstance | None = None) -> dict:
+    """
+    Собирает расписания, тоннажи, перевалки и метрики из решённых переменных.
+    Переменные могут быть как LpVariable, так и уже числами.
+    Значения считываются один раз в ScheduleResult ("schedule_result"),
+    словари schedules/tonnages/reconfs — его представления.
+    """
+    if inst is None:
+        inst = ProblemInstance.from_settings()
+    sr = ScheduleResult(days, x_vars, y_vars, u_vars, z_vars, inst)
 
     # 2) Итоговый тоннаж по кампаниям на последней стадии
-    final_stage = max(cfg.stage_aggs.keys())
-    rolled_total = {
-        k: sum(cfg.prod_rate[(r, k)] * value(x_vars[final_stage][r][k][d])
-               for r in cfg.stage_aggs[final_stage] for d in days)
-        for k in cfg.campaigns
-    }
-    enough = all(rolled_total[k] >= cfg.total_nsi[k] for k in cfg.campaigns)
+    rolled_total = sr.rolled_total()
+    enough = all(rolled_total[k] >= inst.total_nsi[k] for k in inst.campaigns)
 
-    # 3) Извлечение расписания/тоннажа/перевалок для каждой стадии
-    schedules = {}
-    tonnages  = {}
-    reconfs    = {}
-    for stage, aggs in cfg.stage_aggs.items():
-        sched, ton, rec = _extract_stage(days, aggs,
-                                         x_vars[stage],
-                                         z_vars[stage],
-                                         y_vars[stage],
-                                         cfg.repairs)
-        schedules[stage] = sched
-        tonnages[stage]  = ton
-        reconfs[stage]   = rec
-        print(sched, ton, rec)
+    # 3) Расписания/тоннажи/перевалки для каждой стадии
+    schedules = sr.schedules()
+    tonnages  = sr.tonnages()
+    reconfs   = sr.reconfs()
+    for stage in inst.stage_aggs:
+        runlog.log(2, schedules[stage], tonnages[stage], reconfs[stage])
 
     # 4) Метрики
-    total_reconf = sum(sum(v.values()) for v in reconfs.values())
-    total_prod1  = sum(cfg.prod_rate[(r, k)] * value(x_vars[1][r][k][d])
-                       for r in cfg.stage_aggs[1] for k in cfg.campaigns for d in days)
-    total_prodN  = sum(rolled_total.values())
-    used_aggs    = sum(int(value(u_vars[s][r]))
-                       for s in cfg.stage_aggs for r in cfg.stage_aggs[s])
-    loads = [sum(int(value(x_vars[s][r][k][d]))
-                 for k in cfg.campaigns for d in days)
-             for s in cfg.stage_aggs for r in cfg.stage_aggs[s]]
-    evenness = round(pd.Series(loads).std(), 2) if loads else 0.0
-
-    metrics = {
-        "Суммарно перевалок, ч":    round(total_reconf, 2),
-        "Суммарно выплавлено, т":   round(total_prod1, 2),
-        "Суммарно прокатано, т":    round(total_prodN, 2),
-        "Задействовано агрегатов":  used_aggs,
-        "Отклонение загрузки":      evenness
-    }
+    metrics = sr.metrics()
 
     # 5) Собираем результат и backward-compatible keys
     result = {
@@ -168,9 +100,10 @@ def solve_main() -> dict:
         "tonnages": tonnages,
         "reconfs": reconfs,
         "metrics": metrics,
+        "schedule_result": sr,
     }
     # backward compatibility: rolling{n}_schedule, rolling{n}_tonnage, rolling{n}_reconf
-    for stage in cfg.stage_aggs:
+    for stage in inst.stage_aggs:
         result[f"rolling{stage}_schedule"] = schedules[stage]
         result[f"rolling{stage}_tonnage"]  = tonnages[stage]
         result[f"rolling{stage}_reconf"]   = reconfs[stage]
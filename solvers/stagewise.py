@@ -0,0 +1,196 @@
+# solvers/stagewise.py
+#
+# Декомпозиция по стадиям: стадия 1 решается против NSI-лимитов, её выпуск
+# по дням и кампаниям передаётся стадии 2 как фиксированная кривая поставки
+# (сдвиг на cooling_time учитывает build_model), и так далее по цепочке.
+# Обратная связь: если нижняя стадия упёрлась в поставку, верхним стадиям
+# добавляется бонус за ранний выпуск этих кампаний, и цепочка перерешивается.
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pulp
+from pulp import LpStatus, value
+
+import config.settings as cfg
+from data.instance import ProblemInstance
+from models.rolling_model import build_model, objective_value, switch_values
+from solvers import runlog
+from solvers.backends import solve_cbc_retry
+from solvers.solve import _collect_result
+
+
+def _solve_stage(inst: ProblemInstance, days: list[int], stage: int, supply: dict | None,
+                 bonus: dict[str, float], time_limit: float) -> tuple[dict, str, float]:
+    """
+    Решает одну стадию при заданной поставке предыдущей стадии
+    supply = {k: {tau: тонны}} (None для стадии 1).
+    bonus — {k: вес} бонуса за ранний выпуск кампании k.
+    Возвращает значения (x, y, u, z) стадии, статус и время решения.
+    """
+    init_state = {"produced": {stage - 1: supply}} if supply is not None else None
+    m, x_vars, y_vars, u_vars, z_vars = build_model(days, init_state=init_state,
+                                                    stages=[stage], inst=inst)
+    aggs = inst.stage_aggs[stage]
+    if bonus:
+        horizon = len(days)
+        m.setObjective(m.objective + pulp.lpSum(
+            bonus[k]*inst.prod_rate[(r, k)]*(days[-1] - t + 1)/horizon
+            * x_vars[stage][r][k][t]
+            for r in aggs for k in bonus for t in days
+        ))
+
+    t0 = time.perf_counter()
+    status = solve_cbc_retry(m, msg=False, timeLimit=time_limit,
+                             gapRel=cfg.stagewise_gap_rel, threads=cfg.solver_threads)
+    t_solve = time.perf_counter() - t0
+
+    x = {r: {k: {t: round(value(x_vars[stage][r][k][t]) or 0) for t in days}
+             for k in inst.campaigns} for r in aggs}
+    if y_vars[stage]:
+        y = {r: {k1: {k2: {t: round(value(y_vars[stage][r][k1][k2][t]) or 0) for t in days[:-1]}
+                      for k2 in inst.campaigns} for k1 in inst.campaigns} for r in aggs}
+    else:
+        y = switch_values(days, {stage: x}, inst)[stage]
+    u = {r: round(value(u_vars[stage][r]) or 0) for r in aggs}
+    z = {r: {t: round(value(z_vars[stage][r][t]) or 0) for t in days} for r in aggs}
+    return (x, y, u, z), LpStatus[status], t_solve
+
+
+def _produced(inst: ProblemInstance, x: dict, stage: int,
+              days: list[int]) -> dict[str, dict[int, float]]:
+    """Выпуск стадии по кампаниям и дням: {k: {t: тонны}}."""
+    produced = {k: {} for k in inst.campaigns}
+    for r in inst.stage_aggs[stage]:
+        for k in inst.campaigns:
+            for t in days:
+                if x[r][k][t]:
+                    produced[k][t] = produced[k].get(t, 0.0) + inst.prod_rate[(r, k)]
+    return produced
+
+
+def _starved(inst: ProblemInstance, supply: dict, produced: dict, stage: int) -> set[str]:
+    """
+    Кампании, по которым стадия выбрала почти всю поставку: остаток меньше
+    суточного выпуска самого производительного агрегата стадии.
+    """
+    starved = set()
+    for k in inst.campaigns:
+        best = max(inst.prod_rate.get((r, k), 0) for r in inst.stage_aggs[stage])
+        if best > 0 and sum(supply[k].values()) - sum(produced[k].values()) < best:
+            starved.add(k)
+    return starved
+
+
+def _forward_chain(inst: ProblemInstance, days: list[int], bonus: dict[int, dict[str, float]],
+                   time_limit: float) -> dict:
+    """
+    Прямой проход по стадиям в порядке inst.stage_aggs.
+    bonus — {stage: {k: вес}} бонусов за ранний выпуск.
+    """
+    values = {}
+    statuses, stages = [], []
+    starved: dict[int, set[str]] = {}
+    supply = None
+    for stage in sorted(inst.stage_aggs):
+        vals, status, t_solve = _solve_stage(inst, days, stage, supply,
+                                             bonus.get(stage, {}), time_limit)
+        values[stage] = vals
+        produced = _produced(inst, vals[0], stage, days)
+        if supply is not None:
+            starved[stage] = _starved(inst, supply, produced, stage)
+        supply = produced
+        statuses.append(status)
+        stages.append({"stage": stage, "status": status, "solve_s": round(t_solve, 3)})
+
+    x_vals = {s: v[0] for s, v in values.items()}
+    y_vals = {s: v[1] for s, v in values.items()}
+    u_vals = {s: v[2] for s, v in values.items()}
+    z_vals = {s: v[3] for s, v in values.items()}
+    return {
+        "values": (x_vals, y_vals, u_vals, z_vals),
+        "objective": objective_value(days, x_vals, y_vals, u_vals, inst),
+        "statuses": statuses, "stages": stages, "starved": starved,
+    }
+
+
+def _feedback(inst: ProblemInstance, bonus: dict[int, dict[str, float]],
+              starved: dict[int, set[str]],
+              weight: float) -> dict[int, dict[str, float]]:
+    """
+    Обратный проход: кампании, по которым стадия s упёрлась в поставку,
+    получают бонус weight на всех стадиях выше s.
+    """
+    new = {s: dict(b) for s, b in bonus.items()}
+    for stage in sorted(starved, reverse=True):
+        for k in starved[stage]:
+            for up in inst.stage_aggs:
+                if up < stage:
+                    new.setdefault(up, {})
+                    new[up][k] = new[up].get(k, 0.0) + weight
+    return new
+
+
+def solve_stagewise(feedback_iters: int | None = None,
+                    time_limit: float | None = None,
+                    workers: int | None = None,
+                    inst: ProblemInstance | None = None) -> dict:
+    """
+    Решает inst.days последовательностью одностадийных моделей build_model(stages=[s]).
+    feedback_iters: число итераций обратной связи (по умолчанию cfg.stagewise_feedback_iters);
+                    на каждой итерации цепочки с бонусами cfg.stagewise_bonus_weights
+                    решаются параллельно, лучший план по целевой функции монолитной
+                    модели становится базой для следующей итерации.
+    time_limit:     лимит CBC на одну стадию (по умолчанию cfg.stagewise_time_limit).
+    workers:        число одновременно решаемых цепочек (по умолчанию os.cpu_count()).
+    inst:           данные задачи (по умолчанию ProblemInstance.from_settings()).
+    Возвращает словарь тех же ключей, что solve_main, плюс "iterations" —
+    цель, бонусы и время стадий по каждой рассмотренной цепочке.
+    """
+    if feedback_iters is None:
+        feedback_iters = cfg.stagewise_feedback_iters
+    if time_limit is None:
+        time_limit = cfg.stagewise_time_limit
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if inst is None:
+        inst = ProblemInstance.from_settings()
+
+    days = list(inst.days)
+    best = _forward_chain(inst, days, {}, time_limit)
+    best["bonus"] = {}
+    iterations = [{"iter": 0, "bonus": {}, "objective": best["objective"],
+                   "stages": best["stages"]}]
+    runlog.log(1, f"[INFO] Прямой проход: цель {best['objective']:.1f}")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for it in range(1, feedback_iters + 1):
+            if not any(best["starved"].values()):
+                break
+            bonuses = [_feedback(inst, best["bonus"], best["starved"], w)
+                       for w in cfg.stagewise_bonus_weights]
+            # CBC запускается отдельным процессом, потоки дают реальный параллелизм
+            chains = list(pool.map(lambda b: _forward_chain(inst, days, b, time_limit), bonuses))
+            for bonus, chain in zip(bonuses, chains):
+                chain["bonus"] = bonus
+                iterations.append({"iter": it, "bonus": bonus,
+                                   "objective": chain["objective"], "stages": chain["stages"]})
+            candidate = max(chains, key=lambda c: c["objective"])
+            runlog.log(1, f"[INFO] Итерация {it}: лучшая цель {candidate['objective']:.1f}")
+            if candidate["objective"] <= best["objective"]:
+                break
+            best = candidate
+
+    statuses = set(best["statuses"])
+    status_str = "Optimal" if statuses == {"Optimal"} else ", ".join(sorted(statuses))
+    result = _collect_result(None, status_str, days, *best["values"], inst)
+    result["solver_stats"] = None
+    result["objective"] = best["objective"]
+    result["iterations"] = iterations
+    return result
+
+
+if __name__ == "__main__":
+    res = solve_stagewise()
+    print("Статус:", res["status_str"], res["objective"], res["metrics"])
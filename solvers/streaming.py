@@ -0,0 +1,255 @@
+# solvers/streaming.py
+#
+# Поток решений во время решения MIP: CBC запускается своим процессом,
+# его лог читается построчно (parse_cbc_line), найденные решения и границы
+# отдаются обработчику on_event и копятся временным рядом. Правила
+# AdaptiveStop останавливают решение по SIGINT, когда ждать дальше
+# невыгодно: CBC по SIGINT завершает поиск и пишет лучшее решение.
+# Запуск процесса CBC и чтение его лога (CBCProcess, cbc_command,
+# assign_solution) общие со solvers/portfolio.py.
+
+import os
+import shutil
+import signal
+import subprocess
+import threading
+import time
+
+from pulp import PULP_CBC_CMD, LpMaximize, PulpSolverError
+
+import config.settings as cfg
+from solvers.cbc_log import parse_cbc_line, parse_cbc_log, relative_gap
+
+
+class AdaptiveStop:
+    """
+    Правила остановки по ряду решений (время — секунды от старта решения):
+      stall_seconds — разрыв не уменьшался stall_seconds секунд,
+      min_rate      — цель за последние rate_window секунд улучшилась
+                      меньше чем на min_rate в секунду,
+      target_gap    — разрыв не больше target_gap.
+    None выключает правило; все правила действуют после первого решения.
+    """
+
+    def __init__(self, stall_seconds: float | None = None, min_rate: float | None = None,
+                 rate_window: float = 10.0, target_gap: float | None = None):
+        self.stall_seconds = stall_seconds
+        self.min_rate      = min_rate
+        self.rate_window   = rate_window
+        self.target_gap    = target_gap
+        self.best_gap: float | None = None
+        self.gap_since: float = 0.0      # время последнего уменьшения разрыва
+        self.history: list[tuple[float, float]] = []   # (время, цель) решений
+
+    @classmethod
+    def from_settings(cls) -> "AdaptiveStop | None":
+        """Правила из cfg.stop_*; None, если все выключены."""
+        if cfg.stop_stall_seconds is None and cfg.stop_min_rate is None \
+                and cfg.stop_target_gap is None:
+            return None
+        return cls(cfg.stop_stall_seconds, cfg.stop_min_rate,
+                   cfg.stop_rate_window, cfg.stop_target_gap)
+
+    def update(self, event: dict):
+        """Учитывает событие потока ({"wall", "objective", "gap", ...})."""
+        if event["kind"] == "incumbent":
+            self.history.append((event["wall"], event["objective"]))
+        gap = event.get("gap")
+        if gap is not None and (self.best_gap is None or gap < self.best_gap - 1e-9):
+            self.best_gap = gap
+            self.gap_since = event["wall"]
+
+    def reason(self, now: float) -> str | None:
+        """Причина остановки на момент now или None."""
+        if not self.history:
+            return None
+        if self.target_gap is not None and self.best_gap is not None \
+                and self.best_gap <= self.target_gap:
+            return f"разрыв {self.best_gap:.4f} <= {self.target_gap}"
+        if self.stall_seconds is not None and self.best_gap is not None \
+                and now - self.gap_since >= self.stall_seconds:
+            return f"разрыв не менялся {now - self.gap_since:.1f} с"
+        if self.min_rate is not None and now - self.history[0][0] >= self.rate_window:
+            past = [obj for t, obj in self.history if t <= now - self.rate_window]
+            base = past[-1] if past else self.history[0][1]
+            rate = abs(self.history[-1][1] - base) / self.rate_window
+            if rate < self.min_rate:
+                return f"улучшение {rate:.2f}/с < {self.min_rate}/с"
+        return None
+
+
+def cbc_command(path: str, mps: str, sol: str, maximize: bool, mst: str | None = None,
+                time_limit: float | None = None, options: list[str] = ()) -> list[str]:
+    """
+    Командная строка CBC: модель mps, решение в sol, MIP-старт mst, опции
+    без "-" ("ratioGap 0.01"). Для построчного вывода — через stdbuf -oL,
+    если он есть (иначе вывод идёт блоками).
+    """
+    args = [path, mps] + (["-max"] if maximize else [])
+    if mst is not None:
+        args += ["-mips", mst]
+    if time_limit is not None:
+        args += ["-sec", str(time_limit)]
+    for option in options:
+        args += ("-" + option).split()
+    args += ["-solve", "-printingOptions", "all", "-solution", sol]
+    if shutil.which("stdbuf"):
+        args = ["stdbuf", "-oL"] + args
+    return args
+
+
+class CBCProcess:
+    """
+    Процесс CBC с чтением лога в отдельном потоке: строки копятся в lines
+    (и печатаются с префиксом prefix при echo), строки с решениями и
+    границами (parse_cbc_line) передаются в on_event(event) с полями
+    процесса: objective — лучшее решение, bound — последняя граница,
+    gap, wall — с от t0. Решения хуже текущего (их сообщают эвристики
+    CBC) пропускаются. interrupt() — SIGINT (CTRL_BREAK в Windows):
+    CBC завершает поиск и пишет лучшее решение.
+    """
+
+    def __init__(self, args: list[str], maximize: bool, t0: float, on_event,
+                 echo: bool = False, prefix: str = ""):
+        self.maximize = maximize
+        self.t0 = t0
+        self.on_event = on_event
+        self.echo = echo
+        self.prefix = prefix
+        self.lines: list[str] = []
+        self.objective: float | None = None
+        self.bound: float | None = None
+        popen_kw = {}
+        if os.name == "nt":
+            popen_kw["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+        self.proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                     stdin=subprocess.DEVNULL, text=True, errors="replace",
+                                     **popen_kw)
+        self.reader = threading.Thread(target=self._read, daemon=True)
+        self.reader.start()
+
+    def poll(self) -> int | None:
+        return self.proc.poll()
+
+    def interrupt(self):
+        self.proc.send_signal(signal.CTRL_BREAK_EVENT if os.name == "nt" else signal.SIGINT)
+
+    def wait(self) -> int:
+        """Ждёт конца процесса и чтения лога; код возврата."""
+        self.proc.wait()
+        self.reader.join()
+        return self.proc.returncode
+
+    @property
+    def log_text(self) -> str:
+        return "".join(self.lines)
+
+    def _read(self):
+        for line in self.proc.stdout:
+            self.lines.append(line)
+            if self.echo:
+                print(self.prefix + line, end="")
+            ev = parse_cbc_line(line.strip(), self.maximize)
+            if ev is None:
+                continue
+            if ev["kind"] == "incumbent":
+                if self.objective is not None \
+                        and (ev["objective"] < self.objective) == self.maximize:
+                    continue
+                self.objective = ev["objective"]
+            else:
+                # без решения CBC печатает «1e+50 best solution»
+                if abs(ev["objective"]) < 1e49:
+                    self.objective = ev["objective"]
+                self.bound = ev["bound"]
+            ev.update(wall=time.perf_counter() - self.t0, objective=self.objective,
+                      bound=self.bound, gap=relative_gap(self.objective, self.bound))
+            self.on_event(ev)
+
+
+def assign_solution(solver: PULP_CBC_CMD, lp, sol: str, vs, var_names, con_names) -> int:
+    """Читает решение CBC из sol и присваивает его модели lp; статус PuLP."""
+    status, values, reduced, shadow, slacks, sol_status = solver.readsol_MPS(
+        sol, lp, vs, var_names, con_names)
+    lp.assignVarsVals(values)
+    lp.assignVarsDj(reduced)
+    lp.assignConsPi(shadow)
+    lp.assignConsSlack(slacks, activity=True)
+    lp.assignStatus(status, sol_status)
+    return status
+
+
+class StreamingCBC(PULP_CBC_CMD):
+    """
+    PULP_CBC_CMD с построчным чтением лога:
+      on_event(event) — вызывается на каждое решение и строку прогресса;
+                        event: {"kind", "wall", "time", "objective", "bound",
+                        "gap", ...}, wall — с от запуска CBC, time — по часам CBC,
+      stop            — AdaptiveStop; при срабатывании CBC получает SIGINT.
+    После решения: events — временной ряд, stop_reason — причина
+    досрочной остановки (None — CBC закончил сам), log_text — полный лог.
+    Лог печатается при msg и пишется в logPath.
+    """
+
+    def __init__(self, *args, on_event=None, stop: AdaptiveStop | None = None,
+                 poll: float = 0.2, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_event = on_event
+        self.stop = stop
+        self.poll = poll
+        self.events: list[dict] = []
+        self.stop_reason: str | None = None
+        self.log_text = ""
+        self._maximize = True
+        self._lock = threading.Lock()
+
+    def solve_CBC(self, lp, use_mps=True):
+        if not self.executable(self.path):
+            raise PulpSolverError(f"Pulp: cannot execute {self.path} cwd: {os.getcwd()}")
+        tmpMps, tmpSol, tmpMst = self.create_tmp_files(lp.name, "mps", "sol", "mst")
+        try:
+            vs, var_names, con_names, _ = lp.writeMPS(tmpMps, rename=1)
+            maximize = self._maximize = lp.sense == LpMaximize
+            warm = self.optionsDict.get("warmStart", False)
+            if warm:
+                self.writesol(tmpMst, lp, vs, var_names, con_names)
+            args = cbc_command(self.path, tmpMps, tmpSol, maximize, tmpMst if warm else None,
+                               self.timeLimit, self.options + self.getOptions())
+            t0 = time.perf_counter()
+            run = CBCProcess(args, maximize, t0, self._event, echo=self.msg)
+            while run.poll() is None:
+                time.sleep(self.poll)
+                if self.stop is None or self.stop_reason is not None:
+                    continue
+                with self._lock:
+                    reason = self.stop.reason(time.perf_counter() - t0)
+                if reason is not None:
+                    self.stop_reason = reason
+                    run.interrupt()
+            returncode = run.wait()
+            self.log_text = run.log_text
+            logPath = self.optionsDict.get("logPath")
+            if logPath:
+                with open(logPath, "w", encoding="utf-8") as f:
+                    f.write(self.log_text)
+
+            if returncode != 0 or not os.path.exists(tmpSol):
+                raise PulpSolverError("Pulp: Error while executing " + self.path)
+            return assign_solution(self, lp, tmpSol, vs, var_names, con_names)
+        finally:
+            self.delete_tmp_files(tmpMps, tmpSol, tmpMst)
+
+    def _event(self, ev: dict):
+        with self._lock:
+            self.events.append(ev)
+            if self.stop is not None:
+                self.stop.update(ev)
+        if self.on_event is not None:
+            self.on_event(ev)
+
+    def stats(self) -> dict:
+        """Сводка лога (parse_cbc_log) + events и stop_reason."""
+        stats = parse_cbc_log(self.log_text, self._maximize)
+        stats["events"] = self.events
+        stats["stop_reason"] = self.stop_reason
+        return stats
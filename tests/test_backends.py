@@ -0,0 +1,28 @@
+# tests/test_backends.py
+#
+# Бэкенды решателя: граница и разрыв в solver_stats.
+# Запуск: python -m pytest tests
+
+import pulp
+import pytest
+
+import config.settings as cfg
+from data.instance import ProblemInstance
+from solvers.backends import solve_backend
+
+
+@pytest.fixture(autouse=True)
+def _settings(monkeypatch):
+    monkeypatch.setattr(cfg, "verbosity", 0)
+
+
+@pytest.mark.skipif(not pulp.HiGHS().available(), reason="highspy не установлен")
+def test_highs_bound_of_maximization():
+    inst = ProblemInstance.from_settings()
+    out = solve_backend("highs", list(inst.days), inst, time_limit=30)
+    stats = out["solver_stats"]
+    assert out["model"].sense == pulp.LpMaximize
+    assert stats["objective"] is not None and stats["bound"] is not None
+    # граница задачи на максимум не ниже найденного решения
+    assert stats["bound"] >= stats["objective"] - 1e-6
+    assert 0 <= stats["gap"] <= 1
@@ -0,0 +1,51 @@
+# tests/test_cache.py
+#
+# Кэш решений: что записывается и что нет.
+# Запуск: python -m pytest tests
+
+import pytest
+
+import config.settings as cfg
+from data.instance import ProblemInstance
+from solvers.cache import SolveCache, cache_key, solve_cached
+
+
+@pytest.fixture(autouse=True)
+def _settings(monkeypatch):
+    monkeypatch.setattr(cfg, "verbosity", 0)
+
+
+def _fake_solve(status_str):
+    calls = []
+
+    def solve(inst):
+        calls.append(inst)
+        return {"model": None, "status_str": status_str, "x_vars": {}}
+    return solve, calls
+
+
+def test_solved_result_is_stored(tmp_path):
+    cache = SolveCache(str(tmp_path), 2**20)
+    inst = ProblemInstance.from_settings()
+    solve, calls = _fake_solve("Optimal")
+
+    first = solve_cached("greedy", solve, inst, cache=cache)
+    again = solve_cached("greedy", solve, inst, cache=cache)
+    assert first["cache"]["hit"] is False
+    assert again["cache"]["hit"] is True
+    assert len(calls) == 1
+
+
+def test_not_solved_result_is_not_stored(tmp_path):
+    cache = SolveCache(str(tmp_path), 2**20)
+    inst = ProblemInstance.from_settings()
+    solve, calls = _fake_solve("Not Solved")
+
+    first = solve_cached("greedy", solve, inst, cache=cache)
+    assert first["cache"]["hit"] is False and first["cache"]["path"] is None
+    assert cache.get(cache_key("greedy", inst)) is None
+    assert cache.entries() == []
+
+    again = solve_cached("greedy", solve, inst, cache=cache)
+    assert again["cache"]["hit"] is False
+    assert len(calls) == 2
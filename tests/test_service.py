@@ -0,0 +1,86 @@
+# tests/test_service.py
+#
+# Сервис планирования через LocalClient (в одном процессе, без сокета).
+# Запуск: python -m pytest tests
+
+import asyncio
+
+import pytest
+
+import config.settings as cfg
+from solvers.service import LocalClient, PlanningService
+
+
+@pytest.fixture(autouse=True)
+def _settings(monkeypatch):
+    # без дискового кэша: повтор должен отвечать из памяти сервиса
+    monkeypatch.setattr(cfg, "cache_dir", None)
+    monkeypatch.setattr(cfg, "verbosity", 0)
+    monkeypatch.setattr(cfg, "replan_time_limit", 5)
+
+
+def _run(scenario):
+    """scenario(client) в новом цикле событий; сервис закрывается после."""
+    service = PlanningService(workers=2)
+    try:
+        return asyncio.run(scenario(LocalClient(service)))
+    finally:
+        service.close()
+
+
+def test_solve_and_memory():
+    async def scenario(client):
+        first = await client.solve("greedy")
+        again = await client.solve("greedy")
+        return first, again
+
+    first, again = _run(scenario)
+    assert first["state"] == "done" and first["cached"] is None
+    assert first["result"]["status"] == "Heuristic"
+    assert first["result"]["schedule"]
+    assert again["state"] == "done" and again["cached"] == "memory"
+    assert again["job"] != first["job"]
+    assert again["result"] == first["result"]
+
+
+def test_in_flight_requests_share_job():
+    async def scenario(client):
+        a = await client.call({"op": "solve", "mode": "greedy", "wait": False})
+        b = await client.call({"op": "solve", "mode": "greedy", "wait": False})
+        done = await client.call({"op": "solve", "mode": "greedy"})
+        jobs = await client.call({"op": "jobs"})
+        return a, b, done, jobs
+
+    a, b, done, jobs = _run(scenario)
+    assert a["state"] == "queued"
+    assert b["job"] == a["job"]
+    assert done["job"] == a["job"] and done["state"] == "done"
+    assert len(jobs["jobs"]) == 1
+
+
+def test_replan_chain():
+    async def scenario(client):
+        base = await client.solve("greedy")
+        first = await client.replan(base["job"], 5)
+        second = await client.replan(first["job"], 8)
+        status = await client.status(second["job"])
+        return first, second, status
+
+    first, second, status = _run(scenario)
+    assert first["state"] == "done", first.get("error")
+    assert second["state"] == "done", second.get("error")
+    assert second["result"]["schedule"]
+    assert status["kind"] == "replan" and status["state"] == "done"
+
+
+def test_unknown_mode_and_job():
+    async def scenario(client):
+        bad = await client.solve("nosuch")
+        missing = await client.replan("j999", 5)
+        jobs = await client.call({"op": "jobs"})
+        return bad, missing, jobs
+
+    bad, missing, jobs = _run(scenario)
+    assert "nosuch" in bad["error"] and "job" not in bad
+    assert "j999" in missing["error"]
+    assert jobs["jobs"] == []